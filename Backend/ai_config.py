@@ -10,115 +10,161 @@ Configuration (from environment variables):
 - AI_API_TIMEOUT: Timeout in seconds (default: 15)
 - MAX_REQUESTS_PER_HOUR: Rate limit per user (default: 10)
 - AUDIT_LOGGING_ENABLED: Whether to enable audit logging (default: true)
+- STORE_CHAT_SUMMARIES: Store a truncated copy of each chat question (default: true)
+- REDIS_URL: Redis connection URL for shared rate limiting (optional)
 """
 
 import os
+import math
+import asyncio
+import time
+import queue
+import itertools
+import threading
+import atexit
+import json
 import hashlib
+import inspect
 import logging
+from logging.handlers import QueueHandler, QueueListener
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
 from datetime import datetime, timedelta
 from functools import wraps
-from typing import Dict, Tuple, Optional
-from flask import request, jsonify
+from typing import Callable, Dict, List, Tuple, Optional
+from flask import Response, g, request, jsonify, make_response
 
 logger = logging.getLogger(__name__)
 
 
+@dataclass(frozen=True, slots=True)
 class AIConfig:
-    """Configuration for AI features"""
+    """
+    Configuration for AI features.
     
+    Environment variables are read once at import (see CONFIG below);
+    the frozen instance makes every later read a plain slot load.
+    """
     
     # AI Provider Settings
-    AI_PROVIDER = os.getenv('AI_PROVIDER', 'openai')
-    AI_API_KEY = os.getenv('AI_API_KEY', '')
-    AI_MODEL_VERSION = os.getenv('AI_MODEL_VERSION', 'gpt-4-turbo-2024-04')
-    AI_API_TIMEOUT = int(os.getenv('AI_API_TIMEOUT', '15'))
+    AI_PROVIDER: str = 'openai'
+    AI_API_KEY: str = ''
+    AI_MODEL_VERSION: str = 'gpt-4-turbo-2024-04'
+    AI_API_TIMEOUT: int = 15
     
     # Rate Limiting
-    MAX_REQUESTS_PER_HOUR = int(os.getenv('MAX_REQUESTS_PER_HOUR', '10'))
-    RATE_LIMIT_WINDOW_SECONDS = 3600
+    MAX_REQUESTS_PER_HOUR: int = 10
+    RATE_LIMIT_WINDOW_SECONDS: int = 3600
+    REDIS_URL: str = ''
     
     # Input Constraints
-    MIN_NOTE_LENGTH = 20  # minimum characters
-    MAX_NOTE_LENGTH = 5000  # maximum characters
-    MIN_MESSAGE_LENGTH = 3  # minimum characters for chat
-    MAX_MESSAGE_LENGTH = 1000  # maximum characters for chat
+    MIN_NOTE_LENGTH: int = 20  # minimum characters
+    MIN_MESSAGE_LENGTH: int = 3  # minimum characters for chat
+    MAX_MESSAGE_LENGTH: int = 1000  # maximum characters for chat
     
     # Features
-    AUDIT_LOGGING_ENABLED = os.getenv('AUDIT_LOGGING_ENABLED', 'true').lower() == 'true'
-    AI_FEATURES_ENABLED = bool(AI_API_KEY)
+    AUDIT_LOGGING_ENABLED: bool = True
+    AI_FEATURES_ENABLED: bool = False
+    STORE_CHAT_SUMMARIES: bool = True
     
     # Security
-    REQUIRE_AUTHENTICATION = True
-    REQUIRE_ROLE_CHECK = True
-    ENCRYPT_STORED_INTERPRETATIONS = True
+    REQUIRE_AUTHENTICATION: bool = True
+    REQUIRE_ROLE_CHECK: bool = True
+    ENCRYPT_STORED_INTERPRETATIONS: bool = True
     
     # Logging
-    LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
+    LOG_LEVEL: str = 'INFO'
     
     @classmethod
-    def validate(cls):
+    def from_env(cls) -> 'AIConfig':
+        """Build configuration from environment variables"""
+        api_key = os.getenv('AI_API_KEY', '')
+        return cls(
+            AI_PROVIDER=os.getenv('AI_PROVIDER', 'openai'),
+            AI_API_KEY=api_key,
+            AI_MODEL_VERSION=os.getenv('AI_MODEL_VERSION', 'gpt-4-turbo-2024-04'),
+            AI_API_TIMEOUT=int(os.getenv('AI_API_TIMEOUT', '15')),
+            MAX_REQUESTS_PER_HOUR=int(os.getenv('MAX_REQUESTS_PER_HOUR', '10')),
+            REDIS_URL=os.getenv('REDIS_URL', ''),
+            AUDIT_LOGGING_ENABLED=os.getenv('AUDIT_LOGGING_ENABLED', 'true').lower() == 'true',
+            STORE_CHAT_SUMMARIES=os.getenv('STORE_CHAT_SUMMARIES', 'true').lower() == 'true',
+            AI_FEATURES_ENABLED=bool(api_key),
+            LOG_LEVEL=os.getenv('LOG_LEVEL', 'INFO')
+        )
+    
+    def validate(self):
         """Validate configuration on startup"""
         errors = []
         
-        if not cls.AI_API_KEY:
+        if not self.AI_API_KEY:
             logger.warning("AI_API_KEY not set. AI features will be disabled.")
         
-        if cls.AI_PROVIDER not in ['openai', 'anthropic']:
-            errors.append(f"Invalid AI_PROVIDER: {cls.AI_PROVIDER}")
+        if self.AI_PROVIDER not in ['openai', 'anthropic']:
+            errors.append(f"Invalid AI_PROVIDER: {self.AI_PROVIDER}")
         
-        if cls.AI_API_TIMEOUT < 5 or cls.AI_API_TIMEOUT > 60:
+        if self.AI_API_TIMEOUT < 5 or self.AI_API_TIMEOUT > 60:
             errors.append(f"AI_API_TIMEOUT must be between 5 and 60 seconds")
         
         if errors:
             for error in errors:
-                logger.error(f"Config error: {error}")
+                logger.error("Config error: %s", error)
             raise ValueError(f"Configuration errors: {', '.join(errors)}")
         
         logger.info(
-            f"AI Configuration validated | "
-            f"provider={cls.AI_PROVIDER} | "
-            f"model={cls.AI_MODEL_VERSION} | "
-            f"enabled={cls.AI_FEATURES_ENABLED}"
+            "AI Configuration validated | provider=%s | model=%s | enabled=%s",
+            self.AI_PROVIDER, self.AI_MODEL_VERSION, self.AI_FEATURES_ENABLED
         )
     
-    @classmethod
-    def to_dict(cls):
+    def to_dict(self):
         """Export non-sensitive config for logging"""
         return {
-            'ai_provider': cls.AI_PROVIDER,
-            'model_version': cls.AI_MODEL_VERSION,
-            'is_enabled': cls.AI_FEATURES_ENABLED,
-            'rate_limit': cls.MAX_REQUESTS_PER_HOUR,
-            'timeout': cls.AI_API_TIMEOUT,
-            'audit_logging': cls.AUDIT_LOGGING_ENABLED
+            'ai_provider': self.AI_PROVIDER,
+            'model_version': self.AI_MODEL_VERSION,
+            'is_enabled': self.AI_FEATURES_ENABLED,
+            'rate_limit': self.MAX_REQUESTS_PER_HOUR,
+            'timeout': self.AI_API_TIMEOUT,
+            'audit_logging': self.AUDIT_LOGGING_ENABLED
         }
 
 
+# Frozen configuration, built once at import
+CONFIG = AIConfig.from_env()
+
+
 class SecurityUtils:
     """Security utilities: authentication, encryption, de-identification"""
     
     @staticmethod
+    @lru_cache(maxsize=4096)
     def hash_user_id(user_id: int) -> str:
         """
         Hash user ID for audit logs.
         
         One-way hash allows correlation without storing actual IDs.
-        SHA256 (first 8 chars) sufficient for audit purposes.
+        A 4-byte BLAKE2b digest (8 hex chars) is sufficient for audit
+        purposes and much cheaper than SHA256 for short inputs. Results
+        are memoized since the same few IDs recur on every request.
         
         Args:
             user_id: Numeric user ID
         
         Returns:
-            First 8 chars of hex SHA256 hash
+            8 hex chars of BLAKE2b hash
         """
-        hash_obj = hashlib.sha256(str(user_id).encode())
-        return hash_obj.hexdigest()[:8]
+        return hashlib.blake2b(str(user_id).encode(), digest_size=4).hexdigest()
     
     @staticmethod
+    @lru_cache(maxsize=4096)
     def hash_note_id(note_id: str) -> str:
         """Hash note ID for audit logs"""
-        hash_obj = hashlib.sha256(note_id.encode())
-        return hash_obj.hexdigest()[:8]
+        return hashlib.blake2b(note_id.encode(), digest_size=4).hexdigest()
+    
+    @staticmethod
+    def hash_note_content(text: str) -> str:
+        """Full-strength content digest for deduplicating identical notes"""
+        return hashlib.blake2b(text.encode(), digest_size=32).hexdigest()
     
     @staticmethod
     def encrypt_text(text: str, key: Optional[str] = None) -> str:
@@ -160,29 +206,53 @@ class SecurityUtils:
 
 class RateLimiter:
     """
-    In-memory rate limiter for AI requests.
+    In-memory token-bucket rate limiter for AI requests.
     
     Production recommendation:
     - Use Redis for distributed rate limiting across multiple servers
-    - Implement sliding window algorithm
     - Add global rate limits (per service, per hour)
     
     Current implementation:
     - Per-user limits (10 requests/hour per clinician)
+    - Each user holds a bucket of `user_limit` tokens, refilled continuously
+      at `user_limit / window_seconds` tokens per second
+    - Stores only (tokens, last_refill) per user, so checks are O(1)
+    - Thread-safe via striped locks (users only contend within a stripe);
+      one small lock orders all changes to the recency order and evictions
+    - Bounded memory: least recently seen users are evicted past MAX_USERS,
+      and idle (fully refilled) buckets are swept every SWEEP_EVERY checks
     - In-memory storage (works for single-server deployments)
     """
     
+    LOCK_STRIPES = 64  # power of two so a bitmask selects the stripe
+    MAX_USERS = 100_000
+    SWEEP_EVERY = 1000
+    
     def __init__(self, user_limit: int = 10, window_seconds: int = 3600):
         """
         Initialize rate limiter.
         
         Args:
-            user_limit: Max requests per user per window
+            user_limit: Max requests per user per window (bucket capacity)
             window_seconds: Time window in seconds (default: 1 hour)
         """
         self.user_limit = user_limit
         self.window_seconds = window_seconds
-        self.requests = {}  # user_id → [timestamp1, timestamp2, ...]
+        self.refill_rate = user_limit / window_seconds  # tokens per second
+        # user_id → (tokens, last_refill), least recently seen first
+        self.buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self._locks = [threading.Lock() for _ in range(self.LOCK_STRIPES)]
+        self._order_lock = threading.Lock()  # Held only for OrderedDict updates, after any stripe lock
+        self._calls = itertools.count(1)
+    
+    def _lock_for(self, user_id: str) -> threading.Lock:
+        """Lock guarding this user's bucket"""
+        return self._locks[hash(user_id) & (self.LOCK_STRIPES - 1)]
+    
+    def _refill(self, user_id: str, now: float) -> float:
+        """Return the user's token count refilled up to `now`"""
+        tokens, last_refill = self.buckets.get(user_id, (self.user_limit, now))
+        return min(self.user_limit, tokens + (now - last_refill) * self.refill_rate)
     
     def is_allowed(self, user_id: str) -> Tuple[bool, int]:
         """
@@ -194,38 +264,228 @@ class RateLimiter:
         Returns:
             Tuple: (is_allowed: bool, remaining_requests: int)
         """
-        now = datetime.utcnow().timestamp()
-        window_start = now - self.window_seconds
+        allowed, remaining, _ = self.check(user_id)
+        return allowed, remaining
+    
+    def check(self, user_id: str) -> Tuple[bool, int, datetime]:
+        """
+        Spend a token if available and report when the next one is due.
         
-        # Initialize user if needed
-        if user_id not in self.requests:
-            self.requests[user_id] = []
+        Returns:
+            Tuple: (is_allowed: bool, remaining_requests: int, reset_at: datetime)
+        """
+        if next(self._calls) % self.SWEEP_EVERY == 0:
+            self._sweep()
+        
+        with self._lock_for(user_id):
+            now = time.monotonic()
+            tokens = self._refill(user_id, now)
+            allowed = tokens >= 1
+            if allowed:
+                # Under limit, spend one token for this request
+                tokens -= 1
+            
+            with self._order_lock:
+                self.buckets[user_id] = (tokens, now)
+                self.buckets.move_to_end(user_id)
+        
+        # Evict least recently seen users once over capacity
+        if len(self.buckets) > self.MAX_USERS:
+            with self._order_lock:
+                while len(self.buckets) > self.MAX_USERS:
+                    self.buckets.popitem(last=False)
+        
+        wait = 0.0 if tokens >= 1 else (1 - tokens) / self.refill_rate
+        reset_at = datetime.utcfromtimestamp(time.time() + wait)
+        return (True, int(tokens), reset_at) if allowed else (False, 0, reset_at)
+    
+    def _sweep(self) -> None:
+        """Drop buckets idle for a full window (they have refilled to capacity)"""
+        now = time.monotonic()
+        with self._order_lock:
+            entries = list(self.buckets.items())
+        for user_id, (_, last_refill) in entries:
+            if now - last_refill < self.window_seconds:
+                continue
+            with self._lock_for(user_id):
+                # Re-check under the lock in case the user came back meanwhile
+                entry = self.buckets.get(user_id)
+                if entry and now - entry[1] >= self.window_seconds:
+                    with self._order_lock:
+                        del self.buckets[user_id]
+    
+    def get_count(self, user_id: str) -> int:
+        """Requests currently counted against user (spent, not yet refilled tokens)"""
+        if user_id not in self.buckets:
+            return 0
+        tokens = self._refill(user_id, time.monotonic())
+        return math.ceil(self.user_limit - tokens)
+    
+    def get_reset_time(self, user_id: str) -> Optional[datetime]:
+        """Get when the next request will be allowed for user"""
+        if user_id not in self.buckets:
+            return None
         
-        # Remove old requests outside window
-        self.requests[user_id] = [
-            ts for ts in self.requests[user_id] if ts > window_start
-        ]
+        now = time.monotonic()
+        tokens = self._refill(user_id, now)
+        if tokens >= 1:
+            return datetime.utcfromtimestamp(time.time())
         
-        # Count current requests
-        current_count = len(self.requests[user_id])
-        remaining = self.user_limit - current_count
+        return datetime.utcfromtimestamp(time.time() + (1 - tokens) / self.refill_rate)
+
+
+class RedisRateLimiter:
+    """
+    Redis-backed token-bucket rate limiter shared by all workers and servers.
+    
+    Same bucket as RateLimiter, stored in Redis:
+    - One hash per user: rl:{user_id} → {tokens, ts}
+    - Refill, spend and reset time are computed in a single atomic Lua
+      script, so every check is one EVALSHA round trip
+    - Buckets expire once they would have refilled (one window idle), so
+      memory stays bounded
+    
+    Falls back to an in-process RateLimiter if Redis is unreachable.
+    """
+    
+    # KEYS[1] = bucket hash
+    # ARGV[1] = now (ms), ARGV[2] = refill rate (tokens/ms), ARGV[3] = capacity, ARGV[4] = ttl (ms)
+    # Returns {allowed, remaining, ms until next token}
+    LUA_SCRIPT = """
+    local now = tonumber(ARGV[1])
+    local rate = tonumber(ARGV[2])
+    local capacity = tonumber(ARGV[3])
+    local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+    local tokens = tonumber(bucket[1]) or capacity
+    local last = tonumber(bucket[2]) or now
+    tokens = math.min(capacity, tokens + math.max(0, now - last) * rate)
+    local allowed = 0
+    if tokens >= 1 then
+        tokens = tokens - 1
+        allowed = 1
+    end
+    redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', now)
+    redis.call('PEXPIRE', KEYS[1], ARGV[4])
+    local wait = 0
+    if tokens < 1 then
+        wait = math.ceil((1 - tokens) / rate)
+    end
+    return {allowed, math.floor(tokens), wait}
+    """
+    
+    def __init__(self, redis_client, user_limit: int = 10, window_seconds: int = 3600):
+        """
+        Initialize Redis rate limiter.
+        
+        Args:
+            redis_client: redis.Redis instance
+            user_limit: Max requests per user per window (bucket capacity)
+            window_seconds: Time window in seconds (default: 1 hour)
+        """
+        self.redis = redis_client
+        self.user_limit = user_limit
+        self.window_seconds = window_seconds
+        self.refill_rate_ms = user_limit / (window_seconds * 1000)  # tokens per ms
+        # register_script issues EVALSHA and loads the script on first NOSCRIPT
+        self._script = redis_client.register_script(self.LUA_SCRIPT)
+        self._fallback = RateLimiter(user_limit, window_seconds)
+    
+    def _key(self, user_id: str) -> str:
+        return f"rl:{user_id}"
+    
+    def is_allowed(self, user_id: str) -> Tuple[bool, int]:
+        """
+        Check if user is within rate limit.
         
-        if current_count < self.user_limit:
-            # Under limit, record this request
-            self.requests[user_id].append(now)
-            return True, remaining - 1
+        Args:
+            user_id: Unique identifier (doctor_id, patient_id)
         
-        # Over limit
-        return False, 0
+        Returns:
+            Tuple: (is_allowed: bool, remaining_requests: int)
+        """
+        allowed, remaining, _ = self.check(user_id)
+        return allowed, remaining
     
-    def get_reset_time(self, user_id: str) -> Optional[datetime]:
-        """Get when rate limit will reset for user"""
-        if user_id not in self.requests or not self.requests[user_id]:
+    def check(self, user_id: str) -> Tuple[bool, int, datetime]:
+        """
+        Spend a token if available and report when the next one is due.
+        
+        Returns:
+            Tuple: (is_allowed: bool, remaining_requests: int, reset_at: datetime)
+        """
+        now_ms = int(time.time() * 1000)
+        
+        try:
+            allowed, remaining, wait_ms = self._script(
+                keys=[self._key(user_id)],
+                args=[now_ms, self.refill_rate_ms, self.user_limit, self.window_seconds * 1000]
+            )
+        except Exception as e:
+            logger.warning("Redis rate limiter unavailable, using in-process limits | error=%s", e)
+            return self._fallback.check(user_id)
+        
+        reset_at = datetime.utcfromtimestamp((now_ms + int(wait_ms)) / 1000)
+        return bool(allowed), max(0, int(remaining)), reset_at
+    
+    def _tokens(self, user_id: str) -> Optional[float]:
+        """Current (refilled) token count, or None when the user has no bucket"""
+        tokens, last = self.redis.hmget(self._key(user_id), 'tokens', 'ts')
+        if tokens is None:
             return None
+        elapsed_ms = max(0, time.time() * 1000 - float(last))
+        return min(self.user_limit, float(tokens) + elapsed_ms * self.refill_rate_ms)
+    
+    def get_count(self, user_id: str) -> int:
+        """Requests currently counted against user (spent, not yet refilled tokens)"""
+        try:
+            tokens = self._tokens(user_id)
+        except Exception as e:
+            logger.warning("Redis rate limiter unavailable, using in-process limits | error=%s", e)
+            return self._fallback.get_count(user_id)
         
-        oldest_request = min(self.requests[user_id])
-        reset_time = datetime.utcfromtimestamp(oldest_request + self.window_seconds)
-        return reset_time
+        return 0 if tokens is None else math.ceil(self.user_limit - tokens)
+    
+    def get_reset_time(self, user_id: str) -> Optional[datetime]:
+        """Get when the next request will be allowed for user"""
+        try:
+            tokens = self._tokens(user_id)
+        except Exception as e:
+            logger.warning("Redis rate limiter unavailable, using in-process limits | error=%s", e)
+            return self._fallback.get_reset_time(user_id)
+        
+        if tokens is None:
+            return None
+        wait_ms = 0 if tokens >= 1 else (1 - tokens) / self.refill_rate_ms
+        return datetime.utcfromtimestamp(time.time() + wait_ms / 1000)
+
+
+@lru_cache(maxsize=None)
+def get_redis_client():
+    """
+    Shared Redis client, created on first use.
+    
+    Returns:
+        redis.Redis instance, or None if REDIS_URL is not configured
+    """
+    if not CONFIG.REDIS_URL:
+        return None
+    
+    import redis  # Only required when REDIS_URL is set
+    return redis.Redis.from_url(CONFIG.REDIS_URL)
+
+
+def create_rate_limiter(user_limit: int = 10, window_seconds: int = 3600):
+    """
+    Build the rate limiter for this deployment.
+    
+    Uses RedisRateLimiter when REDIS_URL is set (multi-worker safe),
+    otherwise the in-memory RateLimiter.
+    """
+    redis_client = get_redis_client()
+    if redis_client is not None:
+        logger.info("Rate limiting backed by Redis")
+        return RedisRateLimiter(redis_client, user_limit, window_seconds)
+    return RateLimiter(user_limit, window_seconds)
 
 
 class CircuitBreaker:
@@ -263,8 +523,10 @@ class CircuitBreaker:
         
         self.state = self.CLOSED
         self.failure_count = 0
-        self.last_failure_time: Optional[datetime] = None
+        self.last_failure_time: float = 0.0  # time.monotonic() of last failure
         self.success_count = 0
+        # Guards state transitions only; never held while the call runs
+        self._lock = threading.Lock()
     
     def call(self, func, *args, **kwargs):
         """
@@ -281,15 +543,7 @@ class CircuitBreaker:
             Exception: Original exception if circuit fails
             RuntimeError: If circuit is OPEN
         """
-        if self.state == self.OPEN:
-            if self._should_attempt_reset():
-                self.state = self.HALF_OPEN
-                self.success_count = 0
-            else:
-                raise RuntimeError(
-                    f"Circuit breaker is OPEN. AI service unavailable. "
-                    f"Try again in {self._seconds_until_retry()}s"
-                )
+        self._before_call()
         
         try:
             result = func(*args, **kwargs)
@@ -299,43 +553,58 @@ class CircuitBreaker:
             self._on_failure()
             raise
     
+    def _before_call(self):
+        """Fail fast while OPEN; move to HALF_OPEN once the timeout passed"""
+        with self._lock:
+            if self.state == self.OPEN:
+                if self._should_attempt_reset():
+                    self.state = self.HALF_OPEN
+                    self.success_count = 0
+                else:
+                    raise RuntimeError(
+                        f"Circuit breaker is OPEN. AI service unavailable. "
+                        f"Try again in {self._seconds_until_retry()}s"
+                    )
+    
     def _on_success(self):
         """Handle successful call"""
-        self.failure_count = 0
-        if self.state == self.HALF_OPEN:
-            self.success_count += 1
-            if self.success_count >= 2:  # 2 successes = full recovery
-                self.state = self.CLOSED
-                logger.info("Circuit breaker CLOSED (service recovered)")
+        with self._lock:
+            self.failure_count = 0
+            if self.state == self.HALF_OPEN:
+                self.success_count += 1
+                if self.success_count >= 2:  # 2 successes = full recovery
+                    self.state = self.CLOSED
+                    logger.info("Circuit breaker CLOSED (service recovered)")
     
     def _on_failure(self):
         """Handle failed call"""
-        self.failure_count += 1
-        self.last_failure_time = datetime.utcnow()
-        
-        if self.failure_count >= self.failure_threshold and self.state != self.OPEN:
-            self.state = self.OPEN
-            logger.warning(
-                f"Circuit breaker OPEN (failures: {self.failure_count}). "
-                f"AI service calls will fail fast for {self.timeout_seconds}s"
-            )
-        
-        if self.state == self.HALF_OPEN:
-            self.state = self.OPEN  # Recovery failed
-            logger.warning("Circuit breaker OPEN (recovery failed)")
+        with self._lock:
+            self.failure_count += 1
+            self.last_failure_time = time.monotonic()
+            
+            if self.failure_count >= self.failure_threshold and self.state != self.OPEN:
+                self.state = self.OPEN
+                logger.warning(
+                    "Circuit breaker OPEN (failures: %d). AI service calls will fail fast for %ss",
+                    self.failure_count, self.timeout_seconds
+                )
+            
+            if self.state == self.HALF_OPEN:
+                self.state = self.OPEN  # Recovery failed
+                logger.warning("Circuit breaker OPEN (recovery failed)")
     
     def _should_attempt_reset(self) -> bool:
         """Check if enough time passed to attempt recovery"""
         if not self.last_failure_time:
             return True
-        elapsed = (datetime.utcnow() - self.last_failure_time).total_seconds()
+        elapsed = time.monotonic() - self.last_failure_time
         return elapsed >= self.timeout_seconds
     
     def _seconds_until_retry(self) -> int:
         """Seconds until circuit can retry"""
         if not self.last_failure_time:
             return 0
-        elapsed = (datetime.utcnow() - self.last_failure_time).total_seconds()
+        elapsed = time.monotonic() - self.last_failure_time
         return max(0, int(self.timeout_seconds - elapsed))
     
     def get_status(self) -> Dict:
@@ -347,85 +616,296 @@ class CircuitBreaker:
         }
 
 
+class AsyncCircuitBreaker(CircuitBreaker):
+    """
+    Circuit breaker that also accepts coroutine functions.
+    
+    Same states and thresholds as CircuitBreaker, and the sync call()
+    still works, so one instance can guard both sync and async views.
+    
+    Flask runs each async view on its own event loop in the worker thread,
+    so an asyncio.Lock cannot be shared between requests; transitions keep
+    the thread lock, which is only held for a few assignments and never
+    across an await.
+    """
+    
+    async def call_async(self, func, *args, **kwargs):
+        """
+        Await func(*args, **kwargs) through the circuit breaker.
+        
+        Raises:
+            Exception: Original exception if the call fails
+            RuntimeError: If circuit is OPEN
+        """
+        self._before_call()
+        
+        try:
+            result = await func(*args, **kwargs)
+        except Exception:
+            self._on_failure()
+            raise
+        self._on_success()
+        return result
+    
+    async def call_in_executor(self, executor, func, *args):
+        """
+        Run blocking func(*args) on executor and await it through the breaker.
+        
+        Pass a long-lived executor: each async view runs on a fresh event
+        loop, so asyncio.to_thread() would start (and tear down) a new
+        default thread pool on every request.
+        """
+        loop = asyncio.get_running_loop()
+        return await self.call_async(lambda: loop.run_in_executor(executor, func, *args))
+
+
+class MicroBatcher:
+    """
+    Collect concurrent calls into batches for one fn(items) -> results call.
+    
+    submit() queues an item and returns a Future. A collector thread takes
+    the first queued item, keeps collecting for up to max_wait_ms or until
+    max_batch items, then hands the batch to a small pool so up to
+    max_inflight batches run at once. fn returns one result per item, in
+    order; an Exception instance in the results fails only that item.
+    """
+    
+    def __init__(self, fn: Callable[[List], List], max_batch: int = 8,
+                 max_wait_ms: int = 50, max_inflight: int = 4):
+        self.fn = fn
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self.max_inflight = max_inflight
+        self._queue: queue.Queue = queue.Queue()
+        self._start_lock = threading.Lock()
+        self._collector: Optional[threading.Thread] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+    
+    def submit(self, item) -> Future:
+        """Queue one item; the Future resolves to its result"""
+        future = Future()
+        self._queue.put((item, future))
+        if self._collector is None:
+            self._start()
+        return future
+    
+    async def submit_async(self, item, timeout: Optional[float] = None):
+        """Await the result of submit(item) without blocking the event loop"""
+        return await asyncio.wait_for(asyncio.wrap_future(self.submit(item)), timeout)
+    
+    def _start(self):
+        """Start the collector on first use (after any fork)"""
+        with self._start_lock:
+            if self._collector is not None:
+                return
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_inflight, thread_name_prefix='micro-batch'
+            )
+            self._collector = threading.Thread(
+                target=self._collect, name='micro-batch-collector', daemon=True
+            )
+            self._collector.start()
+    
+    def _collect(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            
+            # Callers that already timed out are dropped from the batch
+            batch = [(item, f) for item, f in batch if f.set_running_or_notify_cancel()]
+            if batch:
+                self._executor.submit(self._run_batch, batch)
+    
+    def _run_batch(self, batch: List[Tuple]):
+        futures = [f for _, f in batch]
+        try:
+            results = self.fn([item for item, _ in batch])
+            if len(results) != len(futures):
+                raise RuntimeError(f"Batch returned {len(results)} results for {len(futures)} items")
+        except BaseException as e:
+            for f in futures:
+                f.set_exception(e)
+            return
+        
+        for f, result in zip(futures, results):
+            if isinstance(result, BaseException):
+                f.set_exception(result)
+            else:
+                f.set_result(result)
+
+
 # Flask decorators for API endpoints
 
-def require_ai_enabled(f):
-    """Decorator: Check if AI features are enabled"""
+def _json_body(payload: Dict) -> bytes:
+    """Serialize a constant error payload once, at import/decoration time"""
+    return json.dumps(payload, separators=(',', ':')).encode('utf-8')
+
+
+def _canned_response(body: bytes, status: int) -> Response:
+    """
+    Wrap a prebuilt JSON body in a Response.
+    
+    A fresh Response is built per rejection (cheap: no dict or json.dumps)
+    because after_request hooks such as CORS mutate response headers.
+    """
+    return Response(body, status=status, mimetype='application/json')
+
+
+_AI_DISABLED_BODY = _json_body({
+    'error': 'AI features not available',
+    'message': 'AI services are not configured. Please configure AI_API_KEY.'
+})
+_MISSING_TOKEN_BODY = _json_body({'error': 'Missing or invalid auth token'})
+
+
+def _guard(f, check):
+    """
+    Wrap view f so check() runs first; a non-None result is returned instead.
+    
+    Coroutine views get an async wrapper, so Flask still sees an async view.
+    """
+    if inspect.iscoroutinefunction(f):
+        @wraps(f)
+        async def async_decorated_function(*args, **kwargs):
+            rejection = check()
+            if rejection is not None:
+                return rejection
+            return await f(*args, **kwargs)
+        return async_decorated_function
+    
     @wraps(f)
     def decorated_function(*args, **kwargs):
-        if not AIConfig.AI_FEATURES_ENABLED:
-            return jsonify({
-                'error': 'AI features not available',
-                'message': 'AI services are not configured. Please configure AI_API_KEY.'
-            }), 503
+        rejection = check()
+        if rejection is not None:
+            return rejection
         return f(*args, **kwargs)
     return decorated_function
 
 
+def require_ai_enabled(f):
+    """Decorator: Check if AI features are enabled"""
+    ai_enabled = CONFIG.AI_FEATURES_ENABLED  # Read once at decoration time
+    
+    def check():
+        if not ai_enabled:
+            return _canned_response(_AI_DISABLED_BODY, 503)
+    return _guard(f, check)
+
+
 def require_auth_token(f):
     """Decorator: Verify JWT auth token"""
-    @wraps(f)
-    def decorated_function(*args, **kwargs):
+    def check():
         auth_header = request.headers.get('Authorization', '')
         
         if not auth_header or not auth_header.startswith('Bearer '):
-            return jsonify({
-                'error': 'Missing or invalid auth token'
-            }), 401
+            return _canned_response(_MISSING_TOKEN_BODY, 401)
         
         # In production: validate JWT token
         # token = auth_header.split(' ')[1]
         # user = validate_jwt_token(token)
         # if not user:
         #     return jsonify({'error': 'Invalid token'}), 401
-        
-        return f(*args, **kwargs)
-    return decorated_function
+    return _guard(f, check)
 
 
 def require_role(*allowed_roles):
     """Decorator: Check if user has required role"""
+    forbidden_body = _json_body({'error': f'Requires role: {", ".join(allowed_roles)}'})
+    
+    def check():
+        user_role = request.headers.get('X-User-Role')
+        
+        if not user_role or user_role not in allowed_roles:
+            return _canned_response(forbidden_body, 403)
+    
     def decorator(f):
-        @wraps(f)
-        def decorated_function(*args, **kwargs):
-            user_role = request.headers.get('X-User-Role')
-            
-            if not user_role or user_role not in allowed_roles:
-                return jsonify({
-                    'error': f'Requires role: {", ".join(allowed_roles)}'
-                }), 403
-            
-            return f(*args, **kwargs)
-        return decorated_function
+        return _guard(f, check)
+    return decorator
+
+
+def require(auth: bool = False, roles: Optional[Tuple[str, ...]] = None, ai: bool = False):
+    """
+    Decorator: require_auth_token + require_role + require_ai_enabled in one check.
+    
+    Same checks, order and responses as stacking the three decorators, but the
+    headers are read once and the caller is left on flask.g (g.user_id,
+    g.user_role) for the view.
+    """
+    allowed_roles = frozenset(roles) if roles else None
+    forbidden_body = _json_body({'error': f'Requires role: {", ".join(roles)}'}) if roles else None
+    ai_enabled = CONFIG.AI_FEATURES_ENABLED  # Read once at decoration time
+    
+    def check():
+        headers = request.headers
+        if auth and not headers.get('Authorization', '').startswith('Bearer '):
+            return _canned_response(_MISSING_TOKEN_BODY, 401)
+        
+        user_role = headers.get('X-User-Role')
+        if allowed_roles is not None and user_role not in allowed_roles:
+            return _canned_response(forbidden_body, 403)
+        
+        if ai and not ai_enabled:
+            return _canned_response(_AI_DISABLED_BODY, 503)
+        
+        g.user_id = headers.get('X-User-ID')
+        g.user_role = user_role
+    
+    def decorator(f):
+        return _guard(f, check)
     return decorator
 
 
 def rate_limit_check(rate_limiter: RateLimiter, user_id_header: str = 'X-User-ID'):
     """Decorator: Check rate limit"""
+    missing_header_body = _json_body({'error': f'Missing {user_id_header} header'})
+    
+    def check():
+        """Return (rejection, remaining)"""
+        user_id = request.headers.get(user_id_header)
+        
+        if not user_id:
+            return _canned_response(missing_header_body, 400), 0
+        
+        allowed, remaining, reset_time = rate_limiter.check(user_id)
+        
+        if not allowed:
+            return make_response(jsonify({
+                'error': 'Rate limit exceeded',
+                'message': f'Max {rate_limiter.user_limit} requests per hour',
+                'reset_at': reset_time.isoformat()
+            }), 429), 0
+        return None, remaining
+    
+    def with_remaining(rv, remaining):
+        # Add remaining to response headers
+        response = make_response(rv)
+        response.headers['X-RateLimit-Remaining'] = str(remaining)
+        return response
+    
     def decorator(f):
+        if inspect.iscoroutinefunction(f):
+            @wraps(f)
+            async def async_decorated_function(*args, **kwargs):
+                rejection, remaining = check()
+                if rejection is not None:
+                    return rejection
+                return with_remaining(await f(*args, **kwargs), remaining)
+            return async_decorated_function
+        
         @wraps(f)
         def decorated_function(*args, **kwargs):
-            user_id = request.headers.get(user_id_header)
-            
-            if not user_id:
-                return jsonify({
-                    'error': f'Missing {user_id_header} header'
-                }), 400
-            
-            allowed, remaining = rate_limiter.is_allowed(user_id)
-            
-            if not allowed:
-                reset_time = rate_limiter.get_reset_time(user_id)
-                return jsonify({
-                    'error': 'Rate limit exceeded',
-                    'message': f'Max {rate_limiter.user_limit} requests per hour',
-                    'reset_at': reset_time.isoformat() if reset_time else None
-                }), 429
-            
-            # Add remaining to response headers
-            response = make_response(f(*args, **kwargs))
-            response.headers['X-RateLimit-Remaining'] = str(remaining)
-            return response
+            rejection, remaining = check()
+            if rejection is not None:
+                return rejection
+            return with_remaining(f(*args, **kwargs), remaining)
         
         return decorated_function
     return decorator
@@ -434,19 +914,28 @@ def rate_limit_check(rate_limiter: RateLimiter, user_id_header: str = 'X-User-ID
 # Logging configuration
 
 def setup_audit_logging():
-    """Setup audit logging for AI operations"""
-    if not AIConfig.AUDIT_LOGGING_ENABLED:
+    """
+    Setup audit logging for AI operations.
+    
+    Request threads only enqueue records; a QueueListener thread does the
+    file writes, keeping disk I/O off the request path.
+    """
+    if not CONFIG.AUDIT_LOGGING_ENABLED:
         return
     
     audit_logger = logging.getLogger('audit')
     audit_logger.setLevel(logging.INFO)
     
-    # File handler for audit logs
+    # File handler for audit logs, driven by a background listener
     audit_handler = logging.FileHandler('logs/ai_audit.log')
     audit_handler.setFormatter(
         logging.Formatter('%(asctime)s | %(message)s')
     )
-    audit_logger.addHandler(audit_handler)
+    audit_queue = queue.SimpleQueue()
+    audit_listener = QueueListener(audit_queue, audit_handler)
+    audit_logger.addHandler(QueueHandler(audit_queue))
+    audit_listener.start()
+    atexit.register(audit_listener.stop)  # Drain queued records on shutdown
     
     logger.info("Audit logging configured")
 
@@ -454,12 +943,19 @@ def setup_audit_logging():
 # Export commonly used items
 __all__ = [
     'AIConfig',
+    'CONFIG',
     'SecurityUtils',
     'RateLimiter',
+    'RedisRateLimiter',
     'CircuitBreaker',
+    'AsyncCircuitBreaker',
+    'MicroBatcher',
+    'get_redis_client',
+    'create_rate_limiter',
     'require_ai_enabled',
     'require_auth_token',
     'require_role',
+    'require',
     'rate_limit_check',
     'setup_audit_logging'
 ]
@@ -18,13 +18,76 @@ Database tables created:
 
 """
 
-from datetime import datetime
-from sqlalchemy.dialects.postgresql import JSON, UUID
+import os
+import time
+from datetime import datetime, timezone
+from sqlalchemy import DDL, event, false, func, select, text
+from sqlalchemy.dialects.postgresql import JSON, JSONB, UUID
+from sqlalchemy.orm import Session, deferred, with_loader_criteria
 import uuid
 from models import db
 
 
-class NoteInterpretation(db.Model):
+def _uuid7_from_ms(unix_ms: int, rand: int) -> uuid.UUID:
+    """Pack 48-bit milliseconds + 74 random bits with version/variant set"""
+    rand_a = (rand >> 62) & 0xFFF
+    rand_b = rand & ((1 << 62) - 1)
+    return uuid.UUID(int=(unix_ms << 80) | (0x7 << 76) | (rand_a << 64) | (0b10 << 62) | rand_b)
+
+
+def uuid7() -> uuid.UUID:
+    """
+    Time-ordered UUID (RFC 9562 version 7).
+    
+    48-bit Unix milliseconds followed by random bits, so ids sort by
+    creation time and B-tree inserts stay at the right edge of the index.
+    """
+    return _uuid7_from_ms(time.time_ns() // 1_000_000, int.from_bytes(os.urandom(10), 'big'))
+
+
+def uuid7_at(moment: datetime) -> uuid.UUID:
+    """
+    Smallest UUIDv7 for a moment (naive datetimes are taken as UTC).
+    
+    Use as a range bound: id BETWEEN uuid7_at(t1) AND uuid7_at(t2)
+    """
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return _uuid7_from_ms(int(moment.timestamp() * 1000), 0)
+
+
+class SerializationCacheMixin:
+    """
+    Memoizes to_dict() per instance until the row changes.
+    
+    The cache is dropped when any column is set, and when the instance is
+    expired (e.g. after commit) or refreshed. Cached dicts are shared, so
+    callers must treat them as read-only.
+    """
+    
+    def _cached_dict(self, key, build, *args):
+        cache = self.__dict__.get('_dict_cache')
+        if cache is not None and key in cache:
+            return cache[key]
+        # Build before storing: loading expired attributes fires 'refresh'
+        data = build(*args)
+        self.__dict__.setdefault('_dict_cache', {})[key] = data
+        return data
+
+
+def _clear_dict_cache(target, *args):
+    target.__dict__.pop('_dict_cache', None)
+
+
+@event.listens_for(SerializationCacheMixin, 'mapper_configured', propagate=True)
+def _watch_for_changes(mapper, cls):
+    for column_attr in mapper.column_attrs:
+        event.listen(getattr(cls, column_attr.key), 'set', _clear_dict_cache)
+    event.listen(cls, 'expire', _clear_dict_cache)
+    event.listen(cls, 'refresh', _clear_dict_cache)
+
+
+class NoteInterpretation(SerializationCacheMixin, db.Model):
     """
     Stores AI interpretation of a clinical note.
     
@@ -50,15 +113,19 @@ class NoteInterpretation(db.Model):
     # Reference to original note and users
     note_id = db.Column(db.String(100), nullable=False, unique=True, index=True)
     patient_id = db.Column(db.Integer, db.ForeignKey('patients.id'), nullable=False, index=True)
-    doctor_id = db.Column(db.String(50), db.ForeignKey('doctors.doctor_id'), nullable=False, index=True)
+    doctor_id = db.Column(db.String(50), db.ForeignKey('doctors.doctor_id'), nullable=False)  # see ix_ni_doctor_pending
     
     # Original note (PRESERVED - never overwritten)
-    original_note_text = db.Column(db.Text, nullable=False)
-    
-    # AI-generated content
-    formatted_note = db.Column(db.Text)
+    # Large text columns are deferred: loaded on access or via undefer()
+    original_note_text = deferred(db.Column(db.Text, nullable=False))
+    # BLAKE2b-256 of original_note_text: identical re-submissions reuse
+    # an existing interpretation instead of calling the AI provider again
+    original_note_hash = db.Column(db.String(64), index=True)
+    
+    # AI-generated content (long-form texts load together as 'summaries')
+    formatted_note = deferred(db.Column(db.Text), group='summaries')
     clinical_summary = db.Column(db.Text)
-    patient_friendly_summary = db.Column(db.Text)
+    patient_friendly_summary = deferred(db.Column(db.Text), group='summaries')
     
     # Extracted medical entities (stored as JSON)
     # Example: {
@@ -67,10 +134,12 @@ class NoteInterpretation(db.Model):
     #   "medications": ["amoxicillin"],
     #   "vitals": {"BP": "120/80", "HR": "72"}
     # }
-    extracted_symptoms = db.Column(JSON)
-    extracted_diagnoses = db.Column(JSON)
-    extracted_medications = db.Column(JSON)
-    extracted_vitals = db.Column(JSON)
+    # JSONB: stored pre-parsed and GIN-indexable, so containment searches
+    # (extracted_medications @> '["amoxicillin"]') use the index
+    extracted_symptoms = db.Column(JSONB)
+    extracted_diagnoses = db.Column(JSONB)
+    extracted_medications = db.Column(JSONB)
+    extracted_vitals = db.Column(JSONB)
     
     # AI metadata (for auditing)
     ai_model_version = db.Column(db.String(100))  # "gpt-4-turbo-2024-04"
@@ -85,18 +154,52 @@ class NoteInterpretation(db.Model):
     
     # Track if clinician made edits
     clinician_edited = db.Column(db.Boolean, default=False)
-    clinician_edits_summary = db.Column(db.Text)  # What clinician changed
+    clinician_edits_summary = deferred(db.Column(db.Text))  # What clinician changed
+    # Pre-encoded to_dict(include_original=False) JSON, written on approval
+    # (approved interpretations are served as bytes, no re-serialization)
+    cached_json = deferred(db.Column(db.LargeBinary))
     
     # Audit & record management
-    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     is_deleted = db.Column(db.Boolean, default=False)  # Soft delete flag
     
+    __table_args__ = (
+        # Clinician dashboard: WHERE doctor_id=? AND clinician_approved=?
+        # ORDER BY created_at DESC — also serves doctor_id-only lookups.
+        # Partial: live rows only (soft-deleted rows are filtered globally)
+        db.Index('ix_ni_doctor_pending', 'doctor_id', 'clinician_approved', 'created_at',
+                 postgresql_where=db.text('is_deleted = false'),
+                 sqlite_where=db.text('is_deleted = 0')),
+    )
+    
     def __repr__(self):
         return f"NoteInterpretation(note='{self.note_id}', patient={self.patient_id}, approved={self.clinician_approved})"
     
+    def ai_result(self) -> dict:
+        """Stored AI output in the shape NoteInterpreter.interpret_note returns"""
+        return {
+            'formatted_note': self.formatted_note,
+            'clinical_summary': self.clinical_summary,
+            'patient_friendly_summary': self.patient_friendly_summary,
+            'extracted_entities': {
+                'symptoms': self.extracted_symptoms or [],
+                'diagnoses': self.extracted_diagnoses or [],
+                'medications': self.extracted_medications or [],
+                'vitals': self.extracted_vitals or {}
+            },
+            'ai_metadata': {
+                'model_version': self.ai_model_version,
+                'ai_provider': self.ai_provider,
+                'timestamp': self.ai_processing_timestamp.isoformat() + 'Z' if self.ai_processing_timestamp else None
+            }
+        }
+    
     def to_dict(self, include_original=True):
-        """Serialize to dictionary"""
+        """Serialize to dictionary (cached until the row changes)"""
+        return self._cached_dict(include_original, self._build_dict, include_original)
+    
+    def _build_dict(self, include_original):
         data = {
             'id': self.id,
             'note_id': self.note_id,
@@ -129,7 +232,7 @@ class NoteInterpretation(db.Model):
         return data
 
 
-class ChatSession(db.Model):
+class ChatSession(SerializationCacheMixin, db.Model):
     """
     Tracks chatbot conversation sessions.
     
@@ -140,7 +243,7 @@ class ChatSession(db.Model):
     - conversation_id: Unique ID for conversation
     - user_id: Patient ID or Doctor ID
     - user_role: "patient" or "clinician"
-    - message_count: Total messages in conversation
+    - message_count: Total messages in conversation (kept in sync by ChatMessage events)
     - started_at, ended_at: Conversation timeline
     """
     
@@ -171,6 +274,13 @@ class ChatSession(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    __table_args__ = (
+        # A user's live (non-archived) sessions, newest first
+        db.Index('ix_chat_sessions_active_user', 'user_id', 'started_at',
+                 postgresql_where=db.text('is_archived = false'),
+                 sqlite_where=db.text('is_archived = 0')),
+    )
+    
     # Relationships
     messages = db.relationship('ChatMessage', backref='session', lazy=True, cascade='all, delete-orphan')
     
@@ -178,7 +288,10 @@ class ChatSession(db.Model):
         return f"ChatSession(conversation='{self.conversation_id}', user={self.user_id}, role={self.user_role})"
     
     def to_dict(self):
-        """Serialize to dictionary"""
+        """Serialize to dictionary (cached until the row changes)"""
+        return self._cached_dict(None, self._build_dict)
+    
+    def _build_dict(self):
         return {
             'id': self.id,
             'conversation_id': self.conversation_id,
@@ -192,7 +305,7 @@ class ChatSession(db.Model):
         }
 
 
-class ChatMessage(db.Model):
+class ChatMessage(SerializationCacheMixin, db.Model):
     """
     Individual chat messages in a conversation.
     
@@ -236,7 +349,10 @@ class ChatMessage(db.Model):
         return f"ChatMessage(conversation='{self.conversation_id}', type={self.message_type}, intent={self.intent_category})"
     
     def to_dict(self):
-        """Serialize to dictionary"""
+        """Serialize to dictionary (cached until the row changes)"""
+        return self._cached_dict(None, self._build_dict)
+    
+    def _build_dict(self):
         return {
             'id': self.id,
             'conversation_id': self.conversation_id,
@@ -250,7 +366,7 @@ class ChatMessage(db.Model):
 
 # Additional utility models for analytics/compliance
 
-class AIAuditLog(db.Model):
+class AIAuditLog(SerializationCacheMixin, db.Model):
     """
     Comprehensive audit log for all AI operations.
     
@@ -263,16 +379,22 @@ class AIAuditLog(db.Model):
     - ai_service: "note_interpreter" or "chatbot"
     - result: "success", "error", "timeout"
     - metadata: Additional context (e.g., model version, response length)
+    
+    On PostgreSQL the table is range-partitioned by id (UUIDv7, so by time)
+    into monthly partitions; retention is DROP TABLE on an old partition
+    (see drop_audit_partition) instead of a bulk DELETE.
     """
     
     __tablename__ = 'ai_audit_logs'
     
-    id = db.Column(db.Integer, primary_key=True)
+    # UUIDv7: time-ordered, so time-range scans use the primary key
+    # (id BETWEEN uuid7_at(t1) AND uuid7_at(t2)) instead of a timestamp index
+    id = db.Column(UUID(as_uuid=True), primary_key=True, default=uuid7)
     
     # WHO & WHEN
-    user_id_hash = db.Column(db.String(100), index=True)  # Hashed user ID
+    user_id_hash = db.Column(db.String(100))  # Hashed user ID
     user_role = db.Column(db.String(50))  # "clinician", "patient"
-    action_timestamp = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    action_timestamp = db.Column(db.DateTime, default=datetime.utcnow)
     
     # WHAT & HOW
     action = db.Column(db.String(100), nullable=False, index=True)  # note_interpreted, chat_responded
@@ -290,11 +412,20 @@ class AIAuditLog(db.Model):
     #   "rate_limit_remaining": 9
     # }
     
+    __table_args__ = (
+        # A user's recent activity, newest first
+        db.Index('ix_ai_audit_user_time', user_id_hash, action_timestamp.desc()),
+        {'postgresql_partition_by': 'RANGE (id)'},
+    )
+    
     def __repr__(self):
         return f"AIAuditLog(action={self.action}, result={self.result}, time={self.action_timestamp})"
     
     def to_dict(self):
-        """Serialize to dictionary"""
+        """Serialize to dictionary (cached until the row changes)"""
+        return self._cached_dict(None, self._build_dict)
+    
+    def _build_dict(self):
         return {
             'id': self.id,
             'user_id_hash': self.user_id_hash,
@@ -305,3 +436,107 @@ class AIAuditLog(db.Model):
             'timestamp': self.action_timestamp.isoformat(),
             'context': self.context
         }
+
+
+# Soft delete: ORM SELECTs never see NoteInterpretation rows with
+# is_deleted set. Opt out with .execution_options(include_deleted=True)
+
+@event.listens_for(Session, 'do_orm_execute')
+def _exclude_deleted_interpretations(orm_execute_state):
+    if (
+        orm_execute_state.is_select
+        and not orm_execute_state.is_column_load
+        and not orm_execute_state.is_relationship_load
+        and not orm_execute_state.execution_options.get('include_deleted', False)
+    ):
+        # Literal false (not a bound parameter) so the planner can match
+        # the partial indexes' WHERE is_deleted = false
+        orm_execute_state.statement = orm_execute_state.statement.options(
+            with_loader_criteria(
+                NoteInterpretation, NoteInterpretation.is_deleted == false(), include_aliases=True
+            )
+        )
+
+
+# Denormalized ChatSession.message_count, maintained in the flush's own
+# connection: one UPDATE by conversation per write, so reads never COUNT(*)
+
+@event.listens_for(ChatMessage, 'before_insert')
+def _assign_message_number(mapper, connection, target):
+    """Number the message in the INSERT itself (no prior SELECT MAX round trip)"""
+    if target.message_number is None:
+        target.message_number = (
+            select(func.coalesce(func.max(ChatMessage.message_number), 0) + 1)
+            .where(ChatMessage.conversation_id == target.conversation_id)
+            .scalar_subquery()
+        )
+
+
+def _bump_message_count(connection, conversation_id, delta):
+    sessions = ChatSession.__table__
+    connection.execute(
+        sessions.update()
+        .where(sessions.c.conversation_id == conversation_id)
+        .values(
+            message_count=func.coalesce(sessions.c.message_count, 0) + delta,
+            updated_at=datetime.utcnow()
+        )
+    )
+
+
+@event.listens_for(ChatMessage, 'after_insert')
+def _increment_message_count(mapper, connection, target):
+    _bump_message_count(connection, target.conversation_id, 1)
+
+
+@event.listens_for(ChatMessage, 'after_delete')
+def _decrement_message_count(mapper, connection, target):
+    _bump_message_count(connection, target.conversation_id, -1)
+
+
+# Postgres-only GIN indexes for entity containment searches
+for _column in ('extracted_symptoms', 'extracted_diagnoses', 'extracted_medications'):
+    event.listen(NoteInterpretation.__table__, 'after_create', DDL(
+        f"CREATE INDEX IF NOT EXISTS ix_note_interpretations_{_column}_gin "
+        f"ON note_interpretations USING GIN ({_column} jsonb_path_ops)"
+    ).execute_if(dialect='postgresql'))
+
+
+# Postgres-only DDL for the partitioned audit table: a DEFAULT partition so
+# inserts never fail for a month without a partition, and a BRIN index on
+# action_timestamp (tiny, and ideal for an append-only, time-ordered column)
+for _ddl in (
+    "CREATE TABLE IF NOT EXISTS ai_audit_logs_default PARTITION OF ai_audit_logs DEFAULT",
+    "CREATE INDEX IF NOT EXISTS ai_audit_ts_brin ON ai_audit_logs "
+    "USING BRIN (action_timestamp) WITH (pages_per_range = 32)",
+):
+    event.listen(AIAuditLog.__table__, 'after_create', DDL(_ddl).execute_if(dialect='postgresql'))
+
+
+def _audit_partition_name(year: int, month: int) -> str:
+    return f"ai_audit_logs_{year:04d}_{month:02d}"
+
+
+def create_audit_partition(connection, year: int, month: int) -> str:
+    """
+    Create the monthly ai_audit_logs partition (PostgreSQL).
+    
+    Bounds are uuid7_at() of the month start and next month start. Run ahead
+    of time (e.g. monthly cron for next month): rows already routed to the
+    DEFAULT partition for that range would block creation.
+    """
+    start = datetime(year, month, 1)
+    end = datetime(year + month // 12, month % 12 + 1, 1)
+    name = _audit_partition_name(year, month)
+    connection.execute(text(
+        f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF ai_audit_logs "
+        f"FOR VALUES FROM ('{uuid7_at(start)}') TO ('{uuid7_at(end)}')"
+    ))
+    return name
+
+
+def drop_audit_partition(connection, year: int, month: int) -> str:
+    """Retention: drop a whole month of audit logs (PostgreSQL)"""
+    name = _audit_partition_name(year, month)
+    connection.execute(text(f"DROP TABLE IF EXISTS {name}"))
+    return name
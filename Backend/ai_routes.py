@@ -22,33 +22,147 @@ Security:
 - Audit logging
 """
 
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, g, request, current_app
+import asyncio
+import httpx
+import msgspec
+import orjson
 from datetime import datetime
+import atexit
 import logging
 import json
-from typing import Dict, Tuple, Optional
+import queue
+import threading
+import time
+from functools import cache, lru_cache
+from typing import Dict, List, Tuple, Optional, Union
 
 from ai_service import NoteInterpreter, ValidationError, RateLimitError, AIServiceError
-from chatbot_service import AfyaclickChatbot, ChatbotError
+from chatbot_service import AfyaclickChatbot, ChatbotError, IntentClassifier
 from ai_models import NoteInterpretation, ChatSession, ChatMessage, AIAuditLog
 from models import db
+from sqlalchemy import false, insert, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import undefer, undefer_group
 from ai_config import (
-    AIConfig, SecurityUtils, RateLimiter, CircuitBreaker,
-    require_ai_enabled, require_auth_token, require_role
+    CONFIG, SecurityUtils, AsyncCircuitBreaker, MicroBatcher, create_rate_limiter, get_redis_client,
+    require
 )
 
 # Create Blueprint
 ai_bp = Blueprint('ai', __name__, url_prefix='/api/ai')
 logger = logging.getLogger(__name__)
 
-# Initialize services
-note_interpreter = NoteInterpreter()
-chatbot = AfyaclickChatbot()
-rate_limiter = RateLimiter(
-    user_limit=AIConfig.MAX_REQUESTS_PER_HOUR,
-    window_seconds=AIConfig.RATE_LIMIT_WINDOW_SECONDS
+# AI services are created on first use, not at import, so workers fork
+# (gunicorn --preload) without provider clients attached
+@cache
+def get_http_client() -> httpx.Client:
+    """One pooled HTTP/2 client per worker: TLS handshakes amortized across AI calls"""
+    return httpx.Client(
+        timeout=CONFIG.AI_API_TIMEOUT,
+        http2=True,
+        limits=httpx.Limits(max_keepalive_connections=32, max_connections=64)
+    )
+
+
+@cache
+def get_note_interpreter() -> NoteInterpreter:
+    return NoteInterpreter(http=get_http_client(), redis=get_redis_client(), breaker=provider_breaker)
+
+
+def _interpret_note_batch(notes: List[Tuple]) -> List:
+    """MicroBatcher fn: one circuit-breaker call per batch of notes"""
+    return circuit_breaker.call(get_note_interpreter().interpret_notes, notes)
+
+
+@cache
+def get_note_batcher() -> MicroBatcher:
+    """Concurrent /notes requests share AI calls in batches of up to 8 (50 ms window)"""
+    return MicroBatcher(_interpret_note_batch, max_batch=8, max_wait_ms=50)
+
+
+@cache
+def get_chatbot() -> AfyaclickChatbot:
+    return AfyaclickChatbot(http=get_http_client())
+
+
+rate_limiter = create_rate_limiter(
+    user_limit=CONFIG.MAX_REQUESTS_PER_HOUR,
+    window_seconds=CONFIG.RATE_LIMIT_WINDOW_SECONDS
 )
-circuit_breaker = CircuitBreaker()
+circuit_breaker = AsyncCircuitBreaker()
+# Per provider call (inside NoteInterpreter): opens after 5 failed calls, retries after 60s
+provider_breaker = AsyncCircuitBreaker(failure_threshold=5, timeout_seconds=60)
+
+# GET /notes/<note_id> responses are cached in Redis (when REDIS_URL is set).
+# Only the summary view is cached; original note text never leaves the DB.
+NOTE_CACHE_TTL_SECONDS = 300  # Pending review: may still be edited
+NOTE_CACHE_APPROVED_TTL_SECONDS = 86400  # Approved: immutable
+NOTE_LOCK_TTL_SECONDS = 3600  # Upper bound on one in-flight interpretation
+
+# AI-generated fields a clinician may edit when approving
+APPROVAL_EDITABLE_FIELDS = frozenset({'formatted_note', 'clinical_summary', 'patient_friendly_summary'})
+
+
+# Response constants: built once instead of per request
+_DISCLAIMER = '⚠ AI-generated content — requires clinical verification before use.'
+_AI_UNAVAILABLE_BODY = orjson.dumps({
+    'success': False,
+    'error': 'AI service temporarily unavailable',
+    'message': 'Please try again in a few moments',
+    'fallback': 'You can save the raw note for manual review'
+})
+# Fixed error messages → pre-encoded {"success": false, "error": ...} body
+_ERROR_BODIES = {
+    message: orjson.dumps({'success': False, 'error': message})
+    for message in (
+        'Invalid JSON',
+        'Internal server error',
+        'Endpoint not found',
+        'Note is already being interpreted',
+        'Note interpretation not found',
+        'Interpretation not found',
+        'Not authorized to approve this interpretation',
+        'Invalid user_role',
+        'Missing message field',
+        'Missing conversation_id field',
+        'Missing user_id or X-User-ID header',
+        'Missing required fields: note_id, raw_note_text, patient_id, doctor_id',
+    )
+}
+_DISCLAIMER_TAIL = b',"disclaimer":' + orjson.dumps(_DISCLAIMER) + b'}}'
+
+# Request bodies: decoded and type-checked in one msgspec pass
+class InterpretNoteBody(msgspec.Struct):
+    note_id: str
+    raw_note_text: str
+    patient_id: Union[int, str]  # Form selects post ids as strings
+    doctor_id: str
+
+
+class ChatBody(msgspec.Struct):
+    message: str = ''
+    conversation_id: str = ''
+    user_role: Optional[str] = None
+    user_id: Union[int, str, None] = None
+
+
+class ApproveBody(msgspec.Struct):
+    approved: bool = True
+    edits: Dict[str, Optional[str]] = {}  # Unedited summaries arrive as null
+
+
+# Audit rows are queued by request threads (no session touch) and written
+# behind by a background thread: one bulk insert per AUDIT_BATCH_SIZE rows
+# or per AUDIT_FLUSH_INTERVAL_SECONDS after the first queued row
+AUDIT_BATCH_SIZE = 500
+AUDIT_FLUSH_INTERVAL_SECONDS = 0.25
+_audit_queue = queue.Queue()
+_audit_start_lock = threading.Lock()
+_AUDIT_STOP = object()  # Queued at shutdown: writer commits what it holds and exits
+_audit_writer = None
+_audit_app = None
 
 
 # ============================================================================
@@ -56,10 +170,8 @@ circuit_breaker = CircuitBreaker()
 # ============================================================================
 
 @ai_bp.route('/notes', methods=['POST'])
-@require_auth_token
-@require_role('clinician', 'admin')
-@require_ai_enabled
-def interpret_note():
+@require(auth=True, roles=('clinician', 'admin'), ai=True)
+async def interpret_note():
     """
     Interpret and summarize a clinical note.
     ---
@@ -98,26 +210,29 @@ def interpret_note():
                   type: string
                 extracted_entities:
                   type: object
+      409:
+        description: Same note_id already being interpreted
       429:
         description: Rate limit exceeded
       503:
         description: AI service unavailable
     """
+    lock_acquired = False
     try:
-        # Extract user info from headers
-        user_id = request.headers.get('X-User-ID', 'unknown')
-        user_role = request.headers.get('X-User-Role', 'unknown')
+        # User info from headers (parsed by @require)
+        user_id = g.user_id or 'unknown'
+        user_role = g.user_role or 'unknown'
         
         # Parse request
-        data = request.get_json()
-        if not data:
-            return _error_response('Invalid JSON', 400)
+        body, error = _decode_body(InterpretNoteBody)
+        if error is not None:
+            return error
         
         # Extract fields
-        note_id = data.get('note_id', '').strip()
-        raw_note_text = data.get('raw_note_text', '').strip()
-        patient_id = data.get('patient_id')
-        doctor_id = data.get('doctor_id', '').strip()
+        note_id = body.note_id.strip()
+        raw_note_text = body.raw_note_text.strip()
+        patient_id = body.patient_id.strip() if isinstance(body.patient_id, str) else body.patient_id
+        doctor_id = body.doctor_id.strip()
         
         # Validate required fields
         if not note_id or not raw_note_text or not patient_id or not doctor_id:
@@ -127,60 +242,92 @@ def interpret_note():
             )
         
         # Check rate limit
-        allowed, remaining = rate_limiter.is_allowed(doctor_id)
+        allowed, remaining, reset_time = rate_limiter.check(doctor_id)
         if not allowed:
             _audit_log_action(doctor_id, 'rate_limit_exceeded', 'note_interpreter')
-            reset_time = rate_limiter.get_reset_time(doctor_id)
-            return jsonify({
+            return _json({
                 'success': False,
                 'error': 'Rate limit exceeded',
-                'message': f'Maximum {AIConfig.MAX_REQUESTS_PER_HOUR} requests per hour',
-                'reset_at': reset_time.isoformat() if reset_time else None
-            }), 429
+                'message': f'Maximum {CONFIG.MAX_REQUESTS_PER_HOUR} requests per hour',
+                'reset_at': reset_time
+            }, 429)
         
-        # Check if note already interpreted
-        existing = NoteInterpretation.query.filter_by(
-            note_id=note_id, is_deleted=False
-        ).first()
+        # Approved interpretations are recorded in Redis: answer repeats in O(1)
+        cached = _note_result_get(note_id)
+        if cached is not None:
+            logger.info("Returning cached interpretation | note_id=%s", note_id)
+            return Response(cached, status=200, mimetype='application/json')
         
-        if existing and existing.clinician_approved:
-            logger.info(f"Returning cached interpretation | note_id={note_id}")
-            return jsonify({
-                'success': True,
-                'note_interpretation': existing.to_dict(include_original=False),
-                'message': 'Cached interpretation (already approved)'
-            }), 200
+        # Only one submission of a note may be in flight at a time
+        if not _note_lock_acquire(note_id, doctor_id):
+            return _error_response('Note is already being interpreted', 409)
+        lock_acquired = True
         
-        # Call AI service through circuit breaker
-        logger.info(f"Interpreting note | note_id={note_id} | doctor={doctor_id}")
+        # Redis result key missing or expired: fall back to the database
+        # (the JSON stored at approval; the full row only for older approvals)
+        existing = db.session.execute(
+            select(NoteInterpretation.id, NoteInterpretation.cached_json)
+            .where(NoteInterpretation.note_id == note_id, NoteInterpretation.clinician_approved.is_(True))
+            .limit(1)
+        ).first()
         
-        ai_result = circuit_breaker.call(
-            note_interpreter.interpret_note,
-            note_id, raw_note_text, patient_id, doctor_id
-        )
+        if existing is not None:
+            logger.info("Returning cached interpretation | note_id=%s", note_id)
+            note_json = existing.cached_json
+            if note_json is None:
+                note_json = _encode_note(db.session.get(
+                    NoteInterpretation, existing.id, options=[undefer_group('summaries')]
+                ))
+            payload = _approved_note_payload(note_json)
+            _note_result_set(note_id, payload)
+            return Response(payload, status=200, mimetype='application/json')
         
-        # Store interpretation in database
-        interpretation = NoteInterpretation(
-            note_id=note_id,
-            patient_id=patient_id,
-            doctor_id=doctor_id,
-            original_note_text=raw_note_text,
-            formatted_note=ai_result['formatted_note'],
-            clinical_summary=ai_result['clinical_summary'],
-            patient_friendly_summary=ai_result['patient_friendly_summary'],
-            extracted_symptoms=ai_result['extracted_entities'].get('symptoms'),
-            extracted_diagnoses=ai_result['extracted_entities'].get('diagnoses'),
-            extracted_medications=ai_result['extracted_entities'].get('medications'),
-            extracted_vitals=ai_result['extracted_entities'].get('vitals'),
-            ai_model_version=ai_result['ai_metadata']['model_version'],
-            ai_provider=ai_result['ai_metadata']['ai_provider'],
-            ai_processing_timestamp=datetime.utcnow()
-        )
+        # Same text already interpreted for this doctor: reuse it, skip the AI call
+        note_hash = SecurityUtils.hash_note_content(raw_note_text)
+        duplicate = NoteInterpretation.query.options(
+            undefer_group('summaries')
+        ).filter_by(
+            original_note_hash=note_hash, doctor_id=doctor_id
+        ).order_by(NoteInterpretation.created_at.desc()).first()
+        
+        if duplicate:
+            logger.info("Reusing interpretation of identical note | note_id=%s | source_id=%s", note_id, duplicate.id)
+            ai_result = duplicate.ai_result()
+        else:
+            # Call AI service (batched with concurrent requests, through circuit breaker)
+            logger.info("Interpreting note | note_id=%s | doctor=%s", note_id, doctor_id)
+            
+            try:
+                ai_result = await get_note_batcher().submit_async(
+                    (note_id, raw_note_text, patient_id, doctor_id),
+                    timeout=CONFIG.AI_API_TIMEOUT
+                )
+            except asyncio.TimeoutError:
+                raise AIServiceError(f"No AI result within {CONFIG.AI_API_TIMEOUT}s")
         
-        db.session.add(interpretation)
+        # Store interpretation in database: one INSERT ... RETURNING id, no ORM instance
+        interpretation_id = db.session.execute(
+            insert(NoteInterpretation).values(
+                note_id=note_id,
+                patient_id=patient_id,
+                doctor_id=doctor_id,
+                original_note_text=raw_note_text,
+                original_note_hash=note_hash,
+                formatted_note=ai_result['formatted_note'],
+                clinical_summary=ai_result['clinical_summary'],
+                patient_friendly_summary=ai_result['patient_friendly_summary'],
+                extracted_symptoms=ai_result['extracted_entities'].get('symptoms'),
+                extracted_diagnoses=ai_result['extracted_entities'].get('diagnoses'),
+                extracted_medications=ai_result['extracted_entities'].get('medications'),
+                extracted_vitals=ai_result['extracted_entities'].get('vitals'),
+                ai_model_version=ai_result['ai_metadata']['model_version'],
+                ai_provider=ai_result['ai_metadata']['ai_provider'],
+                ai_processing_timestamp=duplicate.ai_processing_timestamp if duplicate else datetime.utcnow()
+            ).returning(NoteInterpretation.id)
+        ).scalar_one()
         db.session.commit()
         
-        logger.info(f"Interpretation stored | interpretation_id={interpretation.id}")
+        logger.info("Interpretation stored | interpretation_id=%s", interpretation_id)
         
         # Audit log
         _audit_log_action(
@@ -188,57 +335,46 @@ def interpret_note():
             result='success',
             metadata={
                 'note_length': len(raw_note_text),
-                'patient_id_hash': SecurityUtils.hash_user_id(patient_id)
+                'patient_id_hash': SecurityUtils.hash_user_id(patient_id),
+                'ai_call_skipped': duplicate is not None
             }
         )
         
-        # Return response
-        response = {
-            'success': True,
-            'note_interpretation': {
-                'id': interpretation.id,
-                'note_id': interpretation.note_id,
-                'formatted_note': interpretation.formatted_note,
-                'clinical_summary': interpretation.clinical_summary,
-                'patient_friendly_summary': interpretation.patient_friendly_summary,
-                'extracted_entities': ai_result['extracted_entities'],
-                'ai_metadata': ai_result['ai_metadata'],
-                'disclaimer': '⚠ AI-generated content — requires clinical verification before use.'
-            }
-        }
-        
-        return jsonify(response), 200
+        # Return response, streamed field by field
+        return Response(
+            _stream_interpretation(interpretation_id, note_id, ai_result),
+            status=200, mimetype='application/json'
+        )
     
     except ValidationError as e:
-        logger.warning(f"Validation error | error={str(e)}")
+        logger.warning("Validation error | error=%s", e)
         _audit_log_action(
-            request.headers.get('X-User-ID', 'unknown'),
+            g.user_id or 'unknown',
             'validation_error', 'note_interpreter',
             result='error', metadata={'error': str(e)}
         )
         return _error_response(f'Invalid input: {str(e)}', 400)
     
     except RateLimitError as e:
-        logger.warning(f"Rate limit | error={str(e)}")
+        logger.warning("Rate limit | error=%s", e)
         return _error_response(str(e), 429)
     
     except AIServiceError as e:
-        logger.error(f"AI service error | error={str(e)}")
+        logger.error("AI service error | error=%s", e)
         _audit_log_action(
-            request.headers.get('X-User-ID', 'unknown'),
+            g.user_id or 'unknown',
             'ai_service_error', 'note_interpreter',
             result='error', metadata={'error': str(e)}
         )
-        return jsonify({
-            'success': False,
-            'error': 'AI service temporarily unavailable',
-            'message': 'Please try again in a few moments',
-            'fallback': 'You can save the raw note for manual review'
-        }), 503
+        return Response(_AI_UNAVAILABLE_BODY, status=503, mimetype='application/json')
     
     except Exception as e:
-        logger.exception(f"Unexpected error in interpret_note")
+        logger.exception("Unexpected error in interpret_note")
         return _error_response('Internal server error', 500)
+    
+    finally:
+        if lock_acquired:
+            _note_lock_release(note_id)
 
 
 # ============================================================================
@@ -246,8 +382,7 @@ def interpret_note():
 # ============================================================================
 
 @ai_bp.route('/chat', methods=['POST'])
-@require_auth_token
-@require_ai_enabled
+@require(auth=True, ai=True)
 def chat():
     """
     Get chatbot response for workflow guidance.
@@ -274,24 +409,24 @@ def chat():
     - 503: Service Unavailable
     """
     try:
-        # Extract user info
-        user_role = request.headers.get('X-User-Role', '').lower()
-        user_id = request.headers.get('X-User-ID')
+        # User info from headers (parsed by @require)
+        user_role = (g.user_role or '').lower()
+        user_id = g.user_id
         
         # Parse request
-        data = request.get_json()
-        if not data:
-            return _error_response('Invalid JSON', 400)
+        body, error = _decode_body(ChatBody)
+        if error is not None:
+            return error
         
         # Extract fields
-        message = data.get('message', '').strip()
-        conversation_id = data.get('conversation_id', '').strip()
+        message = body.message.strip()
+        conversation_id = body.conversation_id.strip()
         
         # Override with request body if provided
-        if data.get('user_role'):
-            user_role = data.get('user_role', '').lower()
-        if data.get('user_id'):
-            user_id = data.get('user_id')
+        if body.user_role:
+            user_role = body.user_role.lower()
+        if body.user_id:
+            user_id = body.user_id
         
         # Validate
         if not user_role or user_role not in ['clinician', 'patient', 'admin']:
@@ -303,41 +438,25 @@ def chat():
         if not user_id:
             return _error_response('Missing user_id or X-User-ID header', 400)
         
-        logger.info(f"Chat request | conversation={conversation_id} | role={user_role}")
+        logger.info("Chat request | conversation=%s | role=%s", conversation_id, user_role)
         
-        # Get or create chat session
-        session = ChatSession.query.filter_by(conversation_id=conversation_id).first()
-        
-        if not session:
-            session = ChatSession(
-                conversation_id=conversation_id,
-                user_id=user_id,
-                user_role=user_role,
-                started_at=datetime.utcnow()
-            )
-            db.session.add(session)
-            db.session.commit()
-        
-        # Call chatbot
-        chatbot_response = circuit_breaker.call(
-            chatbot.respond,
-            user_role, message, conversation_id, user_id
+        # Every intent is answered inline from the role templates: no
+        # provider call, so no circuit breaker around it
+        intent = IntentClassifier.classify(message, user_role)
+        chatbot_response = get_chatbot().respond(
+            user_role, message, conversation_id, user_id, intent=intent
         )
         
-        # Update session
-        session.message_count += 1
-        session.updated_at = datetime.utcnow()
+        # One transaction per turn: create the session if new, store the message.
+        # message_count / updated_at are bumped by the ChatMessage insert events.
+        _ensure_chat_session(conversation_id, user_id, user_role)
         
         # Store message metadata (NOT full content)
-        from ai_service import IntentClassifier  # Reuse for consistency
-        intent = IntentClassifier.classify(message, user_role) if hasattr(IntentClassifier, 'classify') else 'general'
-        
         chat_msg = ChatMessage(
             conversation_id=conversation_id,
-            message_number=session.message_count,
             message_type='user_question',
             intent_category=intent,
-            interaction_summary=f"User asked: {message[:100]}..."
+            interaction_summary=f"User asked: {message[:100]}..." if CONFIG.STORE_CHAT_SUMMARIES else None
         )
         db.session.add(chat_msg)
         db.session.commit()
@@ -361,14 +480,14 @@ def chat():
             'disclaimer': chatbot_response.get('disclaimer', '')
         }
         
-        return jsonify(response), 200
+        return _json(response, 200)
     
     except ChatbotError as e:
-        logger.error(f"Chatbot error | error={str(e)}")
+        logger.error("Chatbot error | error=%s", e)
         return _error_response(str(e), 400)
     
     except Exception as e:
-        logger.exception(f"Unexpected error in chat endpoint")
+        logger.exception("Unexpected error in chat endpoint")
         return _error_response('Internal server error', 500)
 
 
@@ -377,7 +496,7 @@ def chat():
 # ============================================================================
 
 @ai_bp.route('/notes/<string:note_id>', methods=['GET'])
-@require_auth_token
+@require(auth=True)
 def get_note_interpretation(note_id):
     """
     Retrieve stored interpretation of a note.
@@ -391,6 +510,8 @@ def get_note_interpretation(note_id):
         "note_interpretation": {...}
     }
     
+    Responses carry an ETag; a matching If-None-Match gets 304 Not Modified.
+    
     Response (404 Not Found):
     {
         "success": false,
@@ -398,22 +519,64 @@ def get_note_interpretation(note_id):
     }
     """
     try:
-        interpretation = NoteInterpretation.query.filter_by(
-            note_id=note_id, is_deleted=False
+        include_original = request.args.get('include_original', 'false').lower() == 'true'
+        
+        # Summary-only view is served from Redis when cached
+        if not include_original:
+            cached = _note_cache_get(note_id)
+            if cached is not None:
+                etag, payload, approved = cached
+                if request.if_none_match.contains_weak(etag):
+                    return _with_validators(Response(status=304), etag, approved)
+                return _with_validators(
+                    Response(payload, status=200, mimetype='application/json'), etag, approved
+                )
+        
+        # Conditional request: compare against the validator columns alone
+        # before hydrating the row
+        if request.if_none_match:
+            validators = db.session.execute(
+                select(
+                    NoteInterpretation.id,
+                    NoteInterpretation.updated_at,
+                    NoteInterpretation.clinician_approved
+                ).where(NoteInterpretation.note_id == note_id).limit(1)
+            ).first()
+            if validators is not None:
+                etag = _note_etag(validators)
+                if request.if_none_match.contains_weak(etag):
+                    return _with_validators(Response(status=304), etag, bool(validators.clinician_approved))
+        
+        # Deferred text columns: fetch only what to_dict() will emit
+        load_options = [undefer_group('summaries')]
+        if include_original:
+            load_options.append(undefer(NoteInterpretation.original_note_text))
+        
+        interpretation = NoteInterpretation.query.options(*load_options).filter_by(
+            note_id=note_id
         ).first()
         
         if not interpretation:
-            return jsonify({
-                'success': False,
-                'error': 'Note interpretation not found'
-            }), 404
+            return _error_response('Note interpretation not found', 404)
         
-        include_original = request.args.get('include_original', 'false').lower() == 'true'
+        # Client already holds this version: skip serialization
+        etag = _note_etag(interpretation)
+        approved = bool(interpretation.clinician_approved)
+        if request.if_none_match.contains_weak(etag):
+            return _with_validators(Response(status=304), etag, approved)
         
-        return jsonify({
+        body = {
             'success': True,
             'note_interpretation': interpretation.to_dict(include_original=include_original)
-        }), 200
+        }
+        if include_original:
+            return _with_validators(_json(body, 200), etag, approved)
+        
+        payload = orjson.dumps(body, option=orjson.OPT_NON_STR_KEYS)
+        _note_cache_set(note_id, etag, payload, approved=approved)
+        return _with_validators(
+            Response(payload, status=200, mimetype='application/json'), etag, approved
+        )
     
     except Exception as e:
         logger.exception("Error retrieving interpretation")
@@ -425,8 +588,7 @@ def get_note_interpretation(note_id):
 # ============================================================================
 
 @ai_bp.route('/notes/<int:interpretation_id>/approve', methods=['POST'])
-@require_auth_token
-@require_role('clinician', 'admin')
+@require(auth=True, roles=('clinician', 'admin'))
 def approve_note_interpretation(interpretation_id):
     """
     Clinician approves and optionally edits AI interpretation.
@@ -448,45 +610,70 @@ def approve_note_interpretation(interpretation_id):
     }
     """
     try:
-        doctor_id = request.headers.get('X-User-ID', 'unknown')
-        data = request.get_json() or {}
+        doctor_id = g.user_id or 'unknown'
+        body, error = _decode_body(ApproveBody, allow_empty=True)
+        if error is not None:
+            return error
         
-        interpretation = NoteInterpretation.query.get(interpretation_id)
+        is_admin = doctor_id == 'admin'
         
-        if not interpretation:
-            return jsonify({
-                'success': False,
-                'error': 'Interpretation not found'
-            }), 404
+        # Build the whole patch up front and apply it in one UPDATE ... RETURNING
+        values = {}
+        edits = {
+            field: text for field, text in body.edits.items()
+            if text is not None and field in APPROVAL_EDITABLE_FIELDS
+        }
+        if edits:
+            values.update(edits)
+            values['clinician_edited'] = True
+            values['clinician_edits_summary'] = f"Edited {len(edits)} fields at {datetime.utcnow()}"
         
-        # Check authorization (doctor who created interpretation)
-        if interpretation.doctor_id != doctor_id and doctor_id != 'admin':
-            return jsonify({
-                'success': False,
-                'error': 'Not authorized to approve this interpretation'
-            }), 403
+        if body.approved:
+            values['clinician_approved'] = True
+            values['clinician_approved_by'] = doctor_id
+            values['clinician_approved_at'] = datetime.utcnow()
         
-        # Apply edits if provided
-        edits = data.get('edits', {})
-        if edits:
-            if 'formatted_note' in edits:
-                interpretation.formatted_note = edits['formatted_note']
-            if 'clinical_summary' in edits:
-                interpretation.clinical_summary = edits['clinical_summary']
-            if 'patient_friendly_summary' in edits:
-                interpretation.patient_friendly_summary = edits['patient_friendly_summary']
-            
-            interpretation.clinician_edited = True
-            interpretation.clinician_edits_summary = f"Edited {len(edits)} fields at {datetime.utcnow()}"
+        # Authorization is part of the WHERE (doctor who created it, or admin)
+        conditions = [
+            NoteInterpretation.id == interpretation_id,
+            NoteInterpretation.is_deleted == false()
+        ]
+        if not is_admin:
+            conditions.append(NoteInterpretation.doctor_id == doctor_id)
         
-        # Mark as approved
-        approved = data.get('approved', True)
-        if approved:
-            interpretation.clinician_approved = True
-            interpretation.clinician_approved_by = doctor_id
-            interpretation.clinician_approved_at = datetime.utcnow()
+        interpretation = db.session.execute(
+            update(NoteInterpretation)
+            .where(*conditions)
+            .values(**values)
+            .returning(NoteInterpretation)
+            .options(undefer_group('summaries'))
+        ).scalar_one_or_none()
+        
+        if interpretation is None:
+            # Nothing updated: tell "missing" apart from "not yours"
+            exists = db.session.scalar(
+                select(NoteInterpretation.id).where(NoteInterpretation.id == interpretation_id)
+            )
+            if exists is None:
+                return _error_response('Interpretation not found', 404)
+            return _error_response('Not authorized to approve this interpretation', 403)
         
+        # Serialize once, before commit expires the returned row; approved
+        # rows keep the bytes so later cache hits skip to_dict() entirely
+        note_id = interpretation.note_id
+        approved = interpretation.clinician_approved
+        note_json = _encode_note(interpretation)
+        if approved:
+            db.session.execute(
+                update(NoteInterpretation)
+                .where(NoteInterpretation.id == interpretation_id)
+                .values(cached_json=note_json, updated_at=NoteInterpretation.updated_at)
+                .execution_options(synchronize_session=False)
+            )
         db.session.commit()
+        _note_cache_delete(note_id)
+        if approved:
+            _note_result_set(note_id, _approved_note_payload(note_json))
         
         # Audit log
         _audit_log_action(
@@ -494,15 +681,15 @@ def approve_note_interpretation(interpretation_id):
             result='success',
             metadata={
                 'interpretation_id': interpretation_id,
-                'edits_made': interpretation.clinician_edited
+                'edits_made': bool(edits)
             }
         )
         
-        return jsonify({
-            'success': True,
-            'message': 'Interpretation approved and saved',
-            'interpretation': interpretation.to_dict(include_original=False)
-        }), 200
+        return Response(
+            b'{"success":true,"message":"Interpretation approved and saved","interpretation":'
+            + note_json + b'}',
+            status=200, mimetype='application/json'
+        )
     
     except Exception as e:
         logger.exception("Error approving interpretation")
@@ -529,48 +716,296 @@ def health_check():
         }
     }
     """
-    return jsonify({
+    return _json({
         'status': 'healthy',
-        'timestamp': datetime.utcnow().isoformat(),
+        'timestamp': datetime.utcnow(),
         'services': {
             'note_interpreter': 'healthy',
             'chatbot': 'healthy',
-            'ai_provider': 'openai' if AIConfig.AI_FEATURES_ENABLED else 'disabled'
+            'ai_provider': 'openai' if CONFIG.AI_FEATURES_ENABLED else 'disabled'
         },
         'circuit_breaker': circuit_breaker.get_status()
-    }), 200
+    }, 200)
 
 
 # ============================================================================
 # Helper Functions
 # ============================================================================
 
-def _error_response(message: str, status_code: int) -> Tuple[Dict, int]:
-    """Helper: return error response"""
-    return jsonify({
-        'success': False,
-        'error': message
-    }), status_code
+def _json(obj, status: int = 200) -> Response:
+    """Helper: JSON response encoded with orjson (C encoder; datetimes native)"""
+    return Response(orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS), status=status, mimetype='application/json')
+
+
+def _error_response(message: str, status_code: int) -> Response:
+    """Helper: return error response (fixed messages use pre-encoded bodies)"""
+    body = _ERROR_BODIES.get(message)
+    if body is None:
+        body = orjson.dumps({'success': False, 'error': message})
+    return Response(body, status=status_code, mimetype='application/json')
+
+
+def _stream_interpretation(interpretation_id: int, note_id: str, ai_result: Dict):
+    """Helper: POST /notes body as JSON chunks, so the first bytes go out while the rest encodes"""
+    yield b'{"success":true,"note_interpretation":{"id":%d,"note_id":' % interpretation_id
+    yield orjson.dumps(note_id)
+    for field in ('formatted_note', 'clinical_summary', 'patient_friendly_summary'):
+        yield b',"%s":' % field.encode()
+        yield orjson.dumps(ai_result[field])
+    yield b',"extracted_entities":'
+    yield orjson.dumps(ai_result['extracted_entities'], option=orjson.OPT_NON_STR_KEYS)
+    yield b',"ai_metadata":'
+    yield orjson.dumps(ai_result['ai_metadata'], option=orjson.OPT_NON_STR_KEYS)
+    yield _DISCLAIMER_TAIL
+
+
+def _ensure_chat_session(conversation_id: str, user_id, user_role: str):
+    """Helper: INSERT ... ON CONFLICT DO NOTHING the chat session (no SELECT, race-free)"""
+    insert = pg_insert if db.session.get_bind().dialect.name == 'postgresql' else sqlite_insert
+    db.session.execute(
+        insert(ChatSession)
+        .values(conversation_id=conversation_id, user_id=user_id, user_role=user_role)
+        .on_conflict_do_nothing(index_elements=['conversation_id'])
+    )
+
+
+def _decode_body(body_type: type, allow_empty: bool = False):
+    """Helper: decode the request JSON into body_type; returns (body, error_response)"""
+    raw = request.get_data(cache=False)
+    if not raw and allow_empty:
+        raw = b'{}'
+    try:
+        return msgspec.json.decode(raw, type=body_type), None
+    except msgspec.ValidationError as e:
+        return None, _error_response(f'Invalid input: {str(e)}', 400)
+    except msgspec.DecodeError:
+        return None, _error_response('Invalid JSON', 400)
+
+
+def _note_etag(interpretation) -> str:
+    """Helper: strong ETag for one version of an interpretation"""
+    return f"{interpretation.id}-{int(interpretation.updated_at.timestamp() * 1000)}"
+
+
+def _with_validators(response: Response, etag: str, approved: bool) -> Response:
+    """Helper: ETag + Cache-Control; pending interpretations must revalidate"""
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'private, max-age=3600' if approved else 'private, no-cache'
+    return response
+
+
+def _note_cache_key(note_id: str) -> str:
+    return f"ni:view:{note_id}"
+
+
+def _note_cache_get(note_id: str) -> Optional[Tuple[str, bytes, bool]]:
+    """Helper: cached GET /notes/<note_id> (etag, body, approved), or None (miss or no Redis)"""
+    redis_client = get_redis_client()
+    if redis_client is None:
+        return None
+    try:
+        etag, payload, approved = redis_client.hmget(_note_cache_key(note_id), 'etag', 'body', 'approved')
+    except Exception as e:
+        logger.warning("Note cache read failed | error=%s", e)
+        return None
+    if payload is None:
+        return None
+    return etag.decode(), payload, approved == b'1'
+
+
+def _note_cache_set(note_id: str, etag: str, payload: bytes, approved: bool):
+    """Helper: cache a GET body; approved interpretations no longer change"""
+    redis_client = get_redis_client()
+    if redis_client is None:
+        return
+    key = _note_cache_key(note_id)
+    ttl = NOTE_CACHE_APPROVED_TTL_SECONDS if approved else NOTE_CACHE_TTL_SECONDS
+    try:
+        pipe = redis_client.pipeline()
+        pipe.hset(key, mapping={'etag': etag, 'body': payload, 'approved': int(approved)})
+        pipe.expire(key, ttl)
+        pipe.execute()
+    except Exception as e:
+        logger.warning("Note cache write failed | error=%s", e)
+
+
+def _note_cache_delete(note_id: str):
+    """Helper: drop the cached GET body after the interpretation changed"""
+    redis_client = get_redis_client()
+    if redis_client is None:
+        return
+    try:
+        redis_client.delete(_note_cache_key(note_id))
+    except Exception as e:
+        logger.warning("Note cache invalidation failed | error=%s", e)
+
+
+def _encode_note(interpretation: NoteInterpretation) -> bytes:
+    """Helper: summary view (to_dict(include_original=False)) as JSON bytes"""
+    return orjson.dumps(interpretation.to_dict(include_original=False), option=orjson.OPT_NON_STR_KEYS)
+
+
+def _approved_note_payload(note_json: bytes) -> bytes:
+    """Helper: POST /notes body for an already-approved interpretation"""
+    return (
+        b'{"success":true,"note_interpretation":' + note_json
+        + b',"message":"Cached interpretation (already approved)"}'
+    )
+
+
+def _note_result_get(note_id: str) -> Optional[bytes]:
+    """Helper: cached POST /notes body of an approved interpretation, or None"""
+    redis_client = get_redis_client()
+    if redis_client is None:
+        return None
+    try:
+        return redis_client.get(f"ni:result:{note_id}")
+    except Exception as e:
+        logger.warning("Note result read failed | error=%s", e)
+        return None
+
+
+def _note_result_set(note_id: str, payload: bytes):
+    """Helper: record an approved interpretation for O(1) duplicate checks"""
+    redis_client = get_redis_client()
+    if redis_client is None:
+        return
+    try:
+        redis_client.set(f"ni:result:{note_id}", payload, ex=NOTE_CACHE_APPROVED_TTL_SECONDS)
+    except Exception as e:
+        logger.warning("Note result write failed | error=%s", e)
+
+
+def _note_lock_acquire(note_id: str, owner: str) -> bool:
+    """Helper: SET NX the in-flight lock for a note (always granted without Redis)"""
+    redis_client = get_redis_client()
+    if redis_client is None:
+        return True
+    try:
+        return bool(redis_client.set(f"ni:lock:{note_id}", owner, nx=True, ex=NOTE_LOCK_TTL_SECONDS))
+    except Exception as e:
+        logger.warning("Note lock failed | error=%s", e)
+        return True
+
+
+def _note_lock_release(note_id: str):
+    """Helper: release the in-flight lock once the submission finished"""
+    redis_client = get_redis_client()
+    if redis_client is None:
+        return
+    try:
+        redis_client.delete(f"ni:lock:{note_id}")
+    except Exception as e:
+        logger.warning("Note lock release failed | error=%s", e)
+
+
+@lru_cache(maxsize=4096)
+def _audit_actor(user_id) -> Optional[str]:
+    """Helper: audit form of a user id (numeric ids hashed), memoized per id"""
+    if isinstance(user_id, (int, str)) and str(user_id).isdigit():
+        return SecurityUtils.hash_user_id(int(user_id))
+    return user_id
 
 
 def _audit_log_action(user_id: str, action: str, service: str,
                       result: str = 'unknown', metadata: Optional[Dict] = None):
-    """Helper: log action for audit trail"""
-    if not AIConfig.AUDIT_LOGGING_ENABLED:
+    """Helper: queue action for audit trail (written behind in batches)"""
+    if not CONFIG.AUDIT_LOGGING_ENABLED:
+        return
+    
+    if _audit_app is None:
+        _start_audit_writer(current_app._get_current_object())
+    
+    _audit_queue.put_nowait({
+        'user_id_hash': _audit_actor(user_id),
+        'action': action,
+        'ai_service': service,
+        'result': result,
+        'context': metadata or {},
+        'action_timestamp': datetime.utcnow()
+    })
+
+
+def _start_audit_writer(app):
+    """Helper: start the audit writer thread once, bound to the app"""
+    global _audit_app, _audit_writer
+    with _audit_start_lock:
+        if _audit_app is not None:
+            return
+        _audit_app = app
+    _audit_writer = threading.Thread(target=_audit_writer_loop, name='ai-audit-writer', daemon=True)
+    _audit_writer.start()
+    atexit.register(_flush_audit_buffer_on_exit)
+
+
+def _drain_audit_queue(max_rows: int, timeout: Optional[float]) -> Tuple[List[Dict], bool]:
+    """
+    Helper: take up to max_rows queued audit rows.
+    
+    Blocks for the first row, then keeps collecting until max_rows or
+    `timeout` seconds after it; timeout=None takes only what is queued now.
+    
+    Returns:
+        Tuple: (rows, stop_requested)
+    """
+    rows = []
+    deadline = None
+    while len(rows) < max_rows:
+        try:
+            if timeout is None:
+                row = _audit_queue.get_nowait()
+            elif deadline is None:
+                row = _audit_queue.get()  # Idle: wait for the first row
+            else:
+                row = _audit_queue.get(timeout=max(0.0, deadline - time.monotonic()))
+        except queue.Empty:
+            break
+        if row is _AUDIT_STOP:
+            return rows, True
+        rows.append(row)
+        if deadline is None and timeout is not None:
+            deadline = time.monotonic() + timeout
+    return rows, False
+
+
+def _audit_writer_loop():
+    """Helper: write queued audit rows in batches until shutdown"""
+    stop = False
+    while not stop:
+        rows, stop = _drain_audit_queue(AUDIT_BATCH_SIZE, AUDIT_FLUSH_INTERVAL_SECONDS)
+        # Own app context, so its own session: never commits request state
+        with _audit_app.app_context():
+            _write_audit_rows(rows)
+
+
+def _write_audit_rows(rows: List[Dict]):
+    """Helper: bulk-insert audit rows in a single transaction"""
+    if not rows:
         return
     
     try:
-        audit_log = AIAuditLog(
-            user_id_hash=SecurityUtils.hash_user_id(int(user_id)) if isinstance(user_id, (int, str)) and str(user_id).isdigit() else user_id,
-            action=action,
-            ai_service=service,
-            result=result,
-            context=metadata or {}
-        )
-        db.session.add(audit_log)
+        db.session.bulk_insert_mappings(AIAuditLog, rows)
         db.session.commit()
     except Exception as e:
-        logger.warning(f"Failed to log audit action | error={str(e)}")
+        db.session.rollback()
+        logger.warning("Failed to log audit actions | count=%s | error=%s", len(rows), e)
+
+
+def _flush_audit_buffer():
+    """Helper: write every audit row queued right now (needs an app context)"""
+    while True:
+        rows, _ = _drain_audit_queue(AUDIT_BATCH_SIZE, None)
+        if not rows:
+            return
+        _write_audit_rows(rows)
+
+
+def _flush_audit_buffer_on_exit():
+    """Helper: stop the writer (it commits its batch), then write leftovers"""
+    _audit_queue.put(_AUDIT_STOP)
+    _audit_writer.join(timeout=5)
+    with _audit_app.app_context():
+        _flush_audit_buffer()
 
 
 # ============================================================================
@@ -580,20 +1015,14 @@ def _audit_log_action(user_id: str, action: str, service: str,
 @ai_bp.errorhandler(404)
 def not_found(error):
     """Handle 404 errors"""
-    return jsonify({
-        'success': False,
-        'error': 'Endpoint not found'
-    }), 404
+    return _error_response('Endpoint not found', 404)
 
 
 @ai_bp.errorhandler(500)
 def internal_error(error):
     """Handle 500 errors"""
     logger.exception("Internal server error")
-    return jsonify({
-        'success': False,
-        'error': 'Internal server error'
-    }), 500
+    return _error_response('Internal server error', 500)
 
 
 # Export blueprint
@@ -16,12 +16,19 @@ Production Features:
 
 import os
 import re
-import json
+import asyncio
 import logging
 import hashlib
-from typing import Dict, List, Optional, Tuple
+import threading
+import time
+from collections import OrderedDict, defaultdict, deque
+from concurrent.futures import Future
+from typing import Dict, List, Optional, Tuple, Union
 from datetime import datetime, timedelta
-from functools import wraps
+from functools import lru_cache, wraps
+
+import httpx
+import orjson
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -44,6 +51,166 @@ class AIServiceError(Exception):
     pass
 
 
+class ProviderRateLimitError(AIServiceError):
+    """Raised when the AI provider answers HTTP 429 (retried with backoff)"""
+    pass
+
+
+# Pre-compiled PHI patterns
+# Phone numbers: 555-1234, 555.1234, 555 1234
+_PHONE_RE = re.compile(r'\b\d{3}[-.\s]?\d{3}[-.\s]?\d{4}\b')
+# SSN: 123-45-6789
+_SSN_RE = re.compile(r'\b\d{3}-\d{2}-\d{4}\b')
+# Dates: MM/DD/YYYY, DD/MM/YYYY, M/D/YY (one separator per pattern)
+_DATE_SLASH_RE = re.compile(r'\b\d{1,2}/\d{1,2}/\d{2,4}\b')
+_DATE_DASH_RE = re.compile(r'\b\d{1,2}-\d{1,2}-\d{2,4}\b')
+# Email addresses: person@domain.com
+_EMAIL_RE = re.compile(r'\b\S+@\S+\.\S+\b')
+# Medical Record Numbers (9+ consecutive digits)
+_ID_RE = re.compile(r'\b\d{9,}\b')
+# MRN pattern: MRN123456 or MRN-123456
+_MRN_RE = re.compile(r'\bMRN[-\s]?\d{6,}\b', re.IGNORECASE)
+# Account numbers (similar pattern)
+_ACCOUNT_RE = re.compile(r'\bAccount\s*[-#]?\s*\d{6,}\b', re.IGNORECASE)
+
+# (pattern, replacement), applied one after another in this order. Earlier
+# patterns take priority: a fused alternation would let an earlier-starting
+# date or email match swallow part of a phone number or SSN.
+_PHI_PATTERNS = (
+    (_PHONE_RE, '[PHONE]'),
+    (_SSN_RE, '[SSN]'),
+    (_DATE_SLASH_RE, '[DATE]'),
+    (_DATE_DASH_RE, '[DATE]'),
+    (_EMAIL_RE, '[EMAIL]'),
+    (_ID_RE, '[ID]'),
+    (_MRN_RE, '[MRN]'),
+    (_ACCOUNT_RE, '[ACCOUNT]'),
+)
+
+
+# Control characters (tab/newline/CR allowed) and lone surrogates, rejected by validate_input
+_INVALID_CHAR_RE = re.compile(r'[\x00-\x08\x0b\x0c\x0e-\x1f\ud800-\udfff]')
+
+# Entity keywords for NoteInterpreter._extract_entities (matched as substrings)
+_SYMPTOM_KEYWORDS = ('cough', 'fever', 'pain', 'headache', 'nausea', 'dyspnea', 'chest pain', 'shortness of breath')
+_DIAGNOSIS_KEYWORDS = ('pneumonia', 'bronchitis', 'asthma', 'diabetes', 'hypertension', 'uri', 'viral')
+_KEYWORD_CATEGORY = {
+    **{kw: 'symptoms' for kw in _SYMPTOM_KEYWORDS},
+    **{kw: 'diagnoses' for kw in _DIAGNOSIS_KEYWORDS},
+}
+# Zero-width lookahead so overlapping keywords ("chest pain" / "pain") are
+# all reported from a single scan; longest first wins at a shared start.
+# Case-insensitive so summaries are scanned as-is, without lowercased copies.
+_KEYWORD_RE = re.compile('(?=({}))'.format(
+    '|'.join(re.escape(kw) for kw in sorted(_KEYWORD_CATEGORY, key=len, reverse=True))
+), re.IGNORECASE | re.ASCII)
+
+_SPO2_RE = re.compile(r'spo2[:\s]+(\d+%?)', re.IGNORECASE)
+_BP_RE = re.compile(r'bp[:\s]*(\d+/\d+)', re.IGNORECASE)
+_HR_RE = re.compile(r'hr[:\s]*(\d+)', re.IGNORECASE)
+
+
+@lru_cache(maxsize=None)
+def _get_token_encoder(model_version: str):
+    """
+    tiktoken encoding for model_version (cl100k_base for unknown models),
+    or None if tiktoken or its BPE file is unavailable.
+    
+    tiktoken downloads a missing BPE file on first use, which would stall
+    the first request in a fresh container; the file is warmed into
+    TIKTOKEN_CACHE_DIR at build time (tools/warm_token_cache.py) and is
+    never fetched here.
+    """
+    cache_dir = os.getenv('TIKTOKEN_CACHE_DIR')
+    if not cache_dir or not os.path.isdir(cache_dir) or not os.listdir(cache_dir):
+        logger.warning(
+            "TIKTOKEN_CACHE_DIR is not warmed (run tools/warm_token_cache.py at build time), "
+            "estimating 4 characters per token | cache_dir=%s", cache_dir
+        )
+        return None
+    try:
+        import tiktoken  # Optional: falls back to a character-based estimate
+        try:
+            return tiktoken.encoding_for_model(model_version)
+        except KeyError:
+            return tiktoken.get_encoding('cl100k_base')
+    except Exception as e:
+        logger.warning("Token encoder unavailable, estimating 4 characters per token | error=%s", e)
+        return None
+
+
+# System prompts, sent byte-identical on every call so the providers'
+# prompt caching can reuse the shared prefix (OpenAI caches automatically;
+# Anthropic calls mark it with cache_control). Any edit here invalidates
+# those caches, and NoteInterpreter's result cache, on the next deploy.
+_SYSTEM_PROMPT = """You are an expert clinical documentation specialist. Your task is to:
+
+1. Read unstructured clinical notes
+2. Provide three versions:
+   a) "formatted": Clean, structured markdown with sections (Chief Complaint, HPI, Physical Exam, Assessment, Plan, etc.)
+   b) "clinical": Concise summary for clinician handoff/audit (2-3 sentences)
+   c) "patient_friendly": Simplified explanation for patient understanding (using plain language)
+
+3. Always respond with valid JSON in this format:
+{
+    "formatted": "...",
+    "clinical": "...",
+    "patient_friendly": "..."
+}
+
+IMPORTANT:
+- Preserve medical accuracy
+- Never add information not in the original note
+- For patient firendly: use layman's terms, explain medical jargon
+- Maintain HIPAA compliance: note may be de-identified, do not invent PHI
+
+EXAMPLE INPUT (de-identified):
+"Pt presents w/ persistent cough x3wks, denies fever. Lungs clear on exam. SPO2 98% RA. CXR normal."
+
+EXAMPLE OUTPUT:
+{
+    "formatted": "**Chief Complaint:** Persistent cough\\n**Duration:** 3 weeks\\n**Associated Symptoms:** Denies fever\\n**Physical Exam:** Lungs clear to auscultation bilaterally\\n**Diagnostic Tests:** CXR normal\\n**Vitals:** SpO2 98% on room air",
+    "clinical": "3-week persistent dry cough without fever. Clear lungs on exam, normal oxygenation, normal CXR. Likely viral URI or environmental irritant.",
+    "patient_friendly": "You've had a dry cough for 3 weeks without fever. Your lungs sound clear and your oxygen is normal. Your chest X-ray looks good. This is likely from a cold or something in the air."
+}"""
+
+_BATCHED_SYSTEM_PROMPT = _SYSTEM_PROMPT + """
+
+BATCHED INPUT:
+When several notes are given, numbered [1], [2], ..., respond with one JSON object
+{"notes": [...]} whose array holds one output object (format above) per input note,
+in the same order. Each output object must also carry "index": n, the number of
+the note it interprets. Interpret each note independently."""
+
+
+# Stub provider output (no API key / providers not wired up), serialized once
+_MOCK_RESPONSE = orjson.dumps({
+    'formatted': '**Chief Complaint:** Persistent cough\n**Duration:** 3 weeks\n**Associated Symptoms:** Denies fever\n**Physical Exam:** Lungs clear on auscultation\n**Vitals:** SpO2 98% on room air',
+    'clinical': 'Patient with 3-week history of dry cough. No fever. Clear lung fields on exam. Normal oxygenation. Differential includes URI sequelae, environmental irritant, or early viral bronchitis. Recommend monitoring, consider allergy workup if persistent.',
+    'patient_friendly': 'You have had a dry cough for 3 weeks without fever. When we listened to your lungs, they sounded clear and your oxygen levels are normal. We should monitor this and see if it helps with rest and time. If it continues, we may do more tests.'
+}).decode()
+
+# Provider calls run on one long-lived event loop in a daemon thread, so
+# async SDK clients and their connection pools outlive any single request
+# (async Flask views get a fresh loop per request).
+_provider_loop: Optional[asyncio.AbstractEventLoop] = None
+_provider_loop_lock = threading.Lock()
+
+
+def _get_provider_loop() -> asyncio.AbstractEventLoop:
+    global _provider_loop
+    with _provider_loop_lock:
+        if _provider_loop is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name='ai-provider-loop', daemon=True).start()
+            _provider_loop = loop
+    return _provider_loop
+
+
+def _run_on_provider_loop(coro) -> Future:
+    return asyncio.run_coroutine_threadsafe(coro, _get_provider_loop())
+
+
 class PHIFilter:
     """
     De-identify and sanitize data before sending to external AI.
@@ -69,51 +236,61 @@ class PHIFilter:
             De-identified text safe to send to external AI
         """
         result = text
-        
-        # Phone numbers: 555-1234, 555.1234, 555 1234
-        result = re.sub(r'\b\d{3}[-.\s]?\d{3}[-.\s]?\d{4}\b', '[PHONE]', result)
-        
-        # SSN: 123-45-6789
-        result = re.sub(r'\b\d{3}-\d{2}-\d{4}\b', '[SSN]', result)
-        
-        # Dates: MM/DD/YYYY, DD/MM/YYYY, M/D/YY
-        result = re.sub(r'\b\d{1,2}/\d{1,2}/\d{2,4}\b', '[DATE]', result)
-        result = re.sub(r'\b\d{1,2}-\d{1,2}-\d{2,4}\b', '[DATE]', result)
-        
-        # Email addresses: person@domain.com
-        result = re.sub(r'\b\S+@\S+\.\S+\b', '[EMAIL]', result)
-        
-        # Medical Record Numbers (9+ consecutive digits)
-        result = re.sub(r'\b\d{9,}\b', '[ID]', result)
-        
-        # MRN pattern: MRN123456 or MRN-123456
-        result = re.sub(r'\bMRN[-\s]?\d{6,}\b', '[MRN]', result, flags=re.IGNORECASE)
-        
-        # Account numbers (similar pattern)
-        result = re.sub(r'\bAccount\s*[-#]?\s*\d{6,}\b', '[ACCOUNT]', result, flags=re.IGNORECASE)
-        
+        for pattern, replacement in _PHI_PATTERNS:
+            result = pattern.sub(replacement, result)
         return result
 
 
 class RateLimiter:
     """
-    Simple in-memory rate limiter.
-    In production, use Redis for distributed rate limiting across multiple servers.
+    Sliding-window rate limiter.
+    
+    With a Redis client, request timestamps live in sorted sets shared by
+    all workers (rl:note:{user_id} plus rl:note:global), and prune, count
+    and record happen in one atomic Lua script per check. Without Redis,
+    or if it is unreachable, falls back to in-memory per-user windows.
     
     Rate limits: 10 requests per hour per clinician, 100 per hour global.
     """
     
-    def __init__(self, user_limit: int = 10, window_seconds: int = 3600):
+    # KEYS[1] = user zset, KEYS[2] = global zset
+    # ARGV[1] = window start, ARGV[2] = now, ARGV[3] = user limit,
+    # ARGV[4] = window (seconds), ARGV[5] = global limit, ARGV[6] = member
+    # Returns {allowed, remaining}
+    LUA_SCRIPT = """
+    redis.call('ZREMRANGEBYSCORE', KEYS[1], 0, ARGV[1])
+    redis.call('ZREMRANGEBYSCORE', KEYS[2], 0, ARGV[1])
+    local c = redis.call('ZCARD', KEYS[1])
+    local g = redis.call('ZCARD', KEYS[2])
+    if c < tonumber(ARGV[3]) and g < tonumber(ARGV[5]) then
+        redis.call('ZADD', KEYS[1], ARGV[2], ARGV[6])
+        redis.call('ZADD', KEYS[2], ARGV[2], ARGV[6])
+        redis.call('EXPIRE', KEYS[1], ARGV[4])
+        redis.call('EXPIRE', KEYS[2], ARGV[4])
+        return {1, tonumber(ARGV[3]) - c - 1}
+    end
+    return {0, 0}
+    """
+    
+    def __init__(self, user_limit: int = 10, window_seconds: int = 3600,
+                 global_limit: int = 100, redis_client=None):
         """
         Initialize rate limiter.
         
         Args:
             user_limit: Max requests per user per window
             window_seconds: Time window in seconds (default: 1 hour)
+            global_limit: Max requests across all users per window (Redis only)
+            redis_client: Optional redis.Redis instance for shared limits
         """
         self.user_limit = user_limit
         self.window_seconds = window_seconds
-        self.requests = {}  # user_id → [timestamp1, timestamp2, ...]
+        self.global_limit = global_limit
+        self.requests = defaultdict(deque)  # user_id → deque([timestamp1, timestamp2, ...])
+        self._next_sweep = 0.0
+        self.redis = redis_client
+        # register_script issues EVALSHA and loads the script on first NOSCRIPT
+        self._script = redis_client.register_script(self.LUA_SCRIPT) if redis_client is not None else None
     
     def check(self, user_id: str) -> Tuple[bool, int]:
         """
@@ -125,31 +302,97 @@ class RateLimiter:
         Returns:
             Tuple: (is_allowed, requests_remaining)
         """
-        now = datetime.utcnow().timestamp()
+        if self._script is not None:
+            now = time.time()
+            try:
+                allowed, remaining = self._script(
+                    keys=[f"rl:note:{user_id}", "rl:note:global"],
+                    args=[now - self.window_seconds, now, self.user_limit,
+                          self.window_seconds, self.global_limit, f"{now}:{os.urandom(4).hex()}"]
+                )
+                return bool(allowed), int(remaining)
+            except Exception as e:
+                logger.warning("Redis rate limiter unavailable, using in-process limits | error=%s", e)
+        
+        now = time.monotonic()
         window_start = now - self.window_seconds
         
-        # Initialize if needed
-        if user_id not in self.requests:
-            self.requests[user_id] = []
+        # Once per window, drop users with no requests left in it
+        if now >= self._next_sweep:
+            self._next_sweep = now + self.window_seconds
+            for stale in [uid for uid, dq in self.requests.items() if not dq or dq[-1] <= window_start]:
+                del self.requests[stale]
         
-        # Remove timestamps outside current window
-        self.requests[user_id] = [
-            ts for ts in self.requests[user_id] if ts > window_start
-        ]
+        # Remove timestamps outside current window (appended in order, so oldest first)
+        dq = self.requests[user_id]
+        while dq and dq[0] <= window_start:
+            dq.popleft()
         
         # Check if under limit
-        current_count = len(self.requests[user_id])
+        current_count = len(dq)
         requests_remaining = self.user_limit - current_count
         
         if current_count < self.user_limit:
             # Still under limit, record this request
-            self.requests[user_id].append(now)
+            dq.append(now)
             return True, requests_remaining - 1
         
         # Over limit
         return False, 0
 
 
+class AsyncThrottle:
+    """
+    Request/token budget for provider calls, after the OpenAI cookbook's
+    api_request_parallel_processor: capacity refills continuously at
+    max_requests_per_minute/60 and max_tokens_per_minute/60 per second, and
+    acquire() waits until both budgets cover the next call.
+    
+    Not thread-safe; use from a single event loop (the provider loop).
+    """
+    
+    def __init__(self, max_requests_per_minute: int, max_tokens_per_minute: int):
+        self.max_requests_per_minute = max_requests_per_minute
+        self.max_tokens_per_minute = max_tokens_per_minute
+        self.available_request_capacity = float(max_requests_per_minute)
+        self.available_token_capacity = float(max_tokens_per_minute)
+        self._last_update = time.monotonic()
+    
+    def _refill(self):
+        now = time.monotonic()
+        elapsed = now - self._last_update
+        self._last_update = now
+        self.available_request_capacity = min(
+            self.available_request_capacity + elapsed * self.max_requests_per_minute / 60,
+            self.max_requests_per_minute
+        )
+        self.available_token_capacity = min(
+            self.available_token_capacity + elapsed * self.max_tokens_per_minute / 60,
+            self.max_tokens_per_minute
+        )
+    
+    async def acquire(self, estimated_tokens: int):
+        """
+        Wait until one request and estimated_tokens are available, then spend them.
+        
+        Args:
+            estimated_tokens: Prompt + max completion tokens for the call
+        """
+        tokens = min(estimated_tokens, self.max_tokens_per_minute)
+        while True:
+            self._refill()
+            if self.available_request_capacity >= 1 and self.available_token_capacity >= tokens:
+                self.available_request_capacity -= 1
+                self.available_token_capacity -= tokens
+                return
+            
+            await asyncio.sleep(max(
+                (1 - self.available_request_capacity) * 60 / self.max_requests_per_minute,
+                (tokens - self.available_token_capacity) * 60 / self.max_tokens_per_minute,
+                0.01
+            ))
+
+
 class NoteInterpreter:
     """
     Main class: Interpret unstructured clinical notes using external AI.
@@ -168,23 +411,72 @@ class NoteInterpreter:
     - anthropic (Claude 3)
     """
     
-    def __init__(self):
-        """Initialize Note Interpreter with config from environment"""
+    MAX_NOTE_TOKENS = 2000
+    MAX_NOTE_CHARS = MAX_NOTE_TOKENS * 8  # No real note averages under 8 characters per token
+    NOTE_COMPLETION_TOKENS = 1500  # Completion budget per note
+    MAX_PACKED_COMPLETION_TOKENS = 4096
+    # Notes per packed provider request: only as many as get a full per-note
+    # budget, since a truncated pack is retried one note at a time
+    MAX_PACKED_NOTES = MAX_PACKED_COMPLETION_TOKENS // NOTE_COMPLETION_TOKENS
+    RESULT_CACHE_SIZE = 1024  # In-process entries when Redis is not configured
+    RESULT_CACHE_TTL_SECONDS = 86400
+    
+    def __init__(self, http=None, redis=None, breaker=None):
+        """
+        Initialize Note Interpreter with config from environment.
+        
+        Args:
+            http: Shared httpx.Client for the sync provider SDKs (Batch API
+                  path; keep-alive, HTTP/2); None lets each SDK create its own
+            redis: Optional redis.Redis client so rate limits and cached
+                   results are shared across workers; None keeps them in-process
+            breaker: Optional circuit breaker with call_async() (e.g.
+                     ai_config.AsyncCircuitBreaker) guarding provider calls
+        """
+        self.http = http
+        self.breaker = breaker
+        self._async_http = None  # Created on first use, on the provider loop
         self.model_version = os.getenv('AI_MODEL_VERSION', 'gpt-4-turbo-2024-04')
         self.ai_provider = os.getenv('AI_PROVIDER', 'openai')
         self.api_key = os.getenv('AI_API_KEY')
         self.api_timeout = int(os.getenv('AI_API_TIMEOUT', '15'))  # seconds
-        self.rate_limiter = RateLimiter()
+        self.rate_limiter = RateLimiter(redis_client=redis)
+        self._encoder = _get_token_encoder(self.model_version)
+        # Prompt token counts for throttle estimates, keyed by batched
+        self._system_prompt_tokens = {
+            False: self.count_tokens(_SYSTEM_PROMPT),
+            True: self.count_tokens(_BATCHED_SYSTEM_PROMPT),
+        }
+        
+        # Provider-side limits: keep up to max_concurrent calls in flight
+        # without tripping the provider's RPM/TPM quota
+        self.max_concurrent = int(os.getenv('AI_MAX_CONCURRENT', '10'))
+        self.max_attempts = int(os.getenv('AI_MAX_ATTEMPTS', '5'))
+        self.throttle = AsyncThrottle(
+            max_requests_per_minute=int(os.getenv('AI_MAX_REQUESTS_PER_MINUTE', '500')),
+            max_tokens_per_minute=int(os.getenv('AI_MAX_TOKENS_PER_MINUTE', '150000'))
+        )
+        self._semaphore = asyncio.Semaphore(self.max_concurrent)
+        
+        # Interpretations of identical de-identified text are reused (Redis
+        # when available, else an in-process LRU). The prefix covers
+        # provider, model and prompt, so changing any of them misses.
+        self.redis = redis
+        self._result_cache = OrderedDict()
+        self._result_cache_prefix = hashlib.blake2b(
+            f"{self.ai_provider}\0{self.model_version}\0{self._get_system_prompt()}".encode(),
+            digest_size=16
+        ).digest()
         
         if not self.api_key:
             logger.warning("AI_API_KEY not set. AI features will be disabled.")
         
-        logger.info(f"NoteInterpreter initialized | provider={self.ai_provider} | model={self.model_version}")
+        logger.info("NoteInterpreter initialized | provider=%s | model=%s", self.ai_provider, self.model_version)
     
     def interpret_note(self, note_id: str, raw_text: str, 
                        patient_id: int, doctor_id: str) -> Dict:
         """
-        Main entry point: Interpret a clinical note.
+        Main entry point: Interpret a clinical note (blocks until done).
         
         Args:
             note_id: Unique identifier for the note (e.g., "NOTE-2026-02-26-001")
@@ -205,73 +497,421 @@ class NoteInterpreter:
             RateLimitError: If doctor has exceeded rate limit
             AIServiceError: If AI provider returns error
         """
-        try:
-            # Step 1: Validate input
-            self.validate_input(raw_text)
-            logger.info(f"Input validation passed | note_id={note_id}")
-            
-            # Step 2: Check rate limit
-            allowed, remaining = self.rate_limiter.check(doctor_id)
-            if not allowed:
-                logger.warning(f"Rate limit exceeded | doctor={doctor_id}")
-                raise RateLimitError(
-                    f"Rate limit exceeded. Max 10 requests per hour. Please try again later."
+        return _run_on_provider_loop(
+            self._interpret_note(note_id, raw_text, patient_id, doctor_id)
+        ).result()
+    
+    async def interpret_note_async(self, note_id: str, raw_text: str,
+                                   patient_id: int, doctor_id: str) -> Dict:
+        """
+        Async entry point for async views (same arguments/result as interpret_note).
+        
+        Awaits the pipeline on the provider loop, so callers can
+        asyncio.gather() several notes from any event loop.
+        """
+        return await asyncio.wrap_future(_run_on_provider_loop(
+            self._interpret_note(note_id, raw_text, patient_id, doctor_id)
+        ))
+    
+    def interpret_notes(self, notes: List[Tuple[str, str, int, str]]) -> List:
+        """
+        Interpret several notes in one call (MicroBatcher entry point).
+        
+        Up to MAX_PACKED_NOTES notes share one provider request (one
+        system prompt, one RPM slot); larger batches run as concurrent packs.
+        
+        Args:
+            notes: (note_id, raw_text, patient_id, doctor_id) tuples
+        
+        Returns:
+            One interpret_note() result per note, in order; a note that
+            failed gets its exception in its slot instead.
+        
+        Raises:
+            AIServiceError: If every note failed with a provider error, so a
+                            circuit breaker around this call sees the outage
+        """
+        results = _run_on_provider_loop(self._interpret_notes(notes)).result()
+        
+        if results and all(isinstance(r, AIServiceError) for r in results):
+            raise results[0]
+        return results
+    
+    async def _interpret_notes(self, notes: List[Tuple[str, str, int, str]]) -> List:
+        """
+        interpret_note() pipeline for several notes; runs on the provider loop.
+        
+        Notes that are not cached are packed MAX_PACKED_NOTES at a time into
+        one provider request; the packs run concurrently.
+        """
+        results: List = [None] * len(notes)
+        pending = []  # (slot, note_id, patient_id, doctor_id, de_identified, cache_key)
+        for slot, (note_id, raw_text, patient_id, doctor_id) in enumerate(notes):
+            try:
+                de_identified, cache_key, cached = self._prepare_note(note_id, raw_text, patient_id, doctor_id)
+            except Exception as e:
+                results[slot] = self._note_error(e)
+                continue
+            if cached is not None:
+                results[slot] = cached
+            else:
+                pending.append((slot, note_id, patient_id, doctor_id, de_identified, cache_key))
+        
+        packs = [pending[i:i + self.MAX_PACKED_NOTES] for i in range(0, len(pending), self.MAX_PACKED_NOTES)]
+        for pack, pack_results in zip(packs, await asyncio.gather(*(self._interpret_pack(pack) for pack in packs))):
+            for (slot, *_), result in zip(pack, pack_results):
+                results[slot] = result
+        return results
+    
+    async def _interpret_note(self, note_id: str, raw_text: str,
+                              patient_id: int, doctor_id: str) -> Dict:
+        """interpret_note() pipeline; runs on the provider loop"""
+        result, = await self._interpret_notes([(note_id, raw_text, patient_id, doctor_id)])
+        if isinstance(result, Exception):
+            raise result
+        return result
+    
+    def _prepare_note(self, note_id: str, raw_text: str, patient_id: int,
+                      doctor_id: str) -> Tuple[str, str, Optional[Dict]]:
+        """Steps 1-5 up to the provider call: (de_identified, cache_key, cached result or None)"""
+        # Step 1: Validate input
+        token_count = self.validate_input(raw_text)
+        logger.info("Input validation passed | note_id=%s", note_id)
+        
+        # Step 2: Check rate limit
+        allowed, remaining = self.rate_limiter.check(doctor_id)
+        if not allowed:
+            logger.warning("Rate limit exceeded | doctor=%s", doctor_id)
+            raise RateLimitError(
+                f"Rate limit exceeded. Max 10 requests per hour. Please try again later."
+            )
+        
+        # Step 3: De-identify before sending to AI
+        de_identified = PHIFilter.de_identify_text(raw_text)
+        logger.debug("Note de-identified | original_len=%d | de_id_len=%d", len(raw_text), len(de_identified))
+        
+        # Step 4: Audit log request
+        self._audit_log_request(
+            action='note_interpretation_requested',
+            doctor_id=doctor_id,
+            patient_id_hash=self._hash_id(patient_id),
+            metadata={'note_length': len(raw_text), 'token_count': token_count}
+        )
+        
+        # Step 5: Reuse a cached interpretation of the same text
+        cache_key = self._result_cache_key(de_identified)
+        cached = self._result_cache_get(cache_key)
+        if cached is None:
+            return de_identified, cache_key, None
+        
+        parsed, entities = cached
+        logger.info("AI result cache hit | note_id=%s", note_id)
+        timestamp = datetime.utcnow().isoformat()
+        self._audit_log_success(
+            action='note_interpretation_completed',
+            doctor_id=doctor_id,
+            patient_id_hash=self._hash_id(patient_id),
+            metadata={
+                'model': self.model_version,
+                'cache_hit': True,
+                'entities_found': len(entities.get('symptoms', []))
+            },
+            timestamp=timestamp
+        )
+        return de_identified, cache_key, self._format_result(parsed, entities, timestamp)
+    
+    async def _interpret_pack(self, pack: List[Tuple]) -> List:
+        """Steps 5-9 for a pack of prepared notes sharing one provider request"""
+        if len(pack) > 1:
+            try:
+                ai_response = await self._call_ai_provider(
+                    self._pack_notes([p[4] for p in pack]), count=len(pack)
                 )
+                items = self._split_packed_response(ai_response, len(pack))
+            except Exception as e:
+                error = self._note_error(e)
+                return [error] * len(pack)
             
-            # Step 3: De-identify before sending to AI
-            de_identified = PHIFilter.de_identify_text(raw_text)
-            logger.debug(f"Note de-identified | original_len={len(raw_text)} | de_id_len={len(de_identified)}")
+            if items is not None:
+                logger.info("AI response received | notes=%d | length=%d", len(pack), len(ai_response))
+                return [
+                    self._build_result(patient_id, doctor_id, self._require_keys(item),
+                                       len(ai_response), cache_key=cache_key)
+                    for (_, _, patient_id, doctor_id, _, cache_key), item in zip(pack, items)
+                ]
+            logger.warning("Packed AI response did not match %d notes; retrying one note per request", len(pack))
+        
+        return await asyncio.gather(*(self._interpret_single(*p[1:]) for p in pack))
+    
+    async def _interpret_single(self, note_id: str, patient_id: int, doctor_id: str,
+                                de_identified: str, cache_key: str):
+        """Steps 5-9 for one prepared note; returns the result or the error"""
+        try:
+            ai_response = await self._call_ai_provider(de_identified)
+            logger.info("AI response received | note_id=%s | length=%d", note_id, len(ai_response))
             
-            # Step 4: Audit log request
+            # Steps 6-9: Parse, extract entities, audit, format
+            return self._build_result(patient_id, doctor_id, self._parse_ai_response(ai_response),
+                                      len(ai_response), cache_key=cache_key)
+        except Exception as e:
+            return self._note_error(e)
+    
+    @staticmethod
+    def _note_error(e: Exception) -> Exception:
+        """Log a failed note; anything unexpected is reported as AIServiceError"""
+        if isinstance(e, (ValidationError, RateLimitError, AIServiceError)):
+            logger.error("Interpretation failed | error=%s", e)
+            return e
+        logger.exception("Unexpected error in interpret_note")
+        return AIServiceError(f"Internal error: {str(e)}")
+    
+    def _build_result(self, patient_id: int, doctor_id: str, parsed: Dict,
+                      response_length: int, cache_key: Optional[str] = None) -> Dict:
+        """Turn parsed provider output into the interpret_note() result"""
+        # Step 7: Extract entities
+        entities = self._extract_entities(parsed)
+        if cache_key is not None:
+            self._result_cache_set(cache_key, parsed, entities)
+        
+        # Step 8: Audit log success (same timestamp as the result)
+        timestamp = datetime.utcnow().isoformat()
+        self._audit_log_success(
+            action='note_interpretation_completed',
+            doctor_id=doctor_id,
+            patient_id_hash=self._hash_id(patient_id),
+            metadata={
+                'model': self.model_version,
+                'response_length': response_length,
+                'entities_found': len(entities.get('symptoms', []))
+            },
+            timestamp=timestamp
+        )
+        
+        # Step 9: Return formatted result
+        return self._format_result(parsed, entities, timestamp)
+    
+    def _format_result(self, parsed: Dict, entities: Dict, timestamp: str) -> Dict:
+        return {
+            'formatted_note': parsed.get('formatted', ''),
+            'clinical_summary': parsed.get('clinical', ''),
+            'patient_friendly_summary': parsed.get('patient_friendly', ''),
+            'extracted_entities': entities,
+            'ai_metadata': {
+                'model_version': self.model_version,
+                'ai_provider': self.ai_provider,
+                'timestamp': timestamp + 'Z'
+            }
+        }
+    
+    def _result_cache_key(self, de_identified_text: str) -> str:
+        return hashlib.blake2b(
+            de_identified_text.encode(), digest_size=16, key=self._result_cache_prefix
+        ).hexdigest()
+    
+    def _result_cache_get(self, cache_key: str) -> Optional[Tuple[Dict, Dict]]:
+        """Cached (parsed, entities) for a de-identified text, or None"""
+        if self.redis is not None:
+            try:
+                cached = self.redis.get(f"ni:ai:{cache_key}")
+                if cached is None:
+                    return None
+                cached = orjson.loads(cached)
+                return cached['parsed'], cached['entities']
+            except Exception as e:
+                logger.warning("AI result cache unavailable | error=%s", e)
+        
+        cached = self._result_cache.get(cache_key)
+        if cached is not None:
+            self._result_cache.move_to_end(cache_key)
+        return cached
+    
+    def _result_cache_set(self, cache_key: str, parsed: Dict, entities: Dict):
+        if self.redis is not None:
+            try:
+                self.redis.setex(
+                    f"ni:ai:{cache_key}", self.RESULT_CACHE_TTL_SECONDS,
+                    orjson.dumps({'parsed': parsed, 'entities': entities})
+                )
+                return
+            except Exception as e:
+                logger.warning("AI result cache unavailable | error=%s", e)
+        
+        self._result_cache[cache_key] = (parsed, entities)
+        self._result_cache.move_to_end(cache_key)
+        if len(self._result_cache) > self.RESULT_CACHE_SIZE:
+            self._result_cache.popitem(last=False)
+    
+    def interpret_notes_batch(self, notes: List[Dict], poll_interval: float = 30,
+                              max_poll_interval: float = 600) -> List[Dict]:
+        """
+        Interpret a bulk set of notes through the provider's Batch API.
+        
+        For overnight cohorts and back-fills: batches are billed at a
+        discount and use a separate rate-limit pool, but may take up to
+        24 hours. Blocks while polling; not for request handlers.
+        
+        Args:
+            notes: Dicts with note_id (unique), raw_text, patient_id, doctor_id
+            poll_interval: First wait between status polls (seconds), doubled
+                           after each poll
+            max_poll_interval: Upper bound for the poll wait (seconds)
+        
+        Returns:
+            One dict per note, in order: the interpret_note() result, or
+            {'note_id': ..., 'error': ...} if that note failed
+        
+        Raises:
+            ValidationError: If note_ids are not unique
+            AIServiceError: If the batch itself fails, expires or is cancelled
+        """
+        if not self.api_key:
+            raise AIServiceError("AI_API_KEY not configured")
+        if self.ai_provider not in ('openai', 'anthropic'):
+            raise AIServiceError(f"Unknown provider: {self.ai_provider}")
+        
+        note_ids = [note['note_id'] for note in notes]
+        if len(set(note_ids)) != len(note_ids):
+            raise ValidationError("note_id must be unique within a batch")
+        
+        results = {}
+        prompts = {}
+        for note in notes:
+            try:
+                token_count = self.validate_input(note['raw_text'])
+            except ValidationError as e:
+                results[note['note_id']] = {'note_id': note['note_id'], 'error': str(e)}
+                continue
+            prompts[note['note_id']] = PHIFilter.de_identify_text(note['raw_text'])
             self._audit_log_request(
                 action='note_interpretation_requested',
-                doctor_id=doctor_id,
-                patient_id_hash=self._hash_id(patient_id),
-                metadata={'note_length': len(raw_text)}
+                doctor_id=note['doctor_id'],
+                patient_id_hash=self._hash_id(note['patient_id']),
+                metadata={'note_length': len(note['raw_text']), 'token_count': token_count, 'batch': True}
             )
+        
+        if prompts:
+            if self.ai_provider == 'openai':
+                responses = self._run_openai_batch(prompts, poll_interval, max_poll_interval)
+            else:
+                responses = self._run_anthropic_batch(prompts, poll_interval, max_poll_interval)
             
-            # Step 5: Call AI provider
-            ai_response = self._call_ai_provider(de_identified)
-            logger.info(f"AI response received | note_id={note_id} | length={len(ai_response)}")
-            
-            # Step 6: Parse structured output
-            parsed = self._parse_ai_response(ai_response)
-            
-            # Step 7: Extract entities
-            entities = self._extract_entities(parsed)
-            
-            # Step 8: Audit log success
-            self._audit_log_success(
-                action='note_interpretation_completed',
-                doctor_id=doctor_id,
-                patient_id_hash=self._hash_id(patient_id),
-                metadata={
+            for note in notes:
+                note_id = note['note_id']
+                if note_id not in prompts:
+                    continue
+                ai_response = responses.get(note_id)
+                if isinstance(ai_response, str):
+                    results[note_id] = self._build_result(
+                        note['patient_id'], note['doctor_id'],
+                        self._parse_ai_response(ai_response), len(ai_response)
+                    )
+                else:
+                    results[note_id] = {'note_id': note_id, 'error': str(ai_response or 'No result returned')}
+        
+        logger.info("Batch interpretation finished | notes=%d | sent=%d", len(notes), len(prompts))
+        return [results[note_id] for note_id in note_ids]
+    
+    def _run_openai_batch(self, prompts: Dict[str, str], poll_interval: float,
+                          max_poll_interval: float) -> Dict:
+        """Run prompts through the OpenAI Batch API; returns note_id → content or AIServiceError"""
+        from openai import OpenAI
+        client = OpenAI(api_key=self.api_key, http_client=self.http)
+        
+        lines = [
+            orjson.dumps({
+                'custom_id': note_id,
+                'method': 'POST',
+                'url': '/v1/chat/completions',
+                'body': {
                     'model': self.model_version,
-                    'response_length': len(ai_response),
-                    'entities_found': len(entities.get('symptoms', []))
+                    'messages': self._chat_messages(text),
+                    'temperature': 0.3,
+                    'max_tokens': self._max_tokens(),
+                    'response_format': {'type': 'json_object'}
                 }
+            })
+            for note_id, text in prompts.items()
+        ]
+        try:
+            batch_file = client.files.create(
+                file=('notes.jsonl', b'\n'.join(lines)),
+                purpose='batch'
+            )
+            batch = client.batches.create(
+                input_file_id=batch_file.id,
+                endpoint='/v1/chat/completions',
+                completion_window='24h'
             )
+            logger.info("OpenAI batch created | batch_id=%s | requests=%d", batch.id, len(lines))
             
-            # Step 9: Return formatted result
-            return {
-                'formatted_note': parsed.get('formatted', ''),
-                'clinical_summary': parsed.get('clinical', ''),
-                'patient_friendly_summary': parsed.get('patient_friendly', ''),
-                'extracted_entities': entities,
-                'ai_metadata': {
-                    'model_version': self.model_version,
-                    'ai_provider': self.ai_provider,
-                    'timestamp': datetime.utcnow().isoformat() + 'Z'
-                }
-            }
+            delay = poll_interval
+            while batch.status not in ('completed', 'failed', 'expired', 'cancelled'):
+                time.sleep(delay)
+                delay = min(delay * 2, max_poll_interval)
+                batch = client.batches.retrieve(batch.id)
+            
+            if batch.status != 'completed':
+                raise AIServiceError(f"OpenAI batch {batch.id} ended with status {batch.status}")
+            
+            responses = {}
+            for file_id in (batch.output_file_id, batch.error_file_id):
+                if not file_id:
+                    continue
+                for line in client.files.content(file_id).iter_lines():
+                    if not line:
+                        continue
+                    item = orjson.loads(line)
+                    response = item.get('response') or {}
+                    if response.get('status_code') == 200:
+                        responses[item['custom_id']] = response['body']['choices'][0]['message']['content']
+                    else:
+                        error = item.get('error') or response.get('body', {}).get('error') or {}
+                        responses[item['custom_id']] = AIServiceError(f"OpenAI batch error: {error.get('message', 'unknown')}")
+            return responses
         
-        except (ValidationError, RateLimitError, AIServiceError) as e:
-            logger.error(f"Interpretation failed | error={str(e)}")
+        except AIServiceError:
             raise
+        except Exception as e:
+            raise AIServiceError(f"OpenAI batch error: {str(e)}")
+    
+    def _run_anthropic_batch(self, prompts: Dict[str, str], poll_interval: float,
+                             max_poll_interval: float) -> Dict:
+        """Run prompts through Anthropic Message Batches; returns note_id → content or AIServiceError"""
+        from anthropic import Anthropic
+        client = Anthropic(api_key=self.api_key, http_client=self.http)
+        
+        try:
+            batch = client.messages.batches.create(requests=[
+                {
+                    'custom_id': note_id,
+                    'params': {
+                        'model': self.model_version,
+                        'max_tokens': self._max_tokens(),
+                        'temperature': 0.3,
+                        'system': self._anthropic_system(),
+                        'messages': [{'role': 'user', 'content': self._user_prompt(text)}]
+                    }
+                }
+                for note_id, text in prompts.items()
+            ])
+            logger.info("Anthropic batch created | batch_id=%s | requests=%d", batch.id, len(prompts))
+            
+            delay = poll_interval
+            while batch.processing_status != 'ended':
+                time.sleep(delay)
+                delay = min(delay * 2, max_poll_interval)
+                batch = client.messages.batches.retrieve(batch.id)
+            
+            responses = {}
+            for entry in client.messages.batches.results(batch.id):
+                if entry.result.type == 'succeeded':
+                    responses[entry.custom_id] = entry.result.message.content[0].text
+                else:
+                    responses[entry.custom_id] = AIServiceError(f"Anthropic batch request {entry.result.type}")
+            return responses
         
         except Exception as e:
-            logger.exception(f"Unexpected error in interpret_note")
-            raise AIServiceError(f"Internal error: {str(e)}")
+            raise AIServiceError(f"Anthropic batch error: {str(e)}")
     
     def validate_input(self, text: str):
         """
@@ -279,46 +919,70 @@ class NoteInterpreter:
         
         Constraints:
         - Minimum: 20 characters (must have substantive content)
-        - Maximum: 5000 characters (reasonable clinical note length)
-        - Valid UTF-8 encoding
-        - No null bytes or suspicious content
+        - Maximum: 16000 characters, then 2000 tokens for the configured
+          model (see count_tokens); the character bound keeps oversized
+          input away from the tokenizer
+        - Valid UTF-8 encoding (no lone surrogates)
+        - No control characters other than tab, newline and carriage return
         
         Args:
             text: Raw note text
         
+        Returns:
+            Token count of the note
+        
         Raises:
             ValidationError: If validation fails
         """
+        # Linear length bound before any scan or tokenization
+        if len(text) > self.MAX_NOTE_CHARS:
+            raise ValidationError(f"Note too long (maximum {self.MAX_NOTE_TOKENS} tokens)")
+        
         # Minimum length check
         stripped = text.strip()
         if len(stripped) < 20:
             raise ValidationError("Note too short (minimum 20 characters)")
         
-        # Maximum length check
-        if len(text) > 5000:
-            raise ValidationError("Note too long (maximum 5000 characters)")
-        
-        # Encoding check
-        try:
-            text.encode('utf-8')
-        except UnicodeEncodeError as e:
-            raise ValidationError(f"Invalid character encoding: {str(e)}")
-        
-        # Check for null bytes or control characters
-        if '\x00' in text or '\x1a' in text:
+        # Encoding and control character check in one scan (a str only
+        # fails to encode as UTF-8 if it holds a lone surrogate)
+        bad = _INVALID_CHAR_RE.search(text)
+        if bad:
+            if '\ud800' <= bad.group() <= '\udfff':
+                raise ValidationError(
+                    f"Invalid character encoding: surrogate {bad.group()!r} at position {bad.start()}"
+                )
             raise ValidationError("Note contains invalid control characters")
+        
+        # Maximum length check, in model tokens (what drives cost and context)
+        token_count = self.count_tokens(text)
+        if token_count > self.MAX_NOTE_TOKENS:
+            raise ValidationError(f"Note too long (maximum {self.MAX_NOTE_TOKENS} tokens)")
+        return token_count
+    
+    def count_tokens(self, text: str) -> int:
+        """Tokens in text for the configured model (~4 characters each without tiktoken)"""
+        if self._encoder is None:
+            return -(-len(text) // 4)
+        return len(self._encoder.encode(text, disallowed_special=()))
     
-    def _call_ai_provider(self, de_identified_text: str) -> str:
+    async def _call_ai_provider(self, de_identified_text: str, count: int = 1) -> str:
         """
         Call external AI provider (OpenAI, Anthropic, etc.).
         
+        At most max_concurrent calls run at once, each waits for throttle
+        capacity, and provider 429s are retried with exponential backoff
+        up to max_attempts.
+        
+        With a breaker, each call (after its retries) counts once towards
+        opening it, and an open breaker fails fast with AIServiceError.
+        
         In production:
         - Wrap with timeout handling
-        - Implement retry logic with exponential backoff
-        - Use circuit breaker if failures exceed threshold
         
         Args:
-            de_identified_text: De-identified note text
+            de_identified_text: De-identified note text, or count notes
+                                joined by _pack_notes()
+            count: Number of notes in the request
         
         Returns:
             Raw response from AI provider (string or JSON)
@@ -330,76 +994,180 @@ class NoteInterpreter:
             raise AIServiceError("AI_API_KEY not configured")
         
         if self.ai_provider == 'openai':
-            return self._call_openai(de_identified_text)
+            call = self._call_openai
         elif self.ai_provider == 'anthropic':
-            return self._call_anthropic(de_identified_text)
+            call = self._call_anthropic
         else:
             raise AIServiceError(f"Unknown provider: {self.ai_provider}")
+        
+        estimated_tokens = (
+            self._system_prompt_tokens[count > 1] + len(de_identified_text) // 4
+            + self._max_tokens(count)
+        )
+        async with self._semaphore:
+            if self.breaker is None:
+                return await self._call_with_retries(call, de_identified_text, count, estimated_tokens)
+            try:
+                return await self.breaker.call_async(
+                    self._call_with_retries, call, de_identified_text, count, estimated_tokens
+                )
+            except RuntimeError as e:  # Breaker is OPEN
+                raise AIServiceError(f"AI provider unavailable: {str(e)}")
+    
+    async def _call_with_retries(self, call, text: str, count: int, estimated_tokens: int) -> str:
+        """Throttled provider call; 429s are retried with exponential backoff"""
+        for attempt in range(1, self.max_attempts + 1):
+            await self.throttle.acquire(estimated_tokens)
+            try:
+                return await call(text, count)
+            except ProviderRateLimitError:
+                if attempt == self.max_attempts:
+                    raise
+                delay = min(2 ** attempt, 60)
+                logger.warning("Provider rate limited | attempt=%d | retry_in=%ss", attempt, delay)
+                await asyncio.sleep(delay)
+    
+    def _get_async_http(self) -> httpx.AsyncClient:
+        """
+        Pooled HTTP/2 client shared by the async provider SDK clients.
+        
+        Created on first use from the provider loop, since an AsyncClient's
+        connections belong to the loop that opened them.
+        """
+        if self._async_http is None:
+            self._async_http = httpx.AsyncClient(
+                http2=True,
+                timeout=self.api_timeout,
+                limits=httpx.Limits(max_connections=100, max_keepalive_connections=20)
+            )
+        return self._async_http
     
-    def _call_openai(self, text: str) -> str:
+    async def _call_openai(self, text: str, count: int = 1) -> str:
         """
         Call OpenAI API (requires: pip install openai).
         
-        In production, use:
-            import openai
-            openai.api_key = self.api_key
-            response = openai.ChatCompletion.create(...)
+        In production, use the async client on the pooled connection:
+            from openai import AsyncOpenAI
+            client = AsyncOpenAI(api_key=self.api_key, http_client=self._get_async_http())
+            response = await client.chat.completions.create(...)
         
         For now, returns stub response.
         """
-        # STUB: In production, use openai library
-        # import openai
-        # openai.api_key = self.api_key
+        # STUB: In production, use openai's AsyncOpenAI (one per interpreter,
+        # created lazily on the provider loop) over the pooled AsyncClient
+        # from openai import AsyncOpenAI
+        # client = AsyncOpenAI(api_key=self.api_key, http_client=self._get_async_http())
+        # request = dict(
+        #     model=self.model_version,
+        #     messages=self._chat_messages(text, count),
+        #     temperature=0.3,  # Low temperature for consistency
+        #     max_tokens=self._max_tokens(count),
+        #     response_format={"type": "json_object"}  # Force JSON output
+        # )
         # try:
-        #     response = openai.ChatCompletion.create(
-        #         model=self.model_version,
-        #         messages=[
-        #             {
-        #                 "role": "system",
-        #                 "content": self._get_system_prompt()
-        #             },
-        #             {
-        #                 "role": "user",
-        #                 "content": f"Interpret this clinical note and provide structured output:\n{text}"
-        #             }
-        #         ],
-        #         temperature=0.3,  # Low temperature for consistency
-        #         max_tokens=1500,
-        #         timeout=self.api_timeout,
-        #         response_format={"type": "json_object"}  # Force JSON output
-        #     )
-        #     return response['choices'][0]['message']['content']
-        # except openai.error.Timeout:
+        #     # Stream so the body downloads while earlier chunks are joined;
+        #     # a stream that breaks mid-way is retried once, buffered
+        #     try:
+        #         parts = []
+        #         async for chunk in await client.chat.completions.create(**request, stream=True):
+        #             if chunk.choices and chunk.choices[0].delta.content:
+        #                 parts.append(chunk.choices[0].delta.content)
+        #         return ''.join(parts)
+        #     except (openai.APIConnectionError, openai.APIStatusError) as e:
+        #         if isinstance(e, openai.RateLimitError):
+        #             raise
+        #         logger.warning("OpenAI stream failed, retrying buffered | error=%s", e)
+        #         response = await client.chat.completions.create(**request)
+        #         return response.choices[0].message.content
+        # except openai.APITimeoutError:
         #     raise AIServiceError("OpenAI API timeout")
-        # except openai.error.RateLimitError:
-        #     raise AIServiceError("OpenAI rate limit exceeded")
+        # except openai.RateLimitError:
+        #     raise ProviderRateLimitError("OpenAI rate limit exceeded")
         # except Exception as e:
         #     raise AIServiceError(f"OpenAI API error: {str(e)}")
         
         logger.warning("OpenAI not implemented. Returning mock response.")
-        return self._mock_ai_response()
+        return self._mock_ai_response(count)
     
-    def _call_anthropic(self, text: str) -> str:
+    async def _call_anthropic(self, text: str, count: int = 1) -> str:
         """
         Call Anthropic API (requires: pip install anthropic).
         
         STUB: Similar to _call_openai, would use:
-            from anthropic import Anthropic
-            client = Anthropic(api_key=self.api_key)
-            message = client.messages.create(...)
+            from anthropic import AsyncAnthropic
+            client = AsyncAnthropic(api_key=self.api_key, http_client=self._get_async_http())
+            message = await client.messages.create(
+                system=self._anthropic_system(count),
+                messages=[{"role": "user", "content": self._user_prompt(text, count)}],
+                ...
+            )
         """
         logger.warning("Anthropic not implemented. Returning mock response.")
-        return self._mock_ai_response()
+        return self._mock_ai_response(count)
     
-    def _mock_ai_response(self) -> str:
+    def _user_prompt(self, text: str, count: int = 1) -> str:
+        """User message for one de-identified note, or count notes joined by _pack_notes()"""
+        if count > 1:
+            return f"Interpret these {count} clinical notes and provide structured output for each:\n{text}"
+        return f"Interpret this clinical note and provide structured output:\n{text}"
+    
+    def _chat_messages(self, text: str, count: int = 1) -> List[Dict]:
+        """Chat-completions messages for one de-identified note (or a pack of count)"""
+        return [
+            {"role": "system", "content": self._get_system_prompt(batched=count > 1)},
+            {"role": "user", "content": self._user_prompt(text, count)}
+        ]
+    
+    def _anthropic_system(self, count: int = 1) -> List[Dict]:
+        """Anthropic system blocks; the prompt is marked as a cacheable prefix"""
+        return [{
+            'type': 'text',
+            'text': self._get_system_prompt(batched=count > 1),
+            'cache_control': {'type': 'ephemeral'}
+        }]
+    
+    def _max_tokens(self, count: int = 1) -> int:
+        """Completion budget: NOTE_COMPLETION_TOKENS per note (packs fit MAX_PACKED_COMPLETION_TOKENS)"""
+        return self.NOTE_COMPLETION_TOKENS * count
+    
+    @staticmethod
+    def _pack_notes(texts: List[str]) -> str:
+        """Number de-identified notes for one packed request"""
+        return "NOTES:\n" + "\n".join(f"[{i}] {text}" for i, text in enumerate(texts, 1))
+    
+    @staticmethod
+    def _split_packed_response(response: Union[str, bytes], count: int) -> Optional[List[Dict]]:
+        """
+        Per-note outputs of a packed response, or None unless it holds exactly
+        count objects echoing indexes 1..count in order, with string summaries.
+        
+        The packed notes belong to different patients: an output that is
+        missing, merged, reordered or unlabelled must never be matched to a
+        note by position alone, so any doubt sends the pack to per-note calls.
+        """
+        try:
+            items = orjson.loads(response).get('notes')
+        except (orjson.JSONDecodeError, AttributeError):
+            return None
+        if not isinstance(items, list) or len(items) != count:
+            return None
+        for expected, item in enumerate(items, 1):
+            if not isinstance(item, dict) or type(item.get('index')) is not int or item['index'] != expected:
+                return None
+            # A null or non-string summary would fail _build_result for the whole batch
+            if not all(isinstance(item.get(key, ''), str) for key in ('formatted', 'clinical', 'patient_friendly')):
+                return None
+        return items
+    
+    def _mock_ai_response(self, count: int = 1) -> str:
         """Return mock AI response for testing (no API key needed)"""
-        return json.dumps({
-            'formatted': '**Chief Complaint:** Persistent cough\n**Duration:** 3 weeks\n**Associated Symptoms:** Denies fever\n**Physical Exam:** Lungs clear on auscultation\n**Vitals:** SpO2 98% on room air',
-            'clinical': 'Patient with 3-week history of dry cough. No fever. Clear lung fields on exam. Normal oxygenation. Differential includes URI sequelae, environmental irritant, or early viral bronchitis. Recommend monitoring, consider allergy workup if persistent.',
-            'patient_friendly': 'You have had a dry cough for 3 weeks without fever. When we listened to your lungs, they sounded clear and your oxygen levels are normal. We should monitor this and see if it helps with rest and time. If it continues, we may do more tests.'
-        })
+        if count > 1:
+            return '{"notes":[' + ','.join(
+                f'{{"index":{i},' + _MOCK_RESPONSE[1:] for i in range(1, count + 1)
+            ) + ']}'
+        return _MOCK_RESPONSE
     
-    def _parse_ai_response(self, response: str) -> Dict:
+    def _parse_ai_response(self, response: Union[str, bytes]) -> Dict:
         """
         Parse structured output from AI.
         
@@ -411,25 +1179,19 @@ class NoteInterpreter:
         }
         
         Args:
-            response: Raw response from AI provider
+            response: Raw response from AI provider (str, or bytes as read
+                      off the wire; parsed without decoding first)
         
         Returns:
             Dictionary with formatted, clinical, patient_friendly keys
         """
         try:
-            parsed = json.loads(response)
-            
-            # Validate required keys
-            required = ['formatted', 'clinical', 'patient_friendly']
-            for key in required:
-                if key not in parsed:
-                    logger.warning(f"Missing key in AI response: {key}")
-                    parsed[key] = ''
-            
-            return parsed
+            return self._require_keys(orjson.loads(response))
         
-        except json.JSONDecodeError:
+        except orjson.JSONDecodeError:
             logger.warning("Could not parse AI response as JSON. Treating as plain text.")
+            if isinstance(response, bytes):
+                response = response.decode('utf-8', errors='replace')
             # Fallback: treat entire response as multi-purpose summary
             return {
                 'formatted': response,
@@ -437,6 +1199,17 @@ class NoteInterpreter:
                 'patient_friendly': response
             }
     
+    @staticmethod
+    def _require_keys(parsed: Dict) -> Dict:
+        """Default any missing formatted/clinical/patient_friendly key to ''"""
+        required = ['formatted', 'clinical', 'patient_friendly']
+        for key in required:
+            if key not in parsed:
+                logger.warning("Missing key in AI response: %s", key)
+                parsed[key] = ''
+        
+        return parsed
+    
     def _extract_entities(self, parsed: Dict) -> Dict:
         """
         Extract medical entities from parsed summaries.
@@ -450,130 +1223,129 @@ class NoteInterpreter:
         Returns:
             Dictionary with symptoms, diagnoses, medications, vitals lists
         """
-        combined_text = ' '.join([
+        sources = (
             parsed.get('formatted', ''),
             parsed.get('clinical', ''),
             parsed.get('patient_friendly', '')
-        ]).lower()
+        )
+        
+        # Keyword extraction: one pass per summary finds every symptom/diagnosis
+        # keyword, stopping once all are found (dicts as ordered sets:
+        # first-seen order, no duplicates)
+        found = {'symptoms': {}, 'diagnoses': {}}
+        remaining = len(_KEYWORD_CATEGORY)
+        for text in sources:
+            for match in _KEYWORD_RE.finditer(text):
+                keyword = match.group(1).lower()
+                category = found[_KEYWORD_CATEGORY[keyword]]
+                if keyword not in category:
+                    category[keyword] = None
+                    remaining -= 1
+                    if not remaining:
+                        break
+            if not remaining:
+                break
         
-        # Simple keyword-based extraction
         entities = {
-            'symptoms': [],
-            'diagnoses': [],
+            'symptoms': list(found['symptoms']),
+            'diagnoses': list(found['diagnoses']),
             'medications': [],
             'vitals': {}
         }
         
-        # Common symptom keywords
-        symptom_keywords = ['cough', 'fever', 'pain', 'headache', 'nausea', 'dyspnea', 'chest pain', 'shortness of breath']
-        for symptom in symptom_keywords:
-            if symptom in combined_text:
-                entities['symptoms'].append(symptom)
-        
-        # Common diagnosis keywords
-        diagnosis_keywords = ['pneumonia', 'bronchitis', 'asthma', 'diabetes', 'hypertension', 'uri', 'viral']
-        for diagnosis in diagnosis_keywords:
-            if diagnosis in combined_text:
-                entities['diagnoses'].append(diagnosis)
-        
         # Vitals extraction (regex)
         # SpO2 pattern
-        spo2_match = re.search(r'spo2[:\s]+(\d+%?)', combined_text)
+        spo2_match = self._first_match(_SPO2_RE, sources)
         if spo2_match:
             entities['vitals']['SpO2'] = spo2_match.group(1)
         
         # BP pattern (120/80)
-        bp_match = re.search(r'bp[:\s]*(\d+/\d+)', combined_text)
+        bp_match = self._first_match(_BP_RE, sources)
         if bp_match:
             entities['vitals']['BP'] = bp_match.group(1)
         
         # HR pattern
-        hr_match = re.search(r'hr[:\s]*(\d+)', combined_text)
+        hr_match = self._first_match(_HR_RE, sources)
         if hr_match:
             entities['vitals']['HR'] = hr_match.group(1)
         
-        # Remove duplicates
-        entities['symptoms'] = list(set(entities['symptoms']))
-        entities['diagnoses'] = list(set(entities['diagnoses']))
-        
         return entities
     
-    def _get_system_prompt(self) -> str:
+    @staticmethod
+    def _first_match(pattern: re.Pattern, sources: Tuple[str, ...]) -> Optional[re.Match]:
+        """First match of pattern in the first source that has one"""
+        for text in sources:
+            match = pattern.search(text)
+            if match:
+                return match
+        return None
+    
+    @staticmethod
+    def _get_system_prompt(batched: bool = False) -> str:
         """
         System prompt for AI model.
         Instructs the model to interpret clinical notes and provide structured output.
+        
+        Args:
+            batched: Also instruct the model to answer a pack of numbered notes
         """
-        return """You are an expert clinical documentation specialist. Your task is to:
-
-1. Read unstructured clinical notes
-2. Provide three versions:
-   a) "formatted": Clean, structured markdown with sections (Chief Complaint, HPI, Physical Exam, Assessment, Plan, etc.)
-   b) "clinical": Concise summary for clinician handoff/audit (2-3 sentences)
-   c) "patient_friendly": Simplified explanation for patient understanding (using plain language)
-
-3. Always respond with valid JSON in this format:
-{
-    "formatted": "...",
-    "clinical": "...",
-    "patient_friendly": "..."
-}
-
-IMPORTANT:
-- Preserve medical accuracy
-- Never add information not in the original note
-- For patient firendly: use layman's terms, explain medical jargon
-- Maintain HIPAA compliance: note may be de-identified, do not invent PHI
-
-EXAMPLE INPUT (de-identified):
-"Pt presents w/ persistent cough x3wks, denies fever. Lungs clear on exam. SPO2 98% RA. CXR normal."
-
-EXAMPLE OUTPUT:
-{
-    "formatted": "**Chief Complaint:** Persistent cough\\n**Duration:** 3 weeks\\n**Associated Symptoms:** Denies fever\\n**Physical Exam:** Lungs clear to auscultation bilaterally\\n**Diagnostic Tests:** CXR normal\\n**Vitals:** SpO2 98% on room air",
-    "clinical": "3-week persistent dry cough without fever. Clear lungs on exam, normal oxygenation, normal CXR. Likely viral URI or environmental irritant.",
-    "patient_friendly": "You've had a dry cough for 3 weeks without fever. Your lungs sound clear and your oxygen is normal. Your chest X-ray looks good. This is likely from a cold or something in the air."
-}"""
+        return _BATCHED_SYSTEM_PROMPT if batched else _SYSTEM_PROMPT
     
     @staticmethod
+    @lru_cache(maxsize=4096)
     def _hash_id(patient_id: int) -> str:
         """
         One-way hash of patient ID for audit logging.
         
         Prevents storing actual patient IDs in logs while allowing us to
-        correlate multiple requests from the same patient.
+        correlate multiple requests from the same patient. Memoized: each
+        note logs the same patient's hash at least twice.
         
         Args:
             patient_id: Patient database ID
         
         Returns:
-            First 8 characters of SHA256 hash
+            8 hex characters (32-bit BLAKE2b digest)
         """
-        hash_obj = hashlib.sha256(str(patient_id).encode())
-        return hash_obj.hexdigest()[:8]
+        return hashlib.blake2b(str(patient_id).encode(), digest_size=4).hexdigest()
     
     def _audit_log_request(self, action: str, doctor_id: str, 
                           patient_id_hash: str, metadata: dict = None):
         """Log AI request (metadata only, no PHI)"""
-        log_msg = (
-            f"action={action} | doctor={doctor_id} | "
-            f"patient_hash={patient_id_hash} | "
-            f"timestamp={datetime.utcnow().isoformat()}"
-        )
-        if metadata:
-            log_msg += f" | metadata={metadata}"
-        logger.info(log_msg)
+        self._audit_log(action, doctor_id, patient_id_hash, metadata)
     
     def _audit_log_success(self, action: str, doctor_id: str,
-                          patient_id_hash: str, metadata: dict = None):
+                          patient_id_hash: str, metadata: dict = None,
+                          timestamp: Optional[str] = None):
         """Log successful AI response"""
-        log_msg = (
-            f"action={action} | doctor={doctor_id} | "
-            f"patient_hash={patient_id_hash} | "
-            f"timestamp={datetime.utcnow().isoformat()}"
-        )
+        self._audit_log(action, doctor_id, patient_id_hash, metadata, timestamp)
+    
+    @staticmethod
+    def _audit_log(action: str, doctor_id: str, patient_id_hash: str,
+                   metadata: Optional[dict], timestamp: Optional[str] = None):
+        """
+        One audit line, formatted only if INFO is enabled.
+        
+        The fields are also attached to the record (extra=) so a structured
+        (e.g. JSON) formatter can emit them without parsing the message.
+        """
+        if not logger.isEnabledFor(logging.INFO):
+            return
+        
+        timestamp = timestamp or datetime.utcnow().isoformat()
+        fields = {
+            'action': action,
+            'doctor': doctor_id,
+            'patient_hash': patient_id_hash,
+            'timestamp': timestamp,
+            'metadata': metadata or {},
+        }
         if metadata:
-            log_msg += f" | metadata={metadata}"
-        logger.info(log_msg)
+            logger.info("action=%s | doctor=%s | patient_hash=%s | timestamp=%s | metadata=%s",
+                        action, doctor_id, patient_id_hash, timestamp, metadata, extra={'audit': fields})
+        else:
+            logger.info("action=%s | doctor=%s | patient_hash=%s | timestamp=%s",
+                        action, doctor_id, patient_id_hash, timestamp, extra={'audit': fields})
 
 
 # Example usage
@@ -590,6 +1362,6 @@ if __name__ == '__main__':
             patient_id=42,
             doctor_id='DOC-001'
         )
-        print(json.dumps(result, indent=2))
+        print(orjson.dumps(result, option=orjson.OPT_INDENT_2).decode())
     except Exception as e:
         print(f"Error: {e}")
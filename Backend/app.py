@@ -1,9 +1,11 @@
 # app.py - UPDATED (no deprecated before_first_request)
+import orjson
 from flask import Flask, jsonify, request
+from flask.json.provider import DefaultJSONProvider
 from flask_migrate import Migrate
 from flask_cors import CORS
 from ai_routes import ai_bp
-from ai_config import AIConfig, setup_audit_logging
+from ai_config import setup_audit_logging
 from flasgger import Swagger
 
 
@@ -11,8 +13,24 @@ from flasgger import Swagger
 from models import db, bcrypt, Patient, Doctor, Appointment, Receptionist
 from ai_models import NoteInterpretation, ChatSession, ChatMessage, AIAuditLog
 
+class OrjsonProvider(DefaultJSONProvider):
+    """jsonify() through orjson; dates keep Flask's HTTP-date format"""
+
+    def dumps(self, obj, **kwargs):
+        if kwargs.get('indent'):  # Debug pretty-printing: stdlib path
+            return super().dumps(obj, **kwargs)
+        option = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        try:
+            return orjson.dumps(obj, default=self.default, option=option).decode('utf-8')
+        except TypeError:  # e.g. ints beyond 64 bits
+            return super().dumps(obj)
+
+
 # Flask application object 
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
 
 swagger_template = {
     "swagger": "2.0",
@@ -35,7 +53,7 @@ swagger = Swagger(app, template=swagger_template)
 
 # Relaxed CORS for local development so frontend can always reach the API
 CORS(app, resources={r"/*": {"origins": "*"}})
-AIConfig.validate()
+# AI config is validated at CI/deploy time: python tools/validate_config.py
 setup_audit_logging()
 app.register_blueprint(ai_bp, url_prefix='/api/ai')
 # Configure database
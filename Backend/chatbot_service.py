@@ -19,17 +19,114 @@ Production Features:
 """
 
 import os
-import json
+import re
+import time
+import queue
+import atexit
 import logging
 import hashlib
-from typing import Dict, List, Optional
-from datetime import datetime
+import threading
+from typing import Dict, List, Optional, Tuple
+from dataclasses import dataclass
 from enum import Enum
+from functools import lru_cache
+from types import MappingProxyType
+
+import orjson
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
 
+# (whole second, formatted prefix) of the last audit timestamp
+_TS_CACHE = (0, '')
+
+
+def _utc_timestamp(now: float) -> str:
+    """UTC ISO-8601 timestamp with microseconds, formatting the date once per second"""
+    global _TS_CACHE
+    second = int(now)
+    cached_second, prefix = _TS_CACHE
+    if second != cached_second:
+        prefix = time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(second))
+        _TS_CACHE = (second, prefix)
+    return '%s.%06d' % (prefix, (now - second) * 1e6)
+
+
+# Interaction audit records are queued by request threads and logged behind
+# by one background thread, up to AUDIT_BATCH_SIZE records per wake-up
+AUDIT_BATCH_SIZE = 256
+_audit_queue = queue.SimpleQueue()
+_audit_start_lock = threading.Lock()
+_AUDIT_STOP = object()  # Queued at shutdown: writer logs what it holds and exits
+_audit_writer = None
+
+
+def _queue_audit(record: tuple):
+    """Queue (conversation_id, user_id, user_role, intent, time) for the audit writer"""
+    if _audit_writer is None:
+        _start_audit_writer()
+    _audit_queue.put(record)
+
+
+def _start_audit_writer():
+    """Start the audit writer thread once"""
+    global _audit_writer
+    with _audit_start_lock:
+        if _audit_writer is not None:
+            return
+        _audit_writer = threading.Thread(target=_audit_writer_loop, name='chatbot-audit-writer', daemon=True)
+        _audit_writer.start()
+    atexit.register(_flush_audit_queue_on_exit)
+
+
+def _drain_audit_queue(records: list) -> bool:
+    """Move queued records into `records` (up to AUDIT_BATCH_SIZE); True once stop is seen"""
+    while len(records) < AUDIT_BATCH_SIZE:
+        try:
+            record = _audit_queue.get_nowait()
+        except queue.Empty:
+            return False
+        if record is _AUDIT_STOP:
+            return True
+        records.append(record)
+    return False
+
+
+def _audit_writer_loop():
+    """Log queued audit records in batches until shutdown"""
+    while True:
+        record = _audit_queue.get()  # Idle: wait for the first record
+        if record is _AUDIT_STOP:
+            return
+        records = [record]
+        stop = _drain_audit_queue(records)
+        _write_audit_records(records)
+        if stop:
+            return
+
+
+def _write_audit_records(records: list):
+    """Emit one CHATBOT_INTERACTION line per record (metadata only)"""
+    for conversation_id, user_id, user_role, intent, now in records:
+        logger.info(
+            "CHATBOT_INTERACTION | conversation=%s | user=%s | role=%s | intent=%s | timestamp=%s",
+            conversation_id, user_id, user_role, intent, _utc_timestamp(now)
+        )
+
+
+def _flush_audit_queue_on_exit():
+    """Stop the writer (it logs its batch), then log leftovers"""
+    _audit_queue.put(_AUDIT_STOP)
+    _audit_writer.join(timeout=5)
+    while True:
+        records = []
+        _drain_audit_queue(records)
+        if not records:
+            return
+        _write_audit_records(records)
+
+
 class UserRole(Enum):
     """Supported user roles"""
     CLINICIAN = "clinician"
@@ -42,6 +139,85 @@ class ChatbotError(Exception):
     pass
 
 
+@dataclass(frozen=True, slots=True)
+class Action:
+    """Suggested action (serialized by orjson as {label, action_type, target})"""
+    label: str
+    action_type: str
+    target: str
+
+
+# Medical question detection (for all roles), checked before role intents
+_MEDICAL_KEYWORDS = frozenset({
+    'diagnose', 'diagnosis', 'treatment', 'should i',
+    'what disease', 'what condition', 'am i sick',
+    'should i see a doctor for', 'do i have',
+    'interpret', 'lab values', 'test results',
+    'prescribe', 'medication for', 'is this normal'
+})
+
+# Per-role intent buckets, in priority order
+_ROLE_INTENTS = {
+    'clinician': (
+        ('documentation', frozenset({'note', 'document', 'add', 'record'})),
+        ('appointments', frozenset({'appointment', 'schedule', 'meeting'})),
+        ('records', frozenset({'patient', 'record', 'history', 'access'})),
+        ('system_help', frozenset({'how', 'where', 'what'})),
+    ),
+    'patient': (
+        ('appointment_booking', frozenset({'book', 'appointment', 'schedule', 'doctor'})),
+        ('records_access', frozenset({'record', 'result', 'test', 'history', 'view'})),
+        ('faq', frozenset({'how', 'what', 'where', 'how to use'})),
+    ),
+}
+
+
+def _compile_intents(buckets):
+    """
+    Fuse ordered intent buckets into one scan.
+    
+    Returns (pattern, rank, intents): the pattern finds the longest keyword
+    at every offset, rank maps each keyword to the first bucket it implies
+    and intents[rank] is the intent, with 'general_question' last.
+    """
+    buckets = (('medical_question', _MEDICAL_KEYWORDS),) + buckets
+    first = {}
+    for i, (_, keywords) in enumerate(buckets):
+        for keyword in keywords:
+            first.setdefault(keyword, i)
+    # A keyword also matches every keyword inside it ('test results' ⊃ 'test')
+    rank = {kw: min(r for k, r in first.items() if k in kw) for kw in first}
+    alternation = '|'.join(re.escape(kw) for kw in sorted(rank, key=lambda kw: (-len(kw), kw)))
+    intents = tuple(intent for intent, _ in buckets) + ('general_question',)
+    return re.compile(f'(?=({alternation}))'), rank, intents
+
+
+_INTENT_SCANS = {role: _compile_intents(b) for role, b in _ROLE_INTENTS.items()}
+_DEFAULT_INTENT_SCAN = _compile_intents(())
+
+# Longest message kept in the classify cache: room for menu-style questions
+# that repeat verbatim ("book an appointment"), not for free text with PHI
+_CLASSIFY_CACHE_MAX_CHARS = 32
+
+
+def _scan_intent(msg_lower: str, user_role: str) -> str:
+    """Intent for a lower-cased message, in one pass over it"""
+    pattern, rank, intents = _INTENT_SCANS.get(user_role, _DEFAULT_INTENT_SCAN)
+    
+    # The earliest bucket hit wins
+    best = len(intents) - 1
+    for match in pattern.finditer(msg_lower):
+        r = rank[match.group(1)]
+        if r < best:
+            best = r
+            if not r:
+                break
+    return intents[best]
+
+
+_scan_intent_cached = lru_cache(maxsize=4096)(_scan_intent)
+
+
 class IntentClassifier:
     """Classify user intent from message"""
     
@@ -69,41 +245,21 @@ class IntentClassifier:
         Returns:
             Intent category string
         """
-        msg_lower = message.lower()
-        
-        # Medical question detection (for all roles)
-        medical_keywords = [
-            'diagnose', 'diagnosis', 'treatment', 'should i',
-            'what disease', 'what condition', 'am i sick',
-            'should i see a doctor for', 'do i have',
-            'interpret', 'lab values', 'test results',
-            'prescribe', 'medication for', 'is this normal'
-        ]
-        for keyword in medical_keywords:
-            if keyword in msg_lower:
-                return 'medical_question'
-        
-        if user_role == 'clinician':
-            # Clinician intents
-            if any(word in msg_lower for word in ['note', 'document', 'add', 'record']):
-                return 'documentation'
-            if any(word in msg_lower for word in ['appointment', 'schedule', 'meeting']):
-                return 'appointments'
-            if any(word in msg_lower for word in ['patient', 'record', 'history', 'access']):
-                return 'records'
-            if any(word in msg_lower for word in ['how', 'where', 'what']):
-                return 'system_help'
-        
-        elif user_role == 'patient':
-            # Patient intents
-            if any(word in msg_lower for word in ['book', 'appointment', 'schedule', 'doctor']):
-                return 'appointment_booking'
-            if any(word in msg_lower for word in ['record', 'result', 'test', 'history', 'view']):
-                return 'records_access'
-            if any(word in msg_lower for word in ['how', 'what', 'where', 'how to use']):
-                return 'faq'
+        # Skip the lower() copy when the message is already lower-case ASCII
+        msg_lower = message if message.isascii() and message.islower() else message.lower()
+        return IntentClassifier.classify_lower(msg_lower, user_role)
+    
+    @staticmethod
+    def classify_lower(msg_lower: str, user_role: str) -> str:
+        """
+        classify() for a message the caller has already lower-cased.
         
-        return 'general_question'
+        Only short messages are memoized (see _scan_intent_cached.cache_info());
+        longer ones may carry PHI and are scanned without being stored.
+        """
+        if len(msg_lower) > _CLASSIFY_CACHE_MAX_CHARS:
+            return _scan_intent(msg_lower, user_role)
+        return _scan_intent_cached(msg_lower, user_role)
 
 
 class ActionExtractor:
@@ -125,8 +281,27 @@ class ActionExtractor:
         'help': 'Help & FAQ'
     }
     
+    # Response keywords, one named group per heuristic
+    _PATTERN = re.compile(
+        r'(?P<records>patient record|medical record)|(?P<appt>appointment)'
+        r'|(?P<book>book|schedule|manage)|(?P<doctor>doctor)'
+    )
+    _RECORDS, _APPT, _BOOK, _DOCTOR = 1, 2, 4, 8
+    _BITS = {'records': _RECORDS, 'appt': _APPT, 'book': _BOOK, 'doctor': _DOCTOR}
+    
+    # Per-role action fields: (records label, records target, appointments
+    # target, appointments label, suggest doctors); other roles fall back to
+    # the patient routes without the doctors link
+    _ROLE_TABLE = {
+        'clinician': (CLINICIAN_ROUTES.get('patient-records', 'View Records'), '/patient-records',
+                      '/appointments', 'Manage Appointments', False),
+        'patient': (PATIENT_ROUTES.get('patient-records', 'View Records'), '/medical-records',
+                    '/book-appointment', 'Book an Appointment', True),
+    }
+    _DEFAULT_ROLE_ROW = _ROLE_TABLE['patient'][:4] + (False,)
+    
     @staticmethod
-    def extract_actions(response: str, user_role: str) -> List[Dict]:
+    def extract_actions(response: str, user_role: str) -> List[Action]:
         """
         Extract suggested actions from chatbot response.
         
@@ -140,39 +315,29 @@ class ActionExtractor:
             user_role: "clinician" or "patient"
         
         Returns:
-            List of action dictionaries
+            List of Action
         """
         actions = []
-        response_lower = response.lower()
+        cls = ActionExtractor
+        
+        # One scan over the response, collecting which keywords appeared
+        found = 0
+        for match in cls._PATTERN.finditer(response.lower()):
+            found |= cls._BITS[match.lastgroup]
         
-        routes = (ActionExtractor.CLINICIAN_ROUTES 
-                  if user_role == 'clinician' 
-                  else ActionExtractor.PATIENT_ROUTES)
+        records_label, records_target, appt_target, appt_label, show_doctors = (
+            cls._ROLE_TABLE.get(user_role, cls._DEFAULT_ROLE_ROW))
         
         # Check for keywords and suggest corresponding actions
-        if 'patient record' in response_lower or 'medical record' in response_lower:
-            target = '/patient-records' if user_role == 'clinician' else '/medical-records'
-            actions.append({
-                'label': routes.get('patient-records', 'View Records'),
-                'action_type': 'navigate',
-                'target': target
-            })
-        
-        if 'appointment' in response_lower and any(word in response_lower for word in ['book', 'schedule', 'manage']):
-            target = '/appointments' if user_role == 'clinician' else '/book-appointment'
-            label = 'Manage Appointments' if user_role == 'clinician' else 'Book an Appointment'
-            actions.append({
-                'label': label,
-                'action_type': 'navigate',
-                'target': target
-            })
-        
-        if 'doctor' in response_lower and user_role == 'patient':
-            actions.append({
-                'label': 'View My Doctors',
-                'action_type': 'navigate',
-                'target': '/my-doctors'
-            })
+        if found & cls._RECORDS:
+            actions.append(Action(records_label, 'navigate', records_target))
+        
+        appt = cls._APPT | cls._BOOK
+        if found & appt == appt:
+            actions.append(Action(appt_label, 'navigate', appt_target))
+        
+        if found & cls._DOCTOR and show_doctors:
+            actions.append(Action('View My Doctors', 'navigate', '/my-doctors'))
         
         # Limit to 3 suggested actions
         return actions[:3]
@@ -187,6 +352,14 @@ class DisclaimerManager:
         'patient_medical': '⚠ I cannot provide medical advice. Please consult with your healthcare provider. I can help you book an appointment or access your medical records.',
     }
     
+    # (intent, role) -> disclaimer for every non-general case (roles as validated by respond())
+    _TABLE = {
+        ('medical_question', 'patient'): DISCLAIMERS['patient_medical'],
+        ('medical_question', 'clinician'): DISCLAIMERS['medical_question'],
+        ('medical_question', 'admin'): DISCLAIMERS['medical_question'],
+    }
+    _GENERAL = DISCLAIMERS['general']
+    
     @staticmethod
     def get_disclaimer(intent: str, user_role: str) -> str:
         """
@@ -199,10 +372,133 @@ class DisclaimerManager:
         Returns:
             Disclaimer string
         """
-        if intent == 'medical_question':
-            return DisclaimerManager.DISCLAIMERS['patient_medical' if user_role == 'patient' else 'medical_question']
-        
-        return DisclaimerManager.DISCLAIMERS['general']
+        return DisclaimerManager._TABLE.get((intent, user_role), DisclaimerManager._GENERAL)
+
+
+# Canned replies, built once at import and shared read-only across requests
+_CLINICIAN_RESPONSES = MappingProxyType({
+    'documentation': (
+        "To add a clinical note in Afyaclick:\n\n"
+        "1. Navigate to **Patient Records** (left sidebar)\n"
+        "2. Search for patient by name or ID\n"
+        "3. Click **View Records** → **Add New Note**\n"
+        "4. Enter your clinical observations:\n"
+        "   - Chief complaint\n"
+        "   - History of present illness\n"
+        "   - Physical examination findings\n"
+        "   - Assessment and plan\n"
+        "5. (Optional) Click **AI Summarize** to auto-format\n"
+        "6. Review and click **Save**\n\n"
+        "Your note is encrypted and time-stamped in the patient's record."
+    ),
+    'appointments': (
+        "To manage appointments in Afyaclick:\n\n"
+        "**Schedule New Appointment:**\n"
+        "1. Go to **Appointments** (left sidebar)\n"
+        "2. Click **Schedule New**\n"
+        "3. Select patient, date, time, and reason\n"
+        "4. Click **Confirm**\n\n"
+        "**View Your Appointments:**\n"
+        "1. Go to **My Appointments**\n"
+        "2. Filter by date, status, or patient\n"
+        "3. Click appointment for details\n\n"
+        "**Cancel/Reschedule:**\n"
+        "Click appointment → **Actions** → **Reschedule** or **Cancel**"
+    ),
+    'records': (
+        "To access patient records in Afyaclick:\n\n"
+        "1. Click **Patient Records** (left sidebar)\n"
+        "2. Use search bar to find patient:\n"
+        "   - Search by name, ID, or email\n"
+        "3. Click **View Records** to see:\n"
+        "   - Medical history\n"
+        "   - Previous notes and summaries\n"
+        "   - Test results\n"
+        "   - Appointment history\n"
+        "4. Click any note to view full details\n\n"
+        "All data is encrypted and access is logged for compliance."
+    ),
+    'system_help': (
+        "What would you like help with?\n\n"
+        "• **Adding patient notes** - documentation workflow\n"
+        "• **Scheduling appointments** - appointment management\n"
+        "• **Finding patient records** - record access\n"
+        "• **System settings** - preferences and configuration\n\n"
+        "Ask me about any of these, or feel free to ask a specific question!"
+    )
+})
+_CLINICIAN_FALLBACK = _CLINICIAN_RESPONSES['system_help']
+
+_PATIENT_RESPONSES = MappingProxyType({
+    'appointment_booking': (
+        "To book an appointment in Afyaclick:\n\n"
+        "1. Click **Book Appointment** (from dashboard or left menu)\n"
+        "2. Select your preferred doctor:\n"
+        "   - View doctor specialties and availability\n"
+        "   - Read reviews from other patients (if available)\n"
+        "3. Pick a date and time that works for you\n"
+        "4. Add a note about why you're visiting (optional)\n"
+        "5. Click **Confirm Appointment**\n\n"
+        "You'll receive a confirmation and a reminder before your appointment.\n"
+        "Can't make it? You can reschedule up to 24 hours before."
+    ),
+    'records_access': (
+        "To view your medical records in Afyaclick:\n\n"
+        "1. Click **My Medical Records** (left sidebar)\n"
+        "2. You can see:\n"
+        "   - Previous visit notes\n"
+        "   - Test results and lab work\n"
+        "   - Doctor's summaries and recommendations\n"
+        "3. Click any visit to read full details\n"
+        "4. Download notes if you need them\n\n"
+        "Your records are private and protected. "
+        "Only you and your healthcare team can see them."
+    ),
+    'faq': (
+        "Welcome to Afyaclick! Here are common questions:\n\n"
+        "**What is Afyaclick?**\n"
+        "An easy-to-use health app where you can manage appointments, "
+        "view test results, and communicate with your doctors.\n\n"
+        "**Is my data safe?**\n"
+        "Yes! All your information is encrypted and protected by law. "
+        "Only you and your healthcare team can access it.\n\n"
+        "**How do I message my doctor?**\n"
+        "Go to **My Doctors** → select a doctor → **Send Message**\n\n"
+        "**Can I download my records?**\n"
+        "Yes! In **My Medical Records**, click any note and select **Download**\n\n"
+        "Have other questions? Scroll down or ask me directly!"
+    ),
+    'general_question': (
+        "I'm here to help! Here's what I can assist with:\n\n"
+        "📅 **Appointments** - Book, reschedule, or cancel\n"
+        "📋 **Medical Records** - View your visit notes and test results\n"
+        "👨‍⚕️ **My Doctors** - See your healthcare team and message them\n"
+        "❓ **FAQ** - Common questions about Afyaclick\n\n"
+        "What would you like help with?"
+    )
+})
+_PATIENT_FALLBACK = _PATIENT_RESPONSES['general_question']
+
+_CANNED_REPLIES = {
+    'clinician': (_CLINICIAN_RESPONSES, _CLINICIAN_FALLBACK),
+    'patient': (_PATIENT_RESPONSES, _PATIENT_FALLBACK),
+}
+
+
+# Redirect actions offered to patients who ask a medical question
+_MEDICAL_PATIENT_ACTIONS = (
+    Action('Book an Appointment', 'navigate', '/book-appointment'),
+    Action('View My Medical Records', 'navigate', '/medical-records'),
+)
+
+
+@lru_cache(maxsize=64)
+def _canned_actions_and_disclaimer(intent: str, user_role: str) -> Tuple[Tuple[Action, ...], str]:
+    """(suggested actions, disclaimer) for a canned reply: fixed per (intent, role)"""
+    responses, fallback = _CANNED_REPLIES[user_role]
+    reply = responses.get(intent, fallback)
+    actions = tuple(ActionExtractor.extract_actions(reply, user_role))
+    return actions, DisclaimerManager.get_disclaimer(intent, user_role)
 
 
 class AfyaclickChatbot:
@@ -213,8 +509,16 @@ class AfyaclickChatbot:
     Does NOT diagnose, interpret medical data, or provide clinical advice.
     """
     
-    def __init__(self):
-        """Initialize chatbot with AI provider config"""
+    __slots__ = ('http', 'model_version', 'ai_provider', 'api_key', 'api_timeout')
+    
+    def __init__(self, http=None):
+        """
+        Initialize chatbot with AI provider config.
+        
+        Args:
+            http: Shared httpx.Client for provider SDKs (keep-alive, HTTP/2)
+        """
+        self.http = http
         self.model_version = os.getenv('AI_MODEL_VERSION', 'gpt-4-turbo-2024-04')
         self.ai_provider = os.getenv('AI_PROVIDER', 'openai')
         self.api_key = os.getenv('AI_API_KEY')
@@ -223,10 +527,11 @@ class AfyaclickChatbot:
         if not self.api_key:
             logger.warning("AI_API_KEY not set. Chatbot will use mock responses.")
         
-        logger.info(f"AfyaclickChatbot initialized | provider={self.ai_provider} | model={self.model_version}")
+        logger.info("AfyaclickChatbot initialized | provider=%s | model=%s", self.ai_provider, self.model_version)
     
     def respond(self, user_role: str, message: str, 
-                conversation_id: str, user_id: int) -> Dict:
+                conversation_id: str, user_id: int,
+                intent: Optional[str] = None) -> Dict:
         """
         Generate chatbot response.
         
@@ -235,6 +540,7 @@ class AfyaclickChatbot:
             message: User's question/input
             conversation_id: Unique conversation ID (for multi-turn)
             user_id: Patient ID or Doctor ID
+            intent: IntentClassifier.classify() result, if the caller already has it
         
         Returns:
             Dictionary with keys:
@@ -246,40 +552,56 @@ class AfyaclickChatbot:
             ChatbotError: If response generation fails
         """
         try:
-            # Validate input
-            self._validate_input(message)
-            
-            # Normalize role
-            if user_role not in ['clinician', 'patient', 'admin']:
-                raise ChatbotError(f"Unknown role: {user_role}")
-            
-            # Classify intent
-            intent = IntentClassifier.classify(message, user_role)
-            logger.info(f"Intent classified | conversation={conversation_id} | intent={intent}")
-            
-            # Route to role-specific handler
-            if intent == 'medical_question':
-                return self._handle_medical_question(user_role, message, conversation_id, user_id)
-            elif user_role == 'clinician':
-                return self._handle_clinician_query(intent, message, conversation_id, user_id)
-            elif user_role == 'patient':
-                return self._handle_patient_query(intent, message, conversation_id, user_id)
-            else:
-                return self._handle_admin_query(intent, message, conversation_id, user_id)
-        
-        except ChatbotError as e:
-            logger.error(f"Chatbot error | conversation={conversation_id} | error={str(e)}")
-            raise
+            intent = self._route(user_role, message, conversation_id, intent)
+            return self._handle(intent, user_role, message, conversation_id, user_id)
         except Exception as e:
-            logger.exception(f"Unexpected error in chatbot.respond")
-            raise ChatbotError(f"Internal error: {str(e)}")
+            raise self._respond_error(e, conversation_id)
+    
+    def _route(self, user_role: str, message: str, conversation_id: str,
+               intent: Optional[str]) -> str:
+        """Validate the turn and return its intent (classified unless given)"""
+        # Validate input
+        self._validate_input(message)
+        
+        # Normalize role
+        if user_role not in ['clinician', 'patient', 'admin']:
+            raise ChatbotError(f"Unknown role: {user_role}")
+        
+        # Classify intent
+        if intent is None:
+            intent = IntentClassifier.classify(message, user_role)
+        logger.info("Intent classified | conversation=%s | intent=%s", conversation_id, intent)
+        return intent
+    
+    def _handle(self, intent: str, user_role: str, message: str,
+                conversation_id: str, user_id: int) -> Dict:
+        """Route to role-specific handler"""
+        if intent == 'medical_question':
+            return self._handle_medical_question(user_role, message, conversation_id, user_id)
+        elif user_role == 'clinician':
+            return self._handle_clinician_query(intent, message, conversation_id, user_id)
+        elif user_role == 'patient':
+            return self._handle_patient_query(intent, message, conversation_id, user_id)
+        else:
+            return self._handle_admin_query(intent, message, conversation_id, user_id)
+    
+    @staticmethod
+    def _respond_error(e: Exception, conversation_id: str) -> ChatbotError:
+        """Log a failed turn; unexpected errors are wrapped as ChatbotError"""
+        if isinstance(e, ChatbotError):
+            logger.error("Chatbot error | conversation=%s | error=%s", conversation_id, e)
+            return e
+        logger.exception("Unexpected error in chatbot.respond")
+        return ChatbotError(f"Internal error: {str(e)}")
     
     def _validate_input(self, message: str):
         """Validate user input"""
-        if not message or len(message.strip()) < 3:
+        n = len(message) if message else 0
+        # strip() (a copy) only when the message has edge whitespace to discount
+        if n < 3 or ((message[0].isspace() or message[-1].isspace()) and len(message.strip()) < 3):
             raise ChatbotError("Message must be at least 3 characters")
         
-        if len(message) > 1000:
+        if n > 1000:
             raise ChatbotError("Message too long (max 1000 characters)")
     
     def _handle_medical_question(self, user_role: str, message: str,
@@ -307,21 +629,7 @@ class AfyaclickChatbot:
             )
         
         disclaimer = DisclaimerManager.get_disclaimer('medical_question', user_role)
-        actions = []
-        
-        if user_role == 'patient':
-            actions = [
-                {
-                    'label': 'Book an Appointment',
-                    'action_type': 'navigate',
-                    'target': '/book-appointment'
-                },
-                {
-                    'label': 'View My Medical Records',
-                    'action_type': 'navigate',
-                    'target': '/medical-records'
-                }
-            ]
+        actions = list(_MEDICAL_PATIENT_ACTIONS) if user_role == 'patient' else []
         
         self._audit_log(conversation_id, user_id, 'medical_question', user_role)
         
@@ -335,68 +643,14 @@ class AfyaclickChatbot:
                                 conversation_id: str, user_id: int) -> Dict:
         """Handle clinician-specific queries"""
         
-        responses = {
-            'documentation': (
-                "To add a clinical note in Afyaclick:\n\n"
-                "1. Navigate to **Patient Records** (left sidebar)\n"
-                "2. Search for patient by name or ID\n"
-                "3. Click **View Records** → **Add New Note**\n"
-                "4. Enter your clinical observations:\n"
-                "   - Chief complaint\n"
-                "   - History of present illness\n"
-                "   - Physical examination findings\n"
-                "   - Assessment and plan\n"
-                "5. (Optional) Click **AI Summarize** to auto-format\n"
-                "6. Review and click **Save**\n\n"
-                "Your note is encrypted and time-stamped in the patient's record."
-            ),
-            'appointments': (
-                "To manage appointments in Afyaclick:\n\n"
-                "**Schedule New Appointment:**\n"
-                "1. Go to **Appointments** (left sidebar)\n"
-                "2. Click **Schedule New**\n"
-                "3. Select patient, date, time, and reason\n"
-                "4. Click **Confirm**\n\n"
-                "**View Your Appointments:**\n"
-                "1. Go to **My Appointments**\n"
-                "2. Filter by date, status, or patient\n"
-                "3. Click appointment for details\n\n"
-                "**Cancel/Reschedule:**\n"
-                "Click appointment → **Actions** → **Reschedule** or **Cancel**"
-            ),
-            'records': (
-                "To access patient records in Afyaclick:\n\n"
-                "1. Click **Patient Records** (left sidebar)\n"
-                "2. Use search bar to find patient:\n"
-                "   - Search by name, ID, or email\n"
-                "3. Click **View Records** to see:\n"
-                "   - Medical history\n"
-                "   - Previous notes and summaries\n"
-                "   - Test results\n"
-                "   - Appointment history\n"
-                "4. Click any note to view full details\n\n"
-                "All data is encrypted and access is logged for compliance."
-            ),
-            'system_help': (
-                "What would you like help with?\n\n"
-                "• **Adding patient notes** - documentation workflow\n"
-                "• **Scheduling appointments** - appointment management\n"
-                "• **Finding patient records** - record access\n"
-                "• **System settings** - preferences and configuration\n\n"
-                "Ask me about any of these, or feel free to ask a specific question!"
-            )
-        }
-        
-        reply = responses.get(intent, responses['system_help'])
-        
-        disclaimer = DisclaimerManager.get_disclaimer(intent, 'clinician')
-        actions = ActionExtractor.extract_actions(reply, 'clinician')
+        reply = _CLINICIAN_RESPONSES.get(intent, _CLINICIAN_FALLBACK)
+        actions, disclaimer = _canned_actions_and_disclaimer(intent, 'clinician')
         
         self._audit_log(conversation_id, user_id, intent, 'clinician')
         
         return {
             'reply': reply,
-            'suggested_actions': actions,
+            'suggested_actions': list(actions),
             'disclaimer': disclaimer
         }
     
@@ -404,65 +658,14 @@ class AfyaclickChatbot:
                               conversation_id: str, user_id: int) -> Dict:
         """Handle patient-specific queries"""
         
-        responses = {
-            'appointment_booking': (
-                "To book an appointment in Afyaclick:\n\n"
-                "1. Click **Book Appointment** (from dashboard or left menu)\n"
-                "2. Select your preferred doctor:\n"
-                "   - View doctor specialties and availability\n"
-                "   - Read reviews from other patients (if available)\n"
-                "3. Pick a date and time that works for you\n"
-                "4. Add a note about why you're visiting (optional)\n"
-                "5. Click **Confirm Appointment**\n\n"
-                "You'll receive a confirmation and a reminder before your appointment.\n"
-                "Can't make it? You can reschedule up to 24 hours before."
-            ),
-            'records_access': (
-                "To view your medical records in Afyaclick:\n\n"
-                "1. Click **My Medical Records** (left sidebar)\n"
-                "2. You can see:\n"
-                "   - Previous visit notes\n"
-                "   - Test results and lab work\n"
-                "   - Doctor's summaries and recommendations\n"
-                "3. Click any visit to read full details\n"
-                "4. Download notes if you need them\n\n"
-                "Your records are private and protected. "
-                "Only you and your healthcare team can see them."
-            ),
-            'faq': (
-                "Welcome to Afyaclick! Here are common questions:\n\n"
-                "**What is Afyaclick?**\n"
-                "An easy-to-use health app where you can manage appointments, "
-                "view test results, and communicate with your doctors.\n\n"
-                "**Is my data safe?**\n"
-                "Yes! All your information is encrypted and protected by law. "
-                "Only you and your healthcare team can access it.\n\n"
-                "**How do I message my doctor?**\n"
-                "Go to **My Doctors** → select a doctor → **Send Message**\n\n"
-                "**Can I download my records?**\n"
-                "Yes! In **My Medical Records**, click any note and select **Download**\n\n"
-                "Have other questions? Scroll down or ask me directly!"
-            ),
-            'general_question': (
-                "I'm here to help! Here's what I can assist with:\n\n"
-                "📅 **Appointments** - Book, reschedule, or cancel\n"
-                "📋 **Medical Records** - View your visit notes and test results\n"
-                "👨‍⚕️ **My Doctors** - See your healthcare team and message them\n"
-                "❓ **FAQ** - Common questions about Afyaclick\n\n"
-                "What would you like help with?"
-            )
-        }
-        
-        reply = responses.get(intent, responses['general_question'])
-        
-        disclaimer = DisclaimerManager.get_disclaimer(intent, 'patient')
-        actions = ActionExtractor.extract_actions(reply, 'patient')
+        reply = _PATIENT_RESPONSES.get(intent, _PATIENT_FALLBACK)
+        actions, disclaimer = _canned_actions_and_disclaimer(intent, 'patient')
         
         self._audit_log(conversation_id, user_id, intent, 'patient')
         
         return {
             'reply': reply,
-            'suggested_actions': actions,
+            'suggested_actions': list(actions),
             'disclaimer': disclaimer
         }
     
@@ -488,12 +691,9 @@ class AfyaclickChatbot:
     
     def _audit_log(self, conversation_id: str, user_id: int,
                    intent: str, user_role: str):
-        """Log chatbot interaction (metadata only)"""
-        logger.info(
-            f"CHATBOT_INTERACTION | conversation={conversation_id} | "
-            f"user={user_id} | role={user_role} | intent={intent} | "
-            f"timestamp={datetime.utcnow().isoformat()}"
-        )
+        """Queue chatbot interaction for the audit log (metadata only)"""
+        if logger.isEnabledFor(logging.INFO):  # Filtered out: nothing to queue or format
+            _queue_audit((conversation_id, user_id, user_role, intent, time.time()))
 
 
 # Example usage
@@ -507,7 +707,7 @@ if __name__ == '__main__':
         conversation_id='test-conv-001',
         user_id=1
     )
-    print(json.dumps(response, indent=2))
+    print(orjson.dumps(response, option=orjson.OPT_INDENT_2).decode())
     
     # Example: Patient asking medical question
     response = chatbot.respond(
@@ -516,7 +716,7 @@ if __name__ == '__main__':
         conversation_id='test-conv-002',
         user_id=42
     )
-    print(json.dumps(response, indent=2))
+    print(orjson.dumps(response, option=orjson.OPT_INDENT_2).decode())
     
     # Example: Patient booking appointment
     response = chatbot.respond(
@@ -525,4 +725,4 @@ if __name__ == '__main__':
         conversation_id='test-conv-003',
         user_id=42
     )
-    print(json.dumps(response, indent=2))
+    print(orjson.dumps(response, option=orjson.OPT_INDENT_2).decode())
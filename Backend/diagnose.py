@@ -1,15 +1,28 @@
+import argparse
 import sqlite3
 import bcrypt
 
+from seed_config import SEED_BCRYPT_ROUNDS
+
+# Default password, encoded once for hashing and the login checks
+_DEFAULT_PW_BYTES = b'password123'
+
 # Direct database access to bypass Flask import issues
-def check_database():
+def check_database(verbose=False):
     conn = sqlite3.connect('instance/Afyyaclick.db')
     cursor = conn.cursor()
 
     print("=== DATABASE DIAGNOSTIC ===")
 
-    # Check if password_hash columns exist
+    # Check both tables exist (one lookup), then their password_hash columns
     try:
+        cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name IN ('patients', 'doctors')")
+        missing = {'patients', 'doctors'} - {row[0] for row in cursor.fetchall()}
+        if missing:
+            print(f"Missing tables: {sorted(missing)} - database migration needed!")
+            conn.close()
+            return
+
         cursor.execute("PRAGMA table_info(patients)")
         patient_columns = cursor.fetchall()
         patient_column_names = [col[1] for col in patient_columns]
@@ -28,67 +41,64 @@ def check_database():
         conn.close()
         return
 
-    # Check patients
-    cursor.execute("SELECT id, first_name, last_name, email, password_hash FROM patients LIMIT 3")
-    patients = cursor.fetchall()
-    print(f"\nPatients found: {len(patients)}")
-    for p in patients:
-        patient_id, first_name, last_name, email, password_hash = p
-        has_password = bool(password_hash)
-        print(f"  {email}: password_hash exists = {has_password}")
+    # Sample rows (--verbose only)
+    if verbose:
+        # Check patients
+        cursor.execute("SELECT id, first_name, last_name, email, password_hash FROM patients LIMIT 3")
+        patients = cursor.fetchall()
+        print(f"\nPatients found: {len(patients)}")
+        for p in patients:
+            patient_id, first_name, last_name, email, password_hash = p
+            has_password = bool(password_hash)
+            print(f"  {email}: password_hash exists = {has_password}")
 
-    # Check doctors
-    cursor.execute("SELECT doctor_id, name, email, password_hash FROM doctors LIMIT 3")
-    doctors = cursor.fetchall()
-    print(f"Doctors found: {len(doctors)}")
-    for d in doctors:
-        doctor_id, name, email, password_hash = d
-        has_password = bool(password_hash)
-        print(f"  {email}: password_hash exists = {has_password}")
+        # Check doctors
+        cursor.execute("SELECT doctor_id, name, email, password_hash FROM doctors LIMIT 3")
+        doctors = cursor.fetchall()
+        print(f"Doctors found: {len(doctors)}")
+        for d in doctors:
+            doctor_id, name, email, password_hash = d
+            has_password = bool(password_hash)
+            print(f"  {email}: password_hash exists = {has_password}")
 
     # Add default passwords if columns exist
     if has_patient_password:
         print("\n=== SETTING DEFAULT PASSWORDS ===")
-        password_hash = bcrypt.hashpw('password123'.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
-
-        cursor.execute("UPDATE patients SET password_hash = ? WHERE password_hash IS NULL OR password_hash = ''", (password_hash,))
-        updated_patients = cursor.rowcount
-        print(f"Updated {updated_patients} patients with passwords")
+        password_hash = bcrypt.hashpw(_DEFAULT_PW_BYTES, bcrypt.gensalt(SEED_BCRYPT_ROUNDS)).decode('utf-8')
 
-        cursor.execute("UPDATE doctors SET password_hash = ? WHERE password_hash IS NULL OR password_hash = ''", (password_hash,))
-        updated_doctors = cursor.rowcount
-        print(f"Updated {updated_doctors} doctors with passwords")
+        # Both UPDATEs in one transaction, committed once on exit
+        with conn:
+            cursor.execute("UPDATE patients SET password_hash = ? WHERE password_hash IS NULL OR password_hash = ''", (password_hash,))
+            updated_patients = cursor.rowcount
+            print(f"Updated {updated_patients} patients with passwords")
 
-        conn.commit()
+            cursor.execute("UPDATE doctors SET password_hash = ? WHERE password_hash IS NULL OR password_hash = ''", (password_hash,))
+            updated_doctors = cursor.rowcount
+            print(f"Updated {updated_doctors} doctors with passwords")
         print("✅ All passwords updated to: password123")
     else:
         print("\n❌ password_hash columns don't exist - database migration needed!")
 
     print("\n=== TEST LOGIN SIMULATION ===")
-    # Test password checking
-    test_password = 'password123'
-
-    # Test doctor login
-    cursor.execute("SELECT name, email, password_hash FROM doctors WHERE email = ?", ('sarah.johnson@hospital.com',))
-    doctor = cursor.fetchone()
-    if doctor:
-        name, email, password_hash = doctor
-        password_valid = bcrypt.checkpw(test_password.encode('utf-8'), password_hash.encode('utf-8'))
-        print(f"Test login for {email}: {'SUCCESS' if password_valid else 'FAILED'}")
-    else:
-        print("Doctor sarah.johnson@hospital.com not found")
-
-    # Test patient login
-    cursor.execute("SELECT first_name, last_name, email, password_hash FROM patients WHERE email = ?", ('john.smith@email.com',))
-    patient = cursor.fetchone()
-    if patient:
-        first_name, last_name, email, password_hash = patient
-        password_valid = bcrypt.checkpw(test_password.encode('utf-8'), password_hash.encode('utf-8'))
-        print(f"Test login for {email}: {'SUCCESS' if password_valid else 'FAILED'}")
-    else:
-        print("Patient john.smith@email.com not found")
+    # Test doctor and patient login (one query for both accounts)
+    test_accounts = (('Doctor', 'sarah.johnson@hospital.com'), ('Patient', 'john.smith@email.com'))
+    cursor.execute(
+        "SELECT 'Doctor', email, CAST(password_hash AS BLOB) FROM doctors WHERE email = ? "
+        "UNION ALL SELECT 'Patient', email, CAST(password_hash AS BLOB) FROM patients WHERE email = ?",
+        tuple(email for _, email in test_accounts)
+    )
+    found = {kind: (email, password_hash) for kind, email, password_hash in cursor.fetchall()}
+    for kind, test_email in test_accounts:
+        if kind in found:
+            email, password_hash = found[kind]
+            password_valid = bcrypt.checkpw(_DEFAULT_PW_BYTES, password_hash)
+            print(f"Test login for {email}: {'SUCCESS' if password_valid else 'FAILED'}")
+        else:
+            print(f"{kind} {test_email} not found")
 
     conn.close()
 
 if __name__ == "__main__":
-    check_database()
+    parser = argparse.ArgumentParser(description="Check the Afyaclick database and set default passwords")
+    parser.add_argument('--verbose', action='store_true', help="also print sample patient and doctor rows")
+    check_database(verbose=parser.parse_args().verbose)
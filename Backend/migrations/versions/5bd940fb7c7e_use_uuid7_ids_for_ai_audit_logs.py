@@ -0,0 +1,73 @@
+"""Use UUIDv7 ids for ai_audit_logs and drop action_timestamp index
+
+Revision ID: 5bd940fb7c7e
+Revises: 4e7c547d5ebb
+Create Date: 2026-10-14 09:12:03.417220
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5bd940fb7c7e'
+down_revision = '4e7c547d5ebb'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    bind = op.get_bind()
+
+    with op.batch_alter_table('ai_audit_logs', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_ai_audit_logs_action_timestamp'))
+
+    if bind.dialect.name == 'postgresql':
+        # Existing rows get a v7 id built from action_timestamp (48-bit ms),
+        # the version/variant nibbles and the old integer id, so they keep
+        # their time order and stay unique.
+        op.execute("ALTER TABLE ai_audit_logs ALTER COLUMN id DROP DEFAULT")
+        op.execute(
+            "ALTER TABLE ai_audit_logs ALTER COLUMN id TYPE UUID USING ("
+            "lpad(to_hex((extract(epoch FROM coalesce(action_timestamp, now())) * 1000)::bigint), 12, '0')"
+            " || '7000' || '8000' || lpad(to_hex(id), 12, '0'))::uuid"
+        )
+        op.execute("DROP SEQUENCE IF EXISTS ai_audit_logs_id_seq")
+    else:
+        with op.batch_alter_table('ai_audit_logs', schema=None) as batch_op:
+            batch_op.alter_column('id',
+                   existing_type=sa.INTEGER(),
+                   type_=sa.UUID(),
+                   existing_nullable=False)
+        op.execute(
+            "UPDATE ai_audit_logs SET id = "
+            "printf('%012x', CAST(strftime('%s', coalesce(action_timestamp, 'now')) AS INTEGER) * 1000)"
+            " || '70008000' || printf('%012x', CAST(id AS INTEGER))"
+        )
+
+
+def downgrade():
+    bind = op.get_bind()
+
+    if bind.dialect.name == 'postgresql':
+        # Original integer ids are not recoverable for rows written after
+        # the upgrade; renumber from a fresh sequence.
+        op.execute("CREATE SEQUENCE ai_audit_logs_id_seq OWNED BY ai_audit_logs.id")
+        op.execute(
+            "ALTER TABLE ai_audit_logs ALTER COLUMN id TYPE INTEGER "
+            "USING nextval('ai_audit_logs_id_seq')"
+        )
+        op.execute(
+            "ALTER TABLE ai_audit_logs ALTER COLUMN id "
+            "SET DEFAULT nextval('ai_audit_logs_id_seq')"
+        )
+    else:
+        op.execute("UPDATE ai_audit_logs SET id = rowid")
+        with op.batch_alter_table('ai_audit_logs', schema=None) as batch_op:
+            batch_op.alter_column('id',
+                   existing_type=sa.UUID(),
+                   type_=sa.INTEGER(),
+                   existing_nullable=False)
+
+    with op.batch_alter_table('ai_audit_logs', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_ai_audit_logs_action_timestamp'), ['action_timestamp'], unique=False)
@@ -0,0 +1,26 @@
+"""Add cached_json to note_interpretations
+
+Revision ID: a6c3d8e9f0b1
+Revises: f5b2c7d0e1a4
+Create Date: 2026-10-14 18:16:42.904127
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a6c3d8e9f0b1'
+down_revision = 'f5b2c7d0e1a4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('note_interpretations', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('cached_json', sa.LargeBinary(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('note_interpretations', schema=None) as batch_op:
+        batch_op.drop_column('cached_json')
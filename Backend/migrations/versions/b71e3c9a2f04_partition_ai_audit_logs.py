@@ -0,0 +1,68 @@
+"""Partition ai_audit_logs by id range and add BRIN index on action_timestamp
+
+Revision ID: b71e3c9a2f04
+Revises: 5bd940fb7c7e
+Create Date: 2026-10-14 10:04:51.208113
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'b71e3c9a2f04'
+down_revision = '5bd940fb7c7e'
+branch_labels = None
+depends_on = None
+
+
+COLUMNS = (
+    "id, user_id_hash, user_role, action_timestamp, action, ai_service, "
+    "ai_model_version, result, error_details, context"
+)
+
+
+def upgrade():
+    # Declarative partitioning is PostgreSQL-only; SQLite keeps a plain table
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    # A table cannot be converted to partitioned in place: rebuild and copy
+    op.execute("ALTER TABLE ai_audit_logs RENAME TO ai_audit_logs_old")
+    op.execute("ALTER INDEX ix_ai_audit_logs_action RENAME TO ix_ai_audit_logs_old_action")
+    op.execute("ALTER INDEX ix_ai_audit_logs_user_id_hash RENAME TO ix_ai_audit_logs_old_user_id_hash")
+    op.execute("ALTER TABLE ai_audit_logs_old RENAME CONSTRAINT ai_audit_logs_pkey TO ai_audit_logs_old_pkey")
+
+    op.execute(
+        "CREATE TABLE ai_audit_logs (LIKE ai_audit_logs_old INCLUDING DEFAULTS, "
+        "PRIMARY KEY (id)) PARTITION BY RANGE (id)"
+    )
+    op.execute("CREATE TABLE ai_audit_logs_default PARTITION OF ai_audit_logs DEFAULT")
+    op.execute(f"INSERT INTO ai_audit_logs ({COLUMNS}) SELECT {COLUMNS} FROM ai_audit_logs_old")
+    op.execute("DROP TABLE ai_audit_logs_old")
+
+    op.create_index('ix_ai_audit_logs_action', 'ai_audit_logs', ['action'], unique=False)
+    op.create_index('ix_ai_audit_logs_user_id_hash', 'ai_audit_logs', ['user_id_hash'], unique=False)
+    op.execute(
+        "CREATE INDEX ai_audit_ts_brin ON ai_audit_logs "
+        "USING BRIN (action_timestamp) WITH (pages_per_range = 32)"
+    )
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    op.execute("ALTER TABLE ai_audit_logs RENAME TO ai_audit_logs_partitioned")
+    op.execute("ALTER INDEX ix_ai_audit_logs_action RENAME TO ix_ai_audit_logs_partitioned_action")
+    op.execute("ALTER INDEX ix_ai_audit_logs_user_id_hash RENAME TO ix_ai_audit_logs_partitioned_user_id_hash")
+    op.execute("ALTER TABLE ai_audit_logs_partitioned RENAME CONSTRAINT ai_audit_logs_pkey TO ai_audit_logs_partitioned_pkey")
+
+    op.execute(
+        "CREATE TABLE ai_audit_logs (LIKE ai_audit_logs_partitioned INCLUDING DEFAULTS, "
+        "PRIMARY KEY (id))"
+    )
+    op.execute(f"INSERT INTO ai_audit_logs ({COLUMNS}) SELECT {COLUMNS} FROM ai_audit_logs_partitioned")
+    op.execute("DROP TABLE ai_audit_logs_partitioned CASCADE")
+
+    op.create_index('ix_ai_audit_logs_action', 'ai_audit_logs', ['action'], unique=False)
+    op.create_index('ix_ai_audit_logs_user_id_hash', 'ai_audit_logs', ['user_id_hash'], unique=False)
@@ -0,0 +1,49 @@
+"""Use JSONB for extracted entity columns and add GIN indexes
+
+Revision ID: c2d8e4f61a37
+Revises: b71e3c9a2f04
+Create Date: 2026-10-14 10:41:17.655902
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'c2d8e4f61a37'
+down_revision = 'b71e3c9a2f04'
+branch_labels = None
+depends_on = None
+
+
+JSONB_COLUMNS = ('extracted_symptoms', 'extracted_diagnoses', 'extracted_medications', 'extracted_vitals')
+GIN_COLUMNS = ('extracted_symptoms', 'extracted_diagnoses', 'extracted_medications')
+
+
+def upgrade():
+    # JSONB and GIN are PostgreSQL-only; SQLite stores JSON as text either way
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    for column in JSONB_COLUMNS:
+        op.execute(
+            f"ALTER TABLE note_interpretations ALTER COLUMN {column} "
+            f"TYPE JSONB USING {column}::jsonb"
+        )
+    for column in GIN_COLUMNS:
+        op.execute(
+            f"CREATE INDEX ix_note_interpretations_{column}_gin "
+            f"ON note_interpretations USING GIN ({column} jsonb_path_ops)"
+        )
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    for column in GIN_COLUMNS:
+        op.execute(f"DROP INDEX IF EXISTS ix_note_interpretations_{column}_gin")
+    for column in JSONB_COLUMNS:
+        op.execute(
+            f"ALTER TABLE note_interpretations ALTER COLUMN {column} "
+            f"TYPE JSON USING {column}::json"
+        )
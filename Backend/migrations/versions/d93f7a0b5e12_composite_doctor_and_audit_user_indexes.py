@@ -0,0 +1,36 @@
+"""Composite doctor pending and audit user/time indexes
+
+Revision ID: d93f7a0b5e12
+Revises: c2d8e4f61a37
+Create Date: 2026-10-14 11:18:40.902337
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd93f7a0b5e12'
+down_revision = 'c2d8e4f61a37'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('note_interpretations', schema=None) as batch_op:
+        batch_op.create_index('ix_ni_doctor_pending', ['doctor_id', 'clinician_approved', 'created_at'], unique=False)
+        batch_op.drop_index(batch_op.f('ix_note_interpretations_doctor_id'))
+        batch_op.drop_index(batch_op.f('ix_note_interpretations_created_at'))
+
+    op.create_index('ix_ai_audit_user_time', 'ai_audit_logs', ['user_id_hash', sa.text('action_timestamp DESC')], unique=False)
+    op.drop_index('ix_ai_audit_logs_user_id_hash', table_name='ai_audit_logs')
+
+
+def downgrade():
+    op.create_index('ix_ai_audit_logs_user_id_hash', 'ai_audit_logs', ['user_id_hash'], unique=False)
+    op.drop_index('ix_ai_audit_user_time', table_name='ai_audit_logs')
+
+    with op.batch_alter_table('note_interpretations', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_note_interpretations_created_at'), ['created_at'], unique=False)
+        batch_op.create_index(batch_op.f('ix_note_interpretations_doctor_id'), ['doctor_id'], unique=False)
+        batch_op.drop_index('ix_ni_doctor_pending')
@@ -0,0 +1,28 @@
+"""Add original_note_hash to note_interpretations
+
+Revision ID: e4a1b6c8d9f3
+Revises: d93f7a0b5e12
+Create Date: 2026-10-14 12:02:26.331574
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e4a1b6c8d9f3'
+down_revision = 'd93f7a0b5e12'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('note_interpretations', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('original_note_hash', sa.String(length=64), nullable=True))
+        batch_op.create_index(batch_op.f('ix_note_interpretations_original_note_hash'), ['original_note_hash'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('note_interpretations', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_note_interpretations_original_note_hash'))
+        batch_op.drop_column('original_note_hash')
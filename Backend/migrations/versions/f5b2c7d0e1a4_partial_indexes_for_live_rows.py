@@ -0,0 +1,38 @@
+"""Partial indexes for live note interpretations and chat sessions
+
+Revision ID: f5b2c7d0e1a4
+Revises: e4a1b6c8d9f3
+Create Date: 2026-10-14 12:37:58.114062
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f5b2c7d0e1a4'
+down_revision = 'e4a1b6c8d9f3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('note_interpretations', schema=None) as batch_op:
+        batch_op.drop_index('ix_ni_doctor_pending')
+        batch_op.create_index('ix_ni_doctor_pending', ['doctor_id', 'clinician_approved', 'created_at'], unique=False,
+                              postgresql_where=sa.text('is_deleted = false'),
+                              sqlite_where=sa.text('is_deleted = 0'))
+
+    with op.batch_alter_table('chat_sessions', schema=None) as batch_op:
+        batch_op.create_index('ix_chat_sessions_active_user', ['user_id', 'started_at'], unique=False,
+                              postgresql_where=sa.text('is_archived = false'),
+                              sqlite_where=sa.text('is_archived = 0'))
+
+
+def downgrade():
+    with op.batch_alter_table('chat_sessions', schema=None) as batch_op:
+        batch_op.drop_index('ix_chat_sessions_active_user')
+
+    with op.batch_alter_table('note_interpretations', schema=None) as batch_op:
+        batch_op.drop_index('ix_ni_doctor_pending')
+        batch_op.create_index('ix_ni_doctor_pending', ['doctor_id', 'clinician_approved', 'created_at'], unique=False)
@@ -1,6 +1,7 @@
-from app import app, db 
+from app import app, db, bcrypt
 from models import Patient, Doctor, Appointment
 from datetime import datetime, timedelta
+from seed_config import SEED_BCRYPT_ROUNDS
 
 import random
 
@@ -59,6 +60,8 @@ def seed_database():
     
 
 
+    # Every seeded doctor shares one default password: hash it once
+    doctor_password_hash = bcrypt.generate_password_hash('doc123', SEED_BCRYPT_ROUNDS).decode('utf-8')
     doctors = []
     for doc_data in doctors_data:
         doctor = Doctor(
@@ -68,7 +71,7 @@ def seed_database():
             email=doc_data['email'],
             phone=doc_data['phone']
         )
-        doctor.set_password('doc123')  # Set default password
+        doctor.password_hash = doctor_password_hash  # Default password: doc123
         doctors.append(doctor)
         db.session.add(doctor)
     
@@ -147,9 +150,11 @@ def seed_database():
             'last_name': 'Taylor',
             'gender': 'Female',
             'email': 'emily.taylor@email.com',
-            'phone': '+1-555-1010'  
+            'phone': '+1-555-1010'
+        }
     ]
     
+    patient_password_hash = bcrypt.generate_password_hash('pat123', SEED_BCRYPT_ROUNDS).decode('utf-8')
     patients = []
     for patient_data in patients_data:
         patient = Patient(
@@ -159,7 +164,7 @@ def seed_database():
             email=patient_data['email'],
             phone=patient_data['phone']
         )
-        patient.set_password('pat123')  # Set default password
+        patient.password_hash = patient_password_hash  # Default password: pat123
         patients.append(patient)
         db.session.add(patient)
     
@@ -0,0 +1,7 @@
+# seed_config.py
+# Settings shared by the bootstrap scripts (seed.py, update_passwords.py,
+# diagnose.py); no Flask imports, so diagnose.py can use it standalone
+import os
+
+# bcrypt cost for seeded and default passwords only; set_password keeps the app default (12)
+SEED_BCRYPT_ROUNDS = int(os.getenv('SEED_BCRYPT_ROUNDS', '4'))
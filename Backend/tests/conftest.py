@@ -0,0 +1,38 @@
+import os
+import sys
+
+import pytest
+
+os.environ.setdefault('AI_API_KEY', 'test-key')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask  # noqa: E402
+
+import ai_models  # noqa: E402,F401  (registers the AI tables)
+from ai_routes import ai_bp  # noqa: E402
+from models import db  # noqa: E402
+
+
+CLINICIAN = {'Authorization': 'Bearer test', 'X-User-Role': 'clinician', 'X-User-ID': 'DOC-1'}
+
+NOTE_TEXT = (
+    "Patient presents with persistent dry cough x 3 weeks, denies fever. "
+    "Lungs clear. SPO2 98% on room air. BP 120/80"
+)
+
+
+@pytest.fixture(scope='session')
+def app():
+    # One app per session: the audit writer thread binds to the first app it sees
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+    db.init_app(app)
+    app.register_blueprint(ai_bp, url_prefix='/api/ai')
+    with app.app_context():
+        db.create_all()
+    return app
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
@@ -0,0 +1,40 @@
+import threading
+from collections import OrderedDict
+
+from ai_config import RateLimiter
+
+
+class _HookedBuckets(OrderedDict):
+    """Buckets that run `hook` once, right after the next bucket update"""
+    hook = None
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        hook, self.hook = self.hook, None
+        if hook:
+            hook()
+
+
+def test_rate_limiter_eviction_waits_for_a_bucket_update():
+    limiter = RateLimiter(user_limit=10, window_seconds=3600)
+    limiter.MAX_USERS = 2
+    limiter.buckets = _HookedBuckets()
+    limiter.check('a')
+    limiter.check('b')
+    errors = []
+
+    def new_user():
+        try:
+            limiter.check('c')  # Over capacity: evicts the least recent user, 'a'
+        except Exception as e:
+            errors.append(e)
+
+    # While 'a' (the LRU entry) is between its update and move_to_end,
+    # another thread's eviction must not pop it
+    other = threading.Thread(target=new_user)
+    limiter.buckets.hook = lambda: (other.start(), other.join(timeout=0.2))
+    limiter.check('a')
+    other.join()
+
+    assert errors == []
+    assert list(limiter.buckets) == ['a', 'c']
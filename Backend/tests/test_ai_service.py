@@ -0,0 +1,123 @@
+import re
+
+import orjson
+import pytest
+
+import ai_service
+from ai_service import NoteInterpreter, ValidationError
+
+NOTES = [
+    ('N-A', 'alpha: dry cough for three weeks, no fever, lungs clear', 1, 'DOC-1'),
+    ('N-B', 'bravo: knee pain after a fall, mild swelling, no deformity', 2, 'DOC-1'),
+    ('N-C', 'charlie: headache for two days, no visual change, BP normal', 3, 'DOC-1'),
+]
+
+
+def _output(text):
+    marker = text.split(':', 1)[0]
+    return {'formatted': marker, 'clinical': f'summary of {marker}', 'patient_friendly': marker}
+
+
+def _interpreter(packed_items):
+    """NoteInterpreter whose provider answers packs via packed_items(texts) and notes singly by echo"""
+    interpreter = NoteInterpreter()
+    calls = []
+
+    async def call_ai_provider(text, count=1):
+        calls.append(count)
+        if count == 1:
+            return orjson.dumps(_output(text)).decode()
+        texts = re.findall(r'^\[\d+\] (.*)$', text, flags=re.MULTILINE)
+        return orjson.dumps({'notes': packed_items(texts)}).decode()
+
+    interpreter._call_ai_provider = call_ai_provider
+    return interpreter, calls
+
+
+def _summaries(results):
+    return [r['clinical_summary'] for r in results]
+
+
+def test_packed_response_is_used_when_indexes_match():
+    interpreter, calls = _interpreter(
+        lambda texts: [dict(_output(t), index=i) for i, t in enumerate(texts, 1)]
+    )
+    results = interpreter.interpret_notes(NOTES)
+    assert _summaries(results) == ['summary of alpha', 'summary of bravo', 'summary of charlie']
+    assert calls == [2, 1]
+
+
+def test_pack_size_leaves_a_full_completion_budget_per_note():
+    interpreter = NoteInterpreter()
+    assert interpreter.MAX_PACKED_NOTES >= 2
+    assert interpreter._max_tokens(interpreter.MAX_PACKED_NOTES) <= interpreter.MAX_PACKED_COMPLETION_TOKENS
+    assert interpreter._max_tokens(interpreter.MAX_PACKED_NOTES) == interpreter.MAX_PACKED_NOTES * interpreter._max_tokens()
+
+
+def test_shuffled_packed_response_falls_back_to_per_note_calls():
+    # Reordered outputs (even with honest indexes) must not be matched by position
+    def shuffled(texts):
+        items = [dict(_output(t), index=i) for i, t in enumerate(texts, 1)]
+        return items[::-1]
+
+    interpreter, calls = _interpreter(shuffled)
+    results = interpreter.interpret_notes(NOTES)
+    assert _summaries(results) == ['summary of alpha', 'summary of bravo', 'summary of charlie']
+    assert sorted(calls) == [1, 1, 1, 2]
+
+
+def test_unlabelled_packed_response_falls_back_to_per_note_calls():
+    interpreter, calls = _interpreter(lambda texts: [_output(t) for t in reversed(texts)])
+    results = interpreter.interpret_notes(NOTES)
+    assert _summaries(results) == ['summary of alpha', 'summary of bravo', 'summary of charlie']
+    assert sorted(calls) == [1, 1, 1, 2]
+
+
+def test_split_packed_response_rejects_missing_or_duplicate_indexes():
+    split = NoteInterpreter._split_packed_response
+    item = {'formatted': 'x', 'clinical': 'y', 'patient_friendly': 'z'}
+    assert split(orjson.dumps({'notes': [dict(item, index=1), dict(item, index=1)]}), 2) is None
+    assert split(orjson.dumps({'notes': [dict(item, index=1), item]}), 2) is None
+    assert split(orjson.dumps({'notes': [dict(item, index=1), dict(item, index='2')]}), 2) is None
+    assert split(orjson.dumps({'notes': [dict(item, index=1)]}), 2) is None
+    assert split(orjson.dumps({'notes': [dict(item, index=1), dict(item, index=2)]}), 2) is not None
+
+
+def test_null_summary_in_pack_falls_back_without_failing_the_batch():
+    def with_null(texts):
+        items = [dict(_output(t), index=i) for i, t in enumerate(texts, 1)]
+        items[1]['formatted'] = None
+        return items
+
+    interpreter, calls = _interpreter(with_null)
+    results = interpreter.interpret_notes(NOTES)
+    assert _summaries(results) == ['summary of alpha', 'summary of bravo', 'summary of charlie']
+    assert sorted(calls) == [1, 1, 1, 2]
+
+
+class _CountingEncoder:
+    def __init__(self):
+        self.calls = 0
+
+    def encode(self, text, disallowed_special=()):
+        self.calls += 1
+        return text.split()
+
+
+def test_oversized_note_is_rejected_before_tokenizing():
+    interpreter = NoteInterpreter()
+    interpreter._encoder = encoder = _CountingEncoder()
+    with pytest.raises(ValidationError, match='Note too long'):
+        interpreter.validate_input('x' * (NoteInterpreter.MAX_NOTE_CHARS + 1))
+    assert encoder.calls == 0
+    assert interpreter.validate_input(NOTES[0][1]) == len(NOTES[0][1].split())
+    assert encoder.calls == 1
+
+
+def test_token_encoder_is_not_fetched_without_a_warmed_cache(tmp_path, monkeypatch):
+    monkeypatch.setenv('TIKTOKEN_CACHE_DIR', str(tmp_path))
+    ai_service._get_token_encoder.cache_clear()
+    try:
+        assert ai_service._get_token_encoder('gpt-4-turbo-2024-04') is None
+    finally:
+        ai_service._get_token_encoder.cache_clear()
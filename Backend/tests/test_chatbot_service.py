@@ -0,0 +1,13 @@
+import chatbot_service
+from chatbot_service import IntentClassifier
+
+
+def test_long_messages_are_classified_without_being_cached():
+    chatbot_service._scan_intent_cached.cache_clear()
+    message = 'do i have pneumonia? coughing since my visit with dr. mwangi on monday'
+    assert IntentClassifier.classify(message, 'patient') == 'medical_question'
+    assert IntentClassifier.classify('book an appointment', 'patient') == 'appointment_booking'
+    assert IntentClassifier.classify('book an appointment', 'patient') == 'appointment_booking'
+
+    info = chatbot_service._scan_intent_cached.cache_info()
+    assert (info.currsize, info.hits) == (1, 1)
@@ -0,0 +1,48 @@
+import random
+import re
+
+import pytest
+
+from ai_service import PHIFilter
+
+
+def test_dates_need_one_separator_throughout():
+    assert PHIFilter.de_identify_text('seen 3/14/2024 and 3-14-2024') == 'seen [DATE] and [DATE]'
+    assert PHIFilter.de_identify_text('ratio 05-06/555') == 'ratio 05-06/555'
+
+
+def _baseline_de_identify(text):
+    """The original sequential re.sub chain, kept verbatim as the reference"""
+    result = text
+    result = re.sub(r'\b\d{3}[-.\s]?\d{3}[-.\s]?\d{4}\b', '[PHONE]', result)
+    result = re.sub(r'\b\d{3}-\d{2}-\d{4}\b', '[SSN]', result)
+    result = re.sub(r'\b\d{1,2}/\d{1,2}/\d{2,4}\b', '[DATE]', result)
+    result = re.sub(r'\b\d{1,2}-\d{1,2}-\d{2,4}\b', '[DATE]', result)
+    result = re.sub(r'\b\S+@\S+\.\S+\b', '[EMAIL]', result)
+    result = re.sub(r'\b\d{9,}\b', '[ID]', result)
+    result = re.sub(r'\bMRN[-\s]?\d{6,}\b', '[MRN]', result, flags=re.IGNORECASE)
+    result = re.sub(r'\bAccount\s*[-#]?\s*\d{6,}\b', '[ACCOUNT]', result, flags=re.IGNORECASE)
+    return result
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('2024-05-06-555-123-4567', '2024-05-06-[PHONE]'),
+    ('a@b.com/555 123 4567', None),
+    ('2024-05-06/123-45-6789', None),
+    ('1-2-33/4/55', '1-2-[DATE]'),
+])
+def test_overlapping_matches_keep_pattern_priority(text, expected):
+    masked = PHIFilter.de_identify_text(text)
+    assert masked == _baseline_de_identify(text)
+    if expected is not None:
+        assert masked == expected
+
+
+def test_matches_the_sequential_chain_on_fuzzed_notes():
+    rng = random.Random(20240506)
+    pieces = ['555', '123', '4567', '45', '6789', '05', '06', '2024', '1', '33',
+              '123456789', 'MRN', 'mrn', 'Account', '#', 'a@b.com', 'x@y', '.org',
+              '-', '/', '.', ' ', '@', 'pt', 'BP 120/80']
+    for _ in range(20000):
+        text = ''.join(rng.choice(pieces) for _ in range(rng.randint(1, 12)))
+        assert PHIFilter.de_identify_text(text) == _baseline_de_identify(text), text
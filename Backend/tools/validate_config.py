@@ -0,0 +1,32 @@
+"""
+validate_config.py - Check AI configuration before deploy
+
+Runs AIConfig.validate() outside the app so a bad environment fails the
+CI/deploy step instead of every worker at startup.
+
+Usage (from Backend/):
+    python tools/validate_config.py
+"""
+
+import logging
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ai_config import CONFIG  # noqa: E402
+
+
+def main() -> int:
+    logging.basicConfig(level=logging.INFO, format='%(levelname)s %(message)s')
+    try:
+        CONFIG.validate()
+    except ValueError as e:
+        print(f"✗ {e}")
+        return 1
+    print(f"✓ AI configuration valid: {CONFIG.to_dict()}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,35 @@
+"""
+warm_token_cache.py - Download tiktoken's BPE file at build time
+
+NoteInterpreter only loads its tokenizer from an already warmed
+TIKTOKEN_CACHE_DIR, so the first request in a fresh container never
+waits on a download. Run this in the image/CI build with the same
+TIKTOKEN_CACHE_DIR and AI_MODEL_VERSION the app will use.
+
+Usage (from Backend/):
+    TIKTOKEN_CACHE_DIR=/app/.tiktoken python tools/warm_token_cache.py
+"""
+
+import os
+import sys
+
+import tiktoken
+
+
+def main() -> int:
+    cache_dir = os.getenv('TIKTOKEN_CACHE_DIR')
+    if not cache_dir:
+        print("✗ TIKTOKEN_CACHE_DIR is not set")
+        return 1
+    os.makedirs(cache_dir, exist_ok=True)
+    model_version = os.getenv('AI_MODEL_VERSION', 'gpt-4-turbo-2024-04')
+    try:
+        encoding = tiktoken.encoding_for_model(model_version)
+    except KeyError:
+        encoding = tiktoken.get_encoding('cl100k_base')
+    print(f"✓ {encoding.name} cached in {cache_dir} for {model_version}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
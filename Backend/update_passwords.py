@@ -1,24 +1,23 @@
+from sqlalchemy import or_
+
 from app import app, db, bcrypt
 from models import Patient, Doctor
+from seed_config import SEED_BCRYPT_ROUNDS
 
 def add_default_passwords():
     """Add default passwords to existing users"""
     with app.app_context():
         print("Adding default passwords to existing users...")
 
-        # Update all patients with default password
-        patients = Patient.query.all()
-        for patient in patients:
-            if not patient.password_hash:  # Only if password not set
-                patient.set_password('password123')
-                print(f"Set password for patient: {patient.email}")
+        # Everyone gets the same default: hash it once, not once per user
+        password_hash = bcrypt.generate_password_hash('password123', SEED_BCRYPT_ROUNDS).decode('utf-8')
 
-        # Update all doctors with default password
-        doctors = Doctor.query.all()
-        for doctor in doctors:
-            if not doctor.password_hash:  # Only if password not set
-                doctor.set_password('password123')
-                print(f"Set password for doctor: {doctor.email}")
+        # One UPDATE per table, only where a password is not set
+        for model in (Patient, Doctor):
+            updated = model.query.filter(
+                or_(model.password_hash.is_(None), model.password_hash == '')
+            ).update({model.password_hash: password_hash}, synchronize_session=False)
+            print(f"Set password for {updated} {model.__tablename__}")
 
         # Commit changes
         db.session.commit()